@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析器效能基準測試
+以合成網頁 (generate_evaluate.py) 分別計時各階段：Big5 解碼、SELECT 切割、_parse_category、
+_parse_product、JSON/CSV 匯出，以及 parse_html 與 parse_raw（原始 Big5 + mmap）整體時間；並比對輸出與 golden 資料是否完全相同，
+避免效能最佳化不小心改變解析結果。
+
+    python3 benchmarks/bench_parser.py                      # scale 1、10
+    python3 benchmarks/bench_parser.py --scales 1 10 100 --output bench.json
+    python3 benchmarks/bench_parser.py --update-golden      # 解析結果有意變更時更新 golden
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import platform
+import tempfile
+from typing import List, Dict, Any
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+from coolpc_parser import WorkingCoolPCParser, decode_big5, _PATTERNS, PARSER_VERSION
+from generate_evaluate import generate
+
+GOLDEN_DIR = os.path.join(BENCH_DIR, 'golden')
+# 完整保存 golden JSON 的小型頁面倍率；較大的倍率只保存 SHA-256
+GOLDEN_FIXTURE_SCALE = 0.05
+GOLDEN_FIXTURE_FILE = os.path.join(GOLDEN_DIR, 'evaluate_fixture.json')
+GOLDEN_DIGESTS_FILE = os.path.join(GOLDEN_DIR, 'digests.json')
+
+
+def _dump(categories: List[Dict[str, Any]]) -> str:
+    """與 export_to_json 相同的序列化格式"""
+    return json.dumps(categories, ensure_ascii=False, indent=2)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def run_stages(raw: bytes, workdir: str) -> Dict[str, Any]:
+    """執行一次完整流程，回傳各階段時間、序列化後的解析結果及商品數量"""
+    timings = {}
+
+    start = time.perf_counter()
+    text = decode_big5(raw)
+    timings['decode'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blocks = _PATTERNS['select'].findall(text)
+    timings['select_split'] = time.perf_counter() - start
+
+    # 包裝 _parse_product 以累計其所佔時間
+    parser = WorkingCoolPCParser('')
+    parse_product = parser._parse_product
+    product_time = [0.0]
+
+    def timed_parse_product(*args, **kwargs):
+        product_start = time.perf_counter()
+        try:
+            return parse_product(*args, **kwargs)
+        finally:
+            product_time[0] += time.perf_counter() - product_start
+
+    parser._parse_product = timed_parse_product
+    start = time.perf_counter()
+    parsed = [parser._parse_category(select_content, select_id) for select_id, select_content in blocks]
+    timings['parse_category'] = time.perf_counter() - start
+    timings['parse_product'] = product_time[0]
+    categories = [category for category in parsed if category]
+
+    parser.categories = categories
+    start = time.perf_counter()
+    dumped = _dump(categories)
+    with open(os.path.join(workdir, 'product.json'), 'w', encoding='utf-8') as f:
+        f.write(dumped)
+    timings['export_json'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parser.export_rows(csv_file=os.path.join(workdir, 'product.csv'))
+    timings['export_csv'] = time.perf_counter() - start
+
+    # parse_html 整體時間（讀取 UTF-8 文件 + 切割 + 解析）
+    html_file = os.path.join(workdir, 'evaluate.html')
+    with open(html_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    start = time.perf_counter()
+    WorkingCoolPCParser(html_file).parse_html()
+    timings['parse_html'] = time.perf_counter() - start
+
+    # parse_raw 整體時間（mmap 原始 Big5 文件 + 切割 + 解析），結果必須與 parse_html 相同
+    raw_file = os.path.join(workdir, 'evaluate.raw.html')
+    with open(raw_file, 'wb') as f:
+        f.write(raw)
+    start = time.perf_counter()
+    raw_categories = WorkingCoolPCParser(raw_file).parse_raw()
+    timings['parse_raw'] = time.perf_counter() - start
+
+    return {'timings': timings, 'output': dumped, 'raw_matches': _dump(raw_categories) == dumped, 'products': sum(
+        len(subcategory['products']) for category in categories for subcategory in category['subcategories'])}
+
+
+def benchmark_scale(scale: float, repeat: int) -> Dict[str, Any]:
+    """對指定倍率的合成網頁執行多次，各階段取最短時間"""
+    raw = generate(scale)
+    best = {}
+    output = None
+    raw_matches = True
+    products = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(repeat):
+            result = run_stages(raw, workdir)
+            output = result['output']
+            raw_matches = raw_matches and result['raw_matches']
+            products = result['products']
+            for stage, seconds in result['timings'].items():
+                best[stage] = min(seconds, best.get(stage, seconds))
+
+    return {
+        'scale': scale,
+        'bytes': len(raw),
+        'products': products,
+        'timings': best,
+        'products_per_second': products / best['parse_html'] if best['parse_html'] else None,
+        'mb_per_second': len(raw) / 1024 / 1024 / best['parse_html'] if best['parse_html'] else None,
+        'digest': _digest(output),
+        'raw_matches': raw_matches,
+    }
+
+
+def _load_digests() -> Dict[str, str]:
+    if not os.path.exists(GOLDEN_DIGESTS_FILE):
+        return {}
+    with open(GOLDEN_DIGESTS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_golden(results: List[Dict[str, Any]], update: bool) -> bool:
+    """比對（或更新）golden 資料，回傳是否全部相符"""
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fixture_output = run_stages(generate(GOLDEN_FIXTURE_SCALE), workdir)['output']
+    if update:
+        with open(GOLDEN_FIXTURE_FILE, 'w', encoding='utf-8') as f:
+            f.write(fixture_output)
+        print(f"已更新 {GOLDEN_FIXTURE_FILE}")
+    else:
+        with open(GOLDEN_FIXTURE_FILE, 'r', encoding='utf-8') as f:
+            golden = f.read()
+        if golden != fixture_output:
+            ok = False
+            print(f"✗ golden 不符: scale {GOLDEN_FIXTURE_SCALE} 的解析結果與 {GOLDEN_FIXTURE_FILE} 不同")
+
+    digests = _load_digests()
+    for result in results:
+        key = str(result['scale'])
+        if not result['raw_matches']:
+            ok = False
+            print(f"✗ scale {key} 的 parse_raw 結果與 parse_html 不同")
+        if update:
+            digests[key] = result['digest']
+        elif key not in digests:
+            print(f"- scale {key} 沒有 golden 雜湊 (可用 --update-golden 建立)")
+        elif digests[key] != result['digest']:
+            ok = False
+            print(f"✗ golden 不符: scale {key} 的解析結果雜湊與記錄不同")
+    if update:
+        with open(GOLDEN_DIGESTS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(digests, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"已更新 {GOLDEN_DIGESTS_FILE}")
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='原價屋解析器效能基準測試')
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10], help='合成網頁倍率 (預設: 1 10；可加上 100)')
+    parser.add_argument('--repeat', type=int, default=3, help='每個倍率執行次數，取最短時間 (預設: 3)')
+    parser.add_argument('--output', help='將結果寫入 JSON 文件，方便在版本間追蹤')
+    parser.add_argument('--update-golden', action='store_true', help='以目前的解析結果更新 golden 資料')
+
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        scale = int(scale) if float(scale).is_integer() else scale
+        result = benchmark_scale(scale, args.repeat)
+        results.append(result)
+
+        print(f"\n=== scale {scale}: {result['bytes'] / 1024 / 1024:.2f} MB, {result['products']} 項商品 ===")
+        for stage, seconds in result['timings'].items():
+            print(f"  {stage:<15} {seconds * 1000:10.1f} ms")
+        print(f"  parse_html 吞吐量: {result['products_per_second']:.0f} 項商品/秒, {result['mb_per_second']:.2f} MB/秒")
+
+    print()
+    ok = check_golden(results, args.update_golden)
+    if ok and not args.update_golden:
+        print("✓ 解析結果與 golden 資料完全相同")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'parser_version': PARSER_VERSION,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results
+            }, f, ensure_ascii=False, indent=2)
+        print(f"結果已寫入 {args.output}")
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
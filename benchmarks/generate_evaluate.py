@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成 evaluate.html 產生器
+依固定亂數種子產生與原價屋估價頁結構相同的 Big5 網頁：30 個 SELECT、OPTGROUP 子分類、
+群組標題、補充說明列、折扣箭頭 (↘)、熱賣/價格異動樣式等；Big5 沒有的符號 (↪、❤) 以 HTML 實體表示，
+與實際網頁相同。scale 為商品數量倍率，1 約等於實際網頁的規模。
+"""
+
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from coolpc_parser import CATEGORY_NAMES
+
+# 各類別在 scale=1 時的商品數量（約為實際網頁的分布）
+CATEGORY_SIZES = {
+    '1': 150, '2': 250, '3': 120, '4': 180, '5': 450, '6': 350, '7': 400, '8': 150,
+    '9': 250, '10': 400, '11': 250, '12': 900, '13': 500, '14': 900, '15': 350,
+    '16': 450, '17': 350, '18': 350, '19': 300, '20': 150, '21': 100, '22': 450,
+    '23': 30, '24': 300, '25': 100, '26': 200, '27': 120, '28': 450, '29': 120, '30': 200
+}
+
+# 每個子分類的商品數量
+GROUP_SIZE = 25
+
+SUPPLEMENT_STYLE = "style='font-size:9pt;color:#222;background-color:transparent'"
+
+BRANDS = ['華碩 ASUS', '微星 MSI', '技嘉 GIGABYTE', '華擎 ASRock', '威剛 ADATA', '金士頓 Kingston',
+          '美光 Micron', '十銓 TEAM', '海韻 Seasonic', '酷碼 CoolerMaster', '聯力 LIAN LI', '海盜船 Corsair',
+          '全漢 FSP', '曜越 Tt', '恩傑 NZXT', '羅技 Logitech', 'ZOTAC', 'PNY', 'Seagate', 'WD']
+
+VGA_CHIPS = ['RTX5090', 'RTX5080', 'RTX5070 Ti', 'RTX5070', 'RTX5060 Ti', 'RTX5060', 'RTX4060',
+             'RTX3050', 'RX9070 XT', 'RX9060 XT', 'RX7600', 'ARC B580', 'GT1030']
+INTEL_CPUS = ['i3-14100', 'i5-14400F', 'i5-14600K', 'i7-14700K', 'i9-14900K', 'Ultra 5 245K', 'Ultra 7 265K']
+AMD_CPUS = ['R5 7500F', 'R5 9600X', 'R7 7800X3D', 'R7 9800X3D', 'R9 9950X', 'R5 5600', 'R5 3400G']
+CHIPSETS = ['B650M', 'B850', 'X870E', 'A620M', 'B760M', 'Z790', 'Z890', 'B860M', 'H610M']
+FORM_FACTORS = ['ATX', 'M-ATX', 'Mini-ITX', 'E-ATX']
+PANELS = ['玻璃透側', '全景玻璃', '雙玻璃透側', '網孔面板', '金屬側板']
+# 原價屋也有省略 B 的寫法 (2T、16G)
+CAPACITIES = ['500GB', '1TB', '2TB', '4TB', '1T', '2T']
+WARRANTIES = ['【三年保】', '【五年保】', '【十年保】', '']
+SUFFIXES = ['', '◆', '★', '◆ ★', ' 熱賣', ' 限時下殺', '酷幣200', ' 【訂】']
+
+
+def _price(rng: random.Random, low: int, high: int) -> int:
+    return rng.randrange(low, high) // 10 * 10 - 10
+
+
+def _price_text(rng: random.Random, price: int) -> str:
+    # 約 15% 商品有折扣箭頭
+    if rng.random() < 0.15:
+        original = price + rng.choice([100, 200, 300, 500, 1000])
+        return f"${original:,}↘${price:,}"
+    return f"${price:,}"
+
+
+def _product_text(rng: random.Random, category_id: str, serial: int) -> str:
+    """產生與類別相符的商品文字"""
+    brand = rng.choice(BRANDS)
+    if category_id == '4':
+        if rng.random() < 0.5:
+            model = rng.choice(INTEL_CPUS)
+            text = (f"Intel {model}【{rng.choice([6, 10, 14, 20])}核/{rng.choice([12, 16, 20, 28])}緒】"
+                    f"{rng.choice(['2.5', '3.5', '4.2'])}GHz(↑{rng.choice(['4.7', '5.4', '5.8'])}GHz)/"
+                    f"{rng.choice([20, 24, 33])}M/{rng.choice([65, 125])}W/{rng.choice(['1700', '1851'])}/代理盒裝")
+        else:
+            model = rng.choice(AMD_CPUS)
+            text = (f"AMD {model}{rng.choice(['代理盒裝', ' MPK', '盒裝含風扇'])}【{rng.choice([6, 8, 16])}核/"
+                    f"{rng.choice([12, 16, 32])}緒】{rng.choice(['3.7', '4.2', '4.7'])}GHz/"
+                    f"{rng.choice([32, 96, 128])}M/{rng.choice([65, 105, 120])}W/{rng.choice(['AM4', 'AM5'])}")
+        price = _price(rng, 2500, 25000)
+    elif category_id == '5':
+        chipset = rng.choice(CHIPSETS)
+        text = (f"{brand} {rng.choice(['TUF GAMING', 'PRO', 'AORUS ELITE', 'Steel Legend'])} {chipset}-{serial % 97}"
+                f"({rng.choice(FORM_FACTORS)}/{rng.choice(['1H1P', '1H1D1P'])}/Realtek 2.5Gb/"
+                f"{rng.choice(['DDR5', 'DDR4'])})14+2相數位供電{rng.choice(WARRANTIES)}")
+        price = _price(rng, 2000, 20000)
+    elif category_id == '6':
+        size = rng.choice([8, 16, 32])
+        text = (f"{brand} {rng.choice(['FURY Beast', 'XPG LANCER', 'Vengeance', 'T-CREATE'])} "
+                f"{f'{size * 2}GB({size}G*2)' if serial % 3 else f'{size}G'} {rng.choice(['DDR5-6000', 'DDR5-5600', 'DDR4-3200'])} "
+                f"CL{rng.choice([30, 36, 40, 16])}(黑){rng.choice(WARRANTIES)}")
+        price = _price(rng, 800, 9000)
+    elif category_id == '7':
+        text = (f"{brand} {rng.choice(['LEGEND 900', 'P3 Plus', 'NV3', 'SN770'])} {rng.choice(CAPACITIES)}/"
+                f"M.2 PCIe {rng.choice(['3.0', '4.0', '5.0'])}/讀:{rng.choice([3500, 5000, 7000])}/"
+                f"寫:{rng.choice([3000, 4200, 6000])}/TLC{rng.choice(WARRANTIES)}")
+        price = _price(rng, 900, 12000)
+    elif category_id == '12':
+        chip = rng.choice(VGA_CHIPS)
+        text = (f"{brand} {chip} {rng.choice(['WINDFORCE OC', 'DUAL', 'VENTUS 2X', 'GAMING X'])} "
+                f"{rng.choice([8, 12, 16])}G({rng.choice([2400, 2542, 2610])}MHz/"
+                f"{rng.choice(['24.1', '28.1', '33.6'])}cm/{rng.choice(['雙風扇', '三風扇'])})"
+                f"{rng.choice(WARRANTIES)}")
+        if rng.random() < 0.05:
+            text = f"{brand} 顯示卡支撐架 {serial % 13}型"
+        price = _price(rng, 2000, 90000)
+    elif category_id == '14':
+        text = (f"{brand} {rng.choice(['MasterBox', 'O11 Dynamic', 'H5 Flow', 'Versa'])} "
+                f"{rng.choice(['Q300L', 'EVO', 'RGB', 'T25'])}-{serial % 89} {rng.choice(['黑', '白'])} "
+                f"顯卡長{rng.choice([33, 36, 41])}/CPU高{rng.choice(['15.9', '16.7', '17.5'])}/"
+                f"{rng.choice(PANELS)}/{rng.choice(FORM_FACTORS)}")
+        if rng.random() < 0.2:
+            text += f"+{rng.choice(['550W', '650W', '750W'])}銅牌電源"
+        price = _price(rng, 900, 12000)
+    elif category_id == '15':
+        text = (f"{brand} {rng.choice(['FOCUS GX', 'MWE', 'Hydro G PRO', 'RM'])}-{rng.choice([550, 650, 750, 850, 1000])} "
+                f"{rng.choice(['ATX3.1', 'ATX3.0'])} {rng.choice(['銅牌', '金牌', '白金'])}/全模組{rng.choice(WARRANTIES)}")
+        price = _price(rng, 1200, 9000)
+    else:
+        text = (f"{brand} {rng.choice(['Pro', 'Air', 'Elite', 'Max'])}{serial % 500} "
+                f"{rng.choice(['USB-C', '2.4GHz', '無線', 'RGB'])}/{rng.choice(['黑', '白', '粉'])}/"
+                f"{rng.choice(['R&amp;D 版', '一般版', '電競版'])}")
+        price = _price(rng, 100, 8000)
+    return f"{text}, {_price_text(rng, price)}{rng.choice(SUFFIXES)}"
+
+
+def _category_block(rng: random.Random, category_id: str, count: int) -> str:
+    stats = (f"{CATEGORY_NAMES[category_id]}，共有商品 {count} 樣，熱賣 {count // 9} 樣，圖片 {count * 2 // 3}，"
+             f"討論 {count // 5}，價格異動 {count // 11}，限時下殺▼{count // 17}")
+    lines = [f"<TR><TD>{CATEGORY_NAMES[category_id]}</TD><TD>",
+             f"<SELECT name=n{category_id} class=s onChange=Cal(this)><OPTION VALUE=0>{stats}"]
+    group_no = 0
+    for serial in range(count):
+        if serial % GROUP_SIZE == 0:
+            if group_no:
+                lines.append("</OPTGROUP>")
+            group_no += 1
+            lines.append(f"<OPTGROUP LABEL='{CATEGORY_NAMES[category_id].split('|')[0]} 子分類{group_no}'>")
+            if rng.random() < 0.3:
+                lines.append(rng.choice([
+                    "<OPTION disabled>&#10084; 推薦用於電競玩家",
+                    "<OPTION disabled>※ 以下商品需搭配購買",
+                    f"<OPTION disabled>{rng.choice(BRANDS).split()[-1]} 專區",
+                ]))
+        css_class = rng.choice(['', '', '', ' class=r', ' class=g', ' class=b'])
+        lines.append(f"<OPTION value={int(category_id) * 100000 + serial}{css_class}>"
+                     f"{_product_text(rng, category_id, serial)}")
+        # 補充說明列
+        if rng.random() < 0.08:
+            lines.append(f"<OPTION disabled {SUPPLEMENT_STYLE}>&#8618; 註：{rng.choice(['需另購散熱器', '不含作業系統', '附贈遊戲序號'])}")
+    lines.append("</OPTGROUP></SELECT></TD></TR>")
+    return '\n'.join(lines)
+
+
+def generate(scale: float = 1, seed: int = 2024) -> bytes:
+    """產生合成網頁（Big5 位元組）"""
+    rng = random.Random(seed)
+    parts = ["<HTML><HEAD><META http-equiv=Content-Type content='text/html; charset=big5'>",
+             "<TITLE>原價屋@酷！PC 線上估價</TITLE></HEAD><BODY><FORM name=f><TABLE>"]
+    for category_id, size in CATEGORY_SIZES.items():
+        parts.append(_category_block(rng, category_id, max(1, int(size * scale))))
+    parts.append("</TABLE></FORM></BODY></HTML>")
+    return '\r\n'.join(parts).encode('big5')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='產生合成 evaluate.html (Big5)')
+    parser.add_argument('output_file', help='輸出的 HTML 文件路徑')
+    parser.add_argument('--scale', type=float, default=1, help='商品數量倍率 (預設: 1，約為實際網頁規模)')
+    parser.add_argument('--seed', type=int, default=2024, help='亂數種子 (預設: 2024)')
+
+    args = parser.parse_args()
+
+    data = generate(args.scale, args.seed)
+    with open(args.output_file, 'wb') as f:
+        f.write(data)
+    print(f"已產生 {args.output_file} ({len(data) / 1024 / 1024:.2f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+商品規格屬性
+解析時從商品文字取出正規化的數值與列舉屬性（容量、時脈、瓦數、顯示記憶體、腳位、晶片組、
+DDR 世代、主機板/機殼尺寸、機殼側板），查詢時直接比對這些值，不必每次都以正則表達式掃描文字。
+只記錄有找到的屬性。
+"""
+
+import re
+from typing import Dict, Any
+
+# 數值屬性（整數），欄位式快照中各存成一個 int32 欄位
+NUMERIC_ATTRIBUTES = (
+    'capacity_gb',  # 儲存/記憶體容量，TB 以 1000GB 計（含 16G、2T 等省略 B 的寫法）
+    'mhz',          # 時脈 (MHz、CPU 的 GHz 換算為 MHz，或 DDR5-6000 的 6000)
+    'watts',        # 瓦數（電源、TDP）
+    'vram_gb',      # 顯示卡記憶體
+)
+
+# 列舉屬性（字串）
+ENUM_ATTRIBUTES = (
+    'socket',       # AM4、AM5、LGA1700、LGA1851、LGA1200
+    'chipset',      # B650、X870E、Z890 ...
+    'ddr',          # DDR4、DDR5
+    'form_factor',  # E-ATX、ATX、mATX、ITX（機殼取支援的最大尺寸）
+    'side_panel',   # 全景玻璃、玻璃透側、玻璃開孔面板、雙玻璃透側、四面金屬網孔
+)
+
+ATTRIBUTE_NAMES = NUMERIC_ATTRIBUTES + ENUM_ATTRIBUTES
+
+# 主機板尺寸由大到小
+FORM_FACTORS = ('E-ATX', 'ATX', 'mATX', 'ITX')
+
+# 晶片組對應的 CPU 腳位（文字沒有寫出腳位時使用）
+CHIPSET_SOCKETS = {
+    'A520': 'AM4', 'B450': 'AM4', 'B550': 'AM4', 'X570': 'AM4',
+    'A620': 'AM5', 'B650': 'AM5', 'B650E': 'AM5', 'X670': 'AM5', 'X670E': 'AM5',
+    'B840': 'AM5', 'B850': 'AM5', 'X870': 'AM5', 'X870E': 'AM5',
+    'H610': 'LGA1700', 'B660': 'LGA1700', 'H670': 'LGA1700', 'Z690': 'LGA1700',
+    'B760': 'LGA1700', 'H770': 'LGA1700', 'Z790': 'LGA1700',
+    'H810': 'LGA1851', 'B860': 'LGA1851', 'Z890': 'LGA1851',
+}
+
+# 電源的 80 PLUS 認證等級，有這些字的文字才從型號取瓦數
+PSU_GRADES = ('銅牌', '銀牌', '金牌', '白金', '鈦金')
+
+# 機殼側板類型與關鍵字（依序比對，較明確的類型在前）
+SIDE_PANELS = (
+    ('四面金屬網孔', ('四面網孔', '四面金屬網孔')),
+    ('雙玻璃透側', ('雙玻璃', '雙面玻璃', '雙側玻璃', '雙面版')),
+    ('玻璃開孔面板', ('玻璃開孔', '開孔面板')),
+    ('全景玻璃', ('全景玻璃', '全景側透', '全景')),
+    ('玻璃透側', ('玻璃透側',)),
+)
+
+# 除了 capacity（區分 GB 與 Gb）之外，皆以大寫後的商品文字比對。
+# 開頭的 \b 會讓 re 無法以第一個字元快速略過不符合的位置，因此改在第一個字元之後以 lookbehind 檢查邊界
+_PATTERNS = {
+    # 省略 B 的 "16G"、"2T" 只接受常見的容量數字，避免 "5G" 無線網路、"10G" 網卡被當成容量
+    'capacity': re.compile(r'(\d+(?:\.\d+)?)\s*([TG])B'
+                           r'|(?<![\d.])(?:(4|8|12|16|24|32|48|64|96|128|192|256|512)(G)|(1|2|4|8|16)(T))(?![A-Za-z\d])'),
+    'mhz': re.compile(r'(\d{3,5})\s*MHZ'),
+    'ghz': re.compile(r'(\d(?<![\d.]\d)(?:\.\d{1,2})?)\s*GHZ'),
+    'ddr': re.compile(r'DDR([345])(?:-(\d{4}))?'),
+    'watts': re.compile(r'(\d{2,4})\s*W(?![A-Z])'),
+    # 電源型號中省略 W 的瓦數（如 "FOCUS GX-850"、"RM-550"），只用於有 80 PLUS 等級的文字
+    'model_watts': re.compile(r'(?<=[A-Z]-)(\d{3,4})(?![\d.A-Z])'),
+    'gpu': re.compile(r'(?:R(?<![A-Z\d]R)(?:TX|X)|G(?<![A-Z\d]G)TX?|A(?<![A-Z\d]A)RC)\s?[A-Z]?\d'),
+    'vram': re.compile(r'(\d(?<![\d.]\d)\d?)\s*GB?(?![A-Z\d])'),
+    # 沒有 LGA 字首的數字只在以 / 、空白或括號分隔（或後面緊接價格前的逗號）時才視為腳位（如 "125W/1700/代理盒裝"）
+    'socket': re.compile(r'LGA\s?(1200|1700|1851)|(?<=[/(\s])(1200|1700|1851)(?=[/),\s]|$)|\b(AM[45])\b'),
+    # 先以通用格式找出候選字，再查 CHIPSET_SOCKETS 確認是否為晶片組
+    'chipset': re.compile(r'[ABHXZ](?<![A-Z\d][ABHXZ])\d{3}E?(?=[MI]?(?![A-Z\d]))'),
+    'form_factor': re.compile(r'\b(E-?ATX|M-?ATX|MICRO[\s-]?ATX|MINI[\s-]?ITX|ITX|ATX)\b'),
+}
+
+
+def _form_factor(token: str) -> str:
+    token = token.replace(' ', '').replace('-', '')
+    if token == 'EATX':
+        return 'E-ATX'
+    if token in ('MATX', 'MICROATX'):
+        return 'mATX'
+    if token in ('MINIITX', 'ITX'):
+        return 'ITX'
+    return 'ATX'
+
+
+def extract_attributes(text: str) -> Dict[str, Any]:
+    """從商品文字取出規格屬性"""
+    attributes = {}
+    original = text
+    text = text.upper()
+    # 各正規表示式先以簡單的子字串判斷略過不可能符合的文字
+    is_gpu = ('TX' in text or 'RX' in text or 'GT' in text or 'ARC' in text) and _PATTERNS['gpu'].search(text) is not None
+
+    if is_gpu:
+        # 顯示卡的 "16G" 是顯示記憶體容量
+        vram_match = _PATTERNS['vram'].search(text)
+        if vram_match:
+            attributes['vram_gb'] = int(vram_match.group(1))
+    elif 'G' in original or 'T' in original:
+        # 網路卡的 "2.5Gb" 是傳輸速率，只比對大寫的 G/T
+        capacity_match = _PATTERNS['capacity'].search(original)
+        if capacity_match:
+            number, unit = next((capacity_match.group(i), capacity_match.group(i + 1))
+                                for i in (1, 3, 5, 7) if capacity_match.group(i))
+            capacity = float(number)
+            if unit == 'T':
+                capacity *= 1000
+            attributes['capacity_gb'] = int(round(capacity))
+
+    if 'DDR' in text:
+        ddr_match = _PATTERNS['ddr'].search(text)
+        if ddr_match:
+            attributes['ddr'] = f"DDR{ddr_match.group(1)}"
+            if ddr_match.group(2):
+                attributes['mhz'] = int(ddr_match.group(2))
+
+    if 'MHZ' in text:
+        mhz_match = _PATTERNS['mhz'].search(text)
+        if mhz_match:
+            attributes['mhz'] = int(mhz_match.group(1))
+
+    # GHz 只採用有核心數的 CPU 文字（取第一個，即基礎時脈）；滑鼠、網卡的 "2.4GHz" 是無線頻段
+    if 'mhz' not in attributes and 'GHZ' in text and '核' in text:
+        ghz_match = _PATTERNS['ghz'].search(text)
+        if ghz_match:
+            attributes['mhz'] = int(round(float(ghz_match.group(1)) * 1000))
+
+    if 'W' in text:
+        watts_match = _PATTERNS['watts'].search(text)
+        if watts_match:
+            attributes['watts'] = int(watts_match.group(1))
+    if 'watts' not in attributes and '-' in text and any(grade in text for grade in PSU_GRADES):
+        watts_match = _PATTERNS['model_watts'].search(text)
+        if watts_match:
+            attributes['watts'] = int(watts_match.group(1))
+
+    chipset = None
+    for candidate in _PATTERNS['chipset'].findall(text):
+        if candidate in CHIPSET_SOCKETS:
+            chipset = attributes['chipset'] = candidate
+            break
+
+    socket_match = None
+    if 'LGA' in text or 'AM4' in text or 'AM5' in text or '1200' in text or '1700' in text or '1851' in text:
+        socket_match = _PATTERNS['socket'].search(text)
+    if socket_match:
+        lga, number, amd = socket_match.groups()
+        attributes['socket'] = f"LGA{lga or number}" if (lga or number) else amd
+    elif chipset:
+        attributes['socket'] = CHIPSET_SOCKETS[chipset]
+
+    if 'ATX' in text or 'ITX' in text:
+        form_factors = {_form_factor(token) for token in _PATTERNS['form_factor'].findall(text)}
+        for form_factor in FORM_FACTORS:
+            if form_factor in form_factors:
+                attributes['form_factor'] = form_factor
+                break
+
+    if '玻璃' in text or '網孔' in text or '全景' in text or '開孔' in text or '雙面版' in text:
+        for side_panel, keywords in SIDE_PANELS:
+            if any(keyword in text for keyword in keywords):
+                attributes['side_panel'] = side_panel
+                break
+
+    return attributes
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+歷史快照批次彙總
+以行程池平行解析封存的多份 evaluate.html，每份快照輸出一行彙總結果 (JSON Lines)：
+各類別商品數、價格分布、折扣商品數、熱賣/價格異動/限時下殺數量，以及報價單摘要中的統計數據。
+
+每個工作行程以串流方式逐類別解析，記憶體用量只與單一類別大小相關，且處理固定數量的快照後即重新啟動（Python 3.11 以上）。
+輸出文件同時是進度紀錄：重新執行時略過已輸出（路徑、大小與修改時間皆相同）的快照，中斷後可接續處理。
+
+    python3 coolpc_batch.py "archive/*.html" --output aggregates.jsonl --jobs 4
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import codecs
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterable, Set, Tuple
+
+from coolpc_parser import WorkingCoolPCParser
+
+BATCH_VERSION = 1
+# 每個工作行程處理多少份快照後重新啟動，避免記憶體碎片逐漸累積
+TASKS_PER_WORKER = 20
+# 判斷編碼時讀取的位元組數
+_SNIFF_SIZE = 64 * 1024
+# 價格分布的百分位數
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def find_snapshots(patterns: Iterable[str]) -> List[str]:
+    """展開目錄與萬用字元，回傳排序後的快照路徑（目錄取其中的 *.html / *.htm）"""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for name in os.listdir(pattern):
+                if name.endswith(('.html', '.htm')):
+                    paths.add(os.path.join(pattern, name))
+        else:
+            paths.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _detect_encoding(path: str) -> str:
+    """封存的快照可能是轉換後的 UTF-8 或原始 Big5（--raw），以第一段含有非 ASCII 字元的內容判斷"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_SNIFF_SIZE), b''):
+            try:
+                decoder.decode(chunk)
+            except UnicodeDecodeError:
+                return 'big5'
+            if not chunk.isascii():
+                return 'utf-8'
+    return 'utf-8'
+
+
+def _price_distribution(prices: List[int]) -> Dict[str, Any]:
+    """價格分布（百分位數以最近排名法計算）"""
+    if not prices:
+        return {'count': 0}
+    prices.sort()
+    count = len(prices)
+    distribution = {
+        'count': count,
+        'min': prices[0],
+        'max': prices[-1],
+        'mean': round(sum(prices) / count, 1),
+    }
+    for percentile in PERCENTILES:
+        distribution[f"p{percentile}"] = prices[max(0, -(-percentile * count // 100) - 1)]
+    return distribution
+
+
+def _aggregate_category(category: Dict[str, Any]) -> Dict[str, Any]:
+    prices = []
+    discounted = 0
+    discount_total = 0
+    marker_counts = {'hot': 0, 'price_change': 0, 'time_limited': 0}
+    products = 0
+    for subcategory in category.get('subcategories', []):
+        for product in subcategory['products']:
+            products += 1
+            price = product.get('price')
+            if price is not None:
+                prices.append(price)
+            discount = product.get('discount_amount')
+            if discount:
+                discounted += 1
+                discount_total += discount
+            for marker in product.get('markers') or ():
+                if marker in marker_counts:
+                    marker_counts[marker] += 1
+    return {
+        'category_id': category['category_id'],
+        'category_name': category['category_name'],
+        'products': products,
+        'subcategories': len(category.get('subcategories', [])),
+        'prices': _price_distribution(prices),
+        'discounted': discounted,
+        'discount_total': discount_total,
+        'markers': marker_counts,
+        # 報價單類別摘要（_parse_category_stats）中的熱賣、價格異動、限時下殺等數量
+        'stats': category.get('stats') or {},
+    }
+
+
+def aggregate_snapshot(path: str) -> Dict[str, Any]:
+    """串流解析一份快照並彙總（在工作行程中執行）；不保留已彙總的類別"""
+    start = time.perf_counter()
+    size, mtime_ns = _signature(path)
+    encoding = _detect_encoding(path)
+    categories = []
+    for category in WorkingCoolPCParser(path).iter_categories(encoding=encoding):
+        categories.append(_aggregate_category(category))
+    return {
+        'batch_version': BATCH_VERSION,
+        'source': os.path.abspath(path),
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'taken_at': datetime.fromtimestamp(mtime_ns / 1e9).isoformat(timespec='seconds'),
+        'encoding': encoding,
+        'products': sum(category['products'] for category in categories),
+        'time_limited': sum(category['stats'].get('time_limited', 0) for category in categories),
+        'categories': categories,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def load_progress(output_file: str) -> Set[Tuple[str, int, int]]:
+    """讀取已輸出的快照；結尾不完整的一行（上次中斷時寫到一半）會被截掉"""
+    done = set()
+    if not os.path.exists(output_file):
+        return done
+    with open(output_file, 'rb+') as f:
+        data = f.read()
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            f.truncate(complete)
+    for line in data[:complete].splitlines():
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue
+        if row.get('batch_version') == BATCH_VERSION:
+            done.add((row['source'], row['size'], row['mtime_ns']))
+    return done
+
+
+def run_batch(paths: List[str], output_file: str, jobs: int = 1) -> Dict[str, int]:
+    """平行彙總快照並逐行附加到 output_file，回傳處理、略過與失敗的數量"""
+    done = load_progress(output_file)
+    pending = [path for path in paths if (os.path.abspath(path), *_signature(path)) not in done]
+    counts = {'processed': 0, 'skipped': len(paths) - len(pending), 'failed': 0}
+    if counts['skipped']:
+        print(f"略過已處理的 {counts['skipped']} 份快照")
+    if not pending:
+        return counts
+
+    workers = min(jobs if jobs > 0 else (os.cpu_count() or 1), len(pending))
+    # max_tasks_per_child 需要 Python 3.11 以上；較舊的版本工作行程不重新啟動
+    pool_options = {'max_tasks_per_child': TASKS_PER_WORKER} if sys.version_info >= (3, 11) else {}
+    with open(output_file, 'a', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers, **pool_options) as executor:
+        futures = {executor.submit(aggregate_snapshot, path): path for path in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                # 失敗的快照不寫入輸出，下次執行會重新處理
+                counts['failed'] += 1
+                print(f"解析失敗 {path}: {e}")
+                continue
+            # 每份快照寫完即 flush，中斷時最多只損失正在處理的快照
+            out.write(json.dumps(row, ensure_ascii=False))
+            out.write('\n')
+            out.flush()
+            counts['processed'] += 1
+            print(f"[{counts['processed'] + counts['failed']}/{len(pending)}] {path}: "
+                  f"{row['products']} 項商品 ({row['seconds']:.2f} 秒)")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='平行彙總封存的原價屋報價單快照')
+    parser.add_argument('snapshots', nargs='+', help='快照文件、目錄或萬用字元 (如 "archive/*.html")')
+    parser.add_argument('--output', required=True, help='彙總結果 JSON Lines 文件 (已存在時接續處理)')
+    parser.add_argument('--jobs', type=int, default=0, help='平行解析的行程數 (預設: 0，使用所有 CPU 核心)')
+
+    args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error('--jobs 不能小於 0')
+
+    paths = find_snapshots(args.snapshots)
+    if not paths:
+        print("找不到任何快照文件")
+        return
+
+    start = time.perf_counter()
+    counts = run_batch(paths, args.output, args.jobs)
+    print(f"批次完成 ({time.perf_counter() - start:.1f} 秒)：處理 {counts['processed']} / "
+          f"略過 {counts['skipped']} / 失敗 {counts['failed']}")
+    print(f"彙總結果已寫入 {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+預算組裝最佳化
+在預算內從 CPU、主機板、記憶體、SSD、顯示卡、電源、機殼各挑一項商品，滿足腳位、DDR 世代與機殼尺寸的相容性，
+使加權後的效能分數最高。
+
+1. 各類別依相容性分組（腳位、DDR 世代與模組規格、尺寸），組內只保留 Pareto 前緣：有更便宜且分數不低的商品時即淘汰。
+2. 以分支界限法依序挑選零件：剩餘零件的分數上限以「扣除其他零件最低價後買得起的最高分」估計，
+   上限不超過目前第 K 名時即剪枝。超過時間限制時回傳目前找到的結果。
+
+    python3 coolpc_build.py product.json --budget 40000 --top 5
+"""
+
+import re
+import json
+import time
+import heapq
+import bisect
+import argparse
+from typing import List, Dict, Any, Callable, Iterable, Optional
+
+from coolpc_compat import CPU_CATEGORY, BOARD_CATEGORY, MEMORY_CATEGORY, SOCKET_DDR, dimm_type, memory_slot
+from coolpc_attributes import FORM_FACTORS
+
+DEFAULT_TOP_K = 5
+DEFAULT_TIME_LIMIT = 2.0
+# 分數相同的配置以較便宜者優先；浮點加總順序不同造成的誤差在此範圍內視為同分
+_SCORE_EPSILON = 1e-9
+
+_CORES = re.compile(r'(\d+)核')
+_GHZ = re.compile(r'(\d+(?:\.\d+)?)\s*GHz', re.IGNORECASE)
+
+# 主機板晶片組等級（以晶片組字首判斷）
+CHIPSET_TIERS = {'X': 3, 'Z': 3, 'B': 2, 'H': 1, 'A': 1}
+
+
+def _cpu_score(product: Dict[str, Any], attributes: Dict[str, Any]) -> Optional[float]:
+    text = product.get('raw_text') or ''
+    cores = _CORES.search(text)
+    ghz = _GHZ.search(text)
+    if not cores:
+        return None
+    return int(cores.group(1)) * 10 + (float(ghz.group(1)) if ghz else 0)
+
+
+def _board_score(product: Dict[str, Any], attributes: Dict[str, Any]) -> Optional[float]:
+    return CHIPSET_TIERS.get((attributes.get('chipset') or ' ')[0], 1)
+
+
+def _memory_score(product: Dict[str, Any], attributes: Dict[str, Any]) -> Optional[float]:
+    capacity = attributes.get('capacity_gb')
+    return capacity + attributes.get('mhz', 0) / 1000 if capacity else None
+
+
+def _ssd_score(product: Dict[str, Any], attributes: Dict[str, Any]) -> Optional[float]:
+    return attributes.get('capacity_gb')
+
+
+def _vga_score(product: Dict[str, Any], attributes: Dict[str, Any]) -> Optional[float]:
+    # rank_score 為型號等級（配件為負分）；同等級再以顯示記憶體區分
+    score = (product.get('rank_score') or 0) + attributes.get('vram_gb', 0) * 10
+    return score if score > 0 else None
+
+
+def _psu_score(product: Dict[str, Any], attributes: Dict[str, Any]) -> Optional[float]:
+    watts = attributes.get('watts')
+    # 瓦數過低的是風扇、線材等配件
+    return watts if watts is not None and 300 <= watts <= 2000 else None
+
+
+def _case_score(product: Dict[str, Any], attributes: Dict[str, Any]) -> Optional[float]:
+    return 1 if attributes.get('form_factor') else None
+
+
+# 組裝零件：(名稱, 類別編號, 權重, 分數函式)；分數為 None 的商品（配件、缺少規格）不列入候選。
+# 各零件的分數先除以該零件的最高分正規化為 0~1，再乘上權重加總
+BUILD_SLOTS = (
+    ('CPU', CPU_CATEGORY, 0.25, _cpu_score),
+    ('MB', BOARD_CATEGORY, 0.05, _board_score),
+    ('RAM', MEMORY_CATEGORY, 0.10, _memory_score),
+    ('SSD', '7', 0.10, _ssd_score),
+    ('VGA', '12', 0.40, _vga_score),
+    ('PSU', '15', 0.10, _psu_score),
+    ('CASE', '14', 0.0, _case_score),
+)
+SLOT_NAMES = tuple(slot[0] for slot in BUILD_SLOTS)
+
+
+class _Candidate:
+    """候選商品：price、value（加權後的分數）與相容性屬性"""
+
+    __slots__ = ('price', 'value', 'product', 'category_id', 'socket', 'ddr', 'form_factor')
+
+    def __init__(self, price: int, value: float, product: Dict[str, Any], category_id: str,
+                 socket: Optional[str], ddr: Optional[str], form_factor: Optional[str]):
+        self.price = price
+        self.value = value
+        self.product = product
+        self.category_id = category_id
+        self.socket = socket
+        self.ddr = ddr
+        self.form_factor = form_factor
+
+
+def pareto_frontier(candidates: Iterable[_Candidate]) -> List[_Candidate]:
+    """只保留沒有被支配的商品（依價格由低到高，分數也隨之遞增）"""
+    frontier = []
+    best = float('-inf')
+    for candidate in sorted(candidates, key=lambda c: (c.price, -c.value)):
+        if candidate.value > best:
+            frontier.append(candidate)
+            best = candidate.value
+    return frontier
+
+
+def _grouped_frontier(candidates: List[_Candidate], key: Callable[[_Candidate], Any]) -> Dict[Any, List[_Candidate]]:
+    groups = {}
+    for candidate in candidates:
+        groups.setdefault(key(candidate), []).append(candidate)
+    return {group: pareto_frontier(members) for group, members in groups.items()}
+
+
+def _merge(groups: Iterable[List[_Candidate]]) -> List[_Candidate]:
+    return sorted((candidate for group in groups for candidate in group), key=lambda c: c.price)
+
+
+def _upper_hull(frontier: List[_Candidate]) -> List[_Candidate]:
+    """Pareto 前緣的上凸包（每元增加的分數遞減）"""
+    hull = []
+    for candidate in pareto_frontier(frontier):
+        while len(hull) >= 2 and (hull[-1].value - hull[-2].value) * (candidate.price - hull[-1].price) <= \
+                (candidate.value - hull[-1].value) * (hull[-1].price - hull[-2].price):
+            hull.pop()
+        hull.append(candidate)
+    return hull
+
+
+def _case_fits(case_form_factor: str, board_form_factor: Optional[str]) -> bool:
+    # 機殼的 form_factor 為支援的最大尺寸（FORM_FACTORS 由大到小）
+    if board_form_factor is None:
+        return True
+    return FORM_FACTORS.index(case_form_factor) <= FORM_FACTORS.index(board_form_factor)
+
+
+class BuildOptimizer:
+    """由解析結果建立各零件的 Pareto 前緣，之後可重複以不同預算查詢"""
+
+    def __init__(self, categories: List[Dict[str, Any]], slots: Optional[Iterable[str]] = None):
+        wanted = set(slots) if slots is not None else set(SLOT_NAMES)
+        unknown = wanted - set(SLOT_NAMES)
+        if unknown:
+            raise ValueError(f"未知的零件: {', '.join(sorted(unknown))}")
+        self.slots = [slot for slot in BUILD_SLOTS if slot[0] in wanted]
+        by_category = {category['category_id']: category for category in categories}
+
+        raw = {}
+        for name, category_id, weight, scorer in self.slots:
+            scored = []
+            category = by_category.get(category_id)
+            for subcategory in (category or {}).get('subcategories', []):
+                for product in subcategory['products']:
+                    price = product.get('price')
+                    if not price:
+                        continue
+                    attributes = product.get('attributes') or {}
+                    score = scorer(product, attributes)
+                    if score is None:
+                        continue
+                    socket = attributes.get('socket')
+                    ddr = attributes.get('ddr')
+                    if name == 'MB':
+                        ddr = ddr or SOCKET_DDR.get(socket)
+                    if (name in ('CPU', 'MB') and not socket) or (name in ('MB', 'RAM') and not ddr):
+                        continue
+                    if name in ('MB', 'RAM'):
+                        # 記憶體插槽以 DDR 世代與模組規格 (DIMM / SO-DIMM) 比對
+                        ddr = memory_slot(ddr, dimm_type(product, subcategory['name']))
+                    scored.append((price, score, product, socket, ddr, attributes.get('form_factor')))
+            top = max((item[1] for item in scored), default=0) or 1
+            raw[name] = [_Candidate(price, weight * score / top, product, category_id, socket, ddr, form_factor)
+                         for price, score, product, socket, ddr, form_factor in scored]
+
+        # 依相容性分組後各自取 Pareto 前緣
+        self.by_socket = {}
+        self.by_ddr = {}
+        self.by_form_factor = {}
+        self.frontiers = {}
+        for name, candidates in raw.items():
+            if name == 'CPU':
+                groups = _grouped_frontier(candidates, lambda c: c.socket)
+            elif name == 'MB':
+                groups = _grouped_frontier(candidates, lambda c: (c.socket, c.ddr, c.form_factor))
+                for socket in {group[0] for group in groups}:
+                    self.by_socket[socket] = _merge(members for group, members in groups.items() if group[0] == socket)
+            elif name == 'RAM':
+                groups = self.by_ddr = _grouped_frontier(candidates, lambda c: c.ddr)
+            elif name == 'CASE':
+                groups = _grouped_frontier(candidates, lambda c: c.form_factor)
+                # 每種主機板尺寸可用的機殼：支援該尺寸以上的機殼取 Pareto 前緣
+                self.by_form_factor = {
+                    form_factor: pareto_frontier(c for case_ff, members in groups.items()
+                                                 if _case_fits(case_ff, form_factor) for c in members)
+                    for form_factor in FORM_FACTORS
+                }
+            else:
+                groups = {None: pareto_frontier(candidates)}
+            self.frontiers[name] = _merge(groups.values())
+
+        # 分數上限：多選一背包問題的線性鬆弛。各零件取 Pareto 前緣的上凸包，從最便宜的商品出發，
+        # 依每元增加的分數由高到低加入升級，最後一項可只取一部分；不考慮相容性，因此不會低於實際可達的分數。
+        # 預先算好從第 i 個零件開始的升級清單與累計價格，查詢時只需一次二分搜尋
+        # 各候選清單（依價格由低到高）的價格與前綴最高分，搜尋時用來略過買不起的商品及提早結束
+        self._list_info = {}
+        for candidate_list in [*self.frontiers.values(), *self.by_socket.values(), *self.by_ddr.values(),
+                               *self.by_form_factor.values()]:
+            prefix_max = []
+            top = float('-inf')
+            for candidate in candidate_list:
+                top = max(top, candidate.value)
+                prefix_max.append(top)
+            self._list_info[id(candidate_list)] = ([candidate.price for candidate in candidate_list], prefix_max)
+
+        hulls = {name: _upper_hull(frontier) for name, frontier in self.frontiers.items()}
+        self._suffix_bounds = []
+        names = [slot[0] for slot in self.slots]
+        for i in range(len(names) + 1):
+            rest = [hulls[name] for name in names[i:]]
+            if any(not hull for hull in rest):
+                self._suffix_bounds.append(None)
+                continue
+            steps = sorted(((b.value - a.value) / (b.price - a.price), b.price - a.price, b.value - a.value)
+                           for hull in rest for a, b in zip(hull, hull[1:]))
+            steps.reverse()
+            prices = []
+            values = []
+            total_price = total_value = 0
+            for _, step_price, step_value in steps:
+                total_price += step_price
+                total_value += step_value
+                prices.append(total_price)
+                values.append(total_value)
+            self._suffix_bounds.append((sum(hull[0].price for hull in rest), sum(hull[0].value for hull in rest),
+                                        prices, values, [step[0] for step in steps]))
+
+    def _upper_bound(self, i: int, remaining: int) -> float:
+        """從第 i 個零件開始，以 remaining 元能得到的分數上限"""
+        base_price, base_value, prices, values, slopes = self._suffix_bounds[i]
+        spare = remaining - base_price
+        if spare < 0:
+            return float('-inf')
+        k = bisect.bisect_right(prices, spare)
+        bound = base_value + (values[k - 1] if k else 0)
+        if k < len(slopes):
+            bound += (spare - (prices[k - 1] if k else 0)) * slopes[k]
+        return bound
+
+    def candidate_counts(self) -> Dict[str, int]:
+        return {name: len(frontier) for name, frontier in self.frontiers.items()}
+
+    def _candidates(self, name: str, chosen: Dict[str, _Candidate]) -> List[_Candidate]:
+        """依已選的零件取出相容的候選商品（依價格由低到高）"""
+        if name == 'MB' and 'CPU' in chosen:
+            return self.by_socket.get(chosen['CPU'].socket, [])
+        if name == 'RAM' and 'MB' in chosen:
+            return self.by_ddr.get(chosen['MB'].ddr, [])
+        if name == 'CASE' and 'MB' in chosen and chosen['MB'].form_factor:
+            return self.by_form_factor.get(chosen['MB'].form_factor, [])
+        return self.frontiers[name]
+
+    def optimize(self, budget: int, top_k: int = DEFAULT_TOP_K,
+                 time_limit: float = DEFAULT_TIME_LIMIT) -> Dict[str, Any]:
+        """回傳預算內分數最高的前 top_k 組配置；complete 為 False 表示在時間限制內未搜尋完"""
+        names = [slot[0] for slot in self.slots]
+        if self._suffix_bounds[0] is None:
+            return {'builds': [], 'complete': True, 'nodes': 0}
+
+        deadline = time.perf_counter() + time_limit
+        best = []  # (value, -price, 序號, 配置) 的最小堆積，只保留前 top_k 組
+        chosen = {}
+        state = {'nodes': 0, 'timed_out': False, 'sequence': 0}
+        upper_bound = self._upper_bound
+
+        def beaten(bound: float, min_price: int) -> bool:
+            # 分數上限低於第 K 名，或最多只能同分且最低總價不比第 K 名便宜
+            kth_value, kth_price = best[0][0], -best[0][1]
+            return bound < kth_value - _SCORE_EPSILON or (bound <= kth_value + _SCORE_EPSILON and min_price >= kth_price)
+
+        def search(i: int, remaining: int, value: float):
+            if i == len(names):
+                entry = (round(value, 9), remaining - budget, state['sequence'], dict(chosen))
+                state['sequence'] += 1
+                if len(best) < top_k:
+                    heapq.heappush(best, entry)
+                elif entry[:2] > best[0][:2]:
+                    heapq.heapreplace(best, entry)
+                return
+
+            state['nodes'] += 1
+            if state['nodes'] & 1023 == 0 and time.perf_counter() > deadline:
+                state['timed_out'] = True
+            if state['timed_out']:
+                return
+
+            candidates = self._candidates(names[i], chosen)
+            if not candidates:
+                return
+            prices, prefix_max = self._list_info[id(candidates)]
+            full = len(best) == top_k
+            # 後面的零件最多能拿到的分數（本零件至少花最低價）
+            rest_bound = upper_bound(i + 1, remaining - prices[0])
+            # 只考慮扣掉後面零件最低總價後仍買得起的商品
+            affordable = bisect.bisect_right(prices, remaining - self._suffix_bounds[i + 1][0])
+            # 此分支的最低總價（本零件及後面的零件都取最低價）
+            min_price = budget - remaining + prices[0] + self._suffix_bounds[i + 1][0]
+            # 由高分（高價）往低分嘗試，較早找到好的配置可剪掉更多分支
+            for position in range(affordable - 1, -1, -1):
+                # 剩下較便宜的候選商品再好也無法勝過第 K 名時即停止；與第 K 名同分但較便宜的配置仍要保留
+                if full and beaten(value + prefix_max[position] + rest_bound, min_price):
+                    break
+                candidate = candidates[position]
+                rest = remaining - candidate.price
+                child_value = value + candidate.value
+                bound = child_value + upper_bound(i + 1, rest)
+                if bound == float('-inf') or \
+                        (full and beaten(bound, budget - rest + self._suffix_bounds[i + 1][0])):
+                    continue
+                chosen[names[i]] = candidate
+                search(i + 1, rest, child_value)
+                if state['timed_out']:
+                    break
+                full = len(best) == top_k
+            chosen.pop(names[i], None)
+
+        search(0, budget, 0.0)
+
+        builds = []
+        for value, _, _, parts in sorted(best, key=lambda entry: (-entry[0], -entry[1])):
+            builds.append({
+                'score': round(value * 100, 2),
+                'total_price': sum(candidate.price for candidate in parts.values()),
+                'parts': {name: {'category_id': parts[name].category_id, **parts[name].product} for name in names}
+            })
+        return {'builds': builds, 'complete': not state['timed_out'], 'nodes': state['nodes']}
+
+
+def optimize_build(categories: List[Dict[str, Any]], budget: int, top_k: int = DEFAULT_TOP_K,
+                   time_limit: float = DEFAULT_TIME_LIMIT, slots: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """在預算內找出分數最高的前 top_k 組配置（只查詢一次時使用；多次查詢請重複使用 BuildOptimizer）"""
+    return BuildOptimizer(categories, slots).optimize(budget, top_k, time_limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='在預算內挑選效能最高的組裝配置')
+    parser.add_argument('json_file', help='coolpc_parser.py 匯出的 JSON 文件')
+    parser.add_argument('--budget', type=int, required=True, help='總預算 (NT$)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_K, help=f'列出前幾組配置 (預設: {DEFAULT_TOP_K})')
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT,
+                        help=f'搜尋時間上限秒數 (預設: {DEFAULT_TIME_LIMIT:g})')
+    parser.add_argument('--without', nargs='+', default=[], choices=SLOT_NAMES,
+                        help='不需要的零件 (如內顯不需 VGA)')
+
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        categories = json.load(f)
+
+    start = time.perf_counter()
+    optimizer = BuildOptimizer(categories, [name for name in SLOT_NAMES if name not in args.without])
+    result = optimizer.optimize(args.budget, args.top, args.time_limit)
+    elapsed = time.perf_counter() - start
+
+    counts = ', '.join(f"{name} {count}" for name, count in optimizer.candidate_counts().items())
+    print(f"候選商品 (Pareto 前緣): {counts}")
+    for rank, build in enumerate(result['builds'], 1):
+        print(f"\n#{rank}  分數 {build['score']}  總價 ${build['total_price']:,}")
+        for name, product in build['parts'].items():
+            print(f"  {name:<5} ${product['price']:>7,}  {product['raw_text']}")
+    if not result['builds']:
+        print("預算內找不到符合相容性的配置")
+    note = '' if result['complete'] else '，已達時間上限，結果可能不是最佳'
+    print(f"\n搜尋 {result['nodes']} 個節點 ({elapsed:.2f} 秒){note}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原價屋快照欄位式二進位格式
+價格、原價、折扣、類別、標記等以固定寬度的欄位連續存放，文字欄位存成字串表的編號；
+讀取時以 mmap 開啟，只在存取到的欄位才建立 memoryview，商品以延遲讀取的 view 提供，
+不需要像 JSON 一樣先解析整份檔案。規格屬性（coolpc_attributes）每項各存成一個欄位，
+篩選時直接掃描整個欄位，不需讀取商品文字。
+
+檔案結構（little-endian）：
+    header  : magic(4s) version(H) reserved(H) product_count(I) meta_length(I)
+    meta    : UTF-8 JSON，類別/子分類結構與各欄位、字串表的位置
+    columns : 每個欄位一段連續陣列，起點對齊 8 位元組
+    strings : 字串起點陣列 (I × (字串數 + 1)) 與 UTF-8 內容
+"""
+
+import re
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+from array import array
+from typing import List, Dict, Any, Iterator, Optional, Set
+
+from coolpc_compact import PRODUCT_FIELDS, markers_to_bits, bits_to_markers
+from coolpc_attributes import NUMERIC_ATTRIBUTES, ENUM_ATTRIBUTES
+
+MAGIC = b'CPCS'
+FORMAT_VERSION = 4
+_HEADER = struct.Struct('<4sHHII')
+
+# 整數欄位中代表 None 的值
+NULL_INT = -2 ** 31
+# 字串欄位中代表 None 的編號
+NULL_STRING = 0xFFFFFFFF
+# 規格清單以此字元串接存成單一字串
+SPEC_SEPARATOR = '\x1f'
+
+# 欄位名稱與 array typecode
+INT_COLUMNS = ('price', 'original_price', 'discount_amount', 'rank_score')
+STRING_COLUMNS = ('index', 'product_id', 'group', 'brand', 'model', 'specs', 'raw_text')
+COLUMN_TYPES = {
+    **{name: 'i' for name in INT_COLUMNS},
+    'category': 'H',
+    'marker_bits': 'H',
+    **{name: 'I' for name in STRING_COLUMNS},
+    **{name: 'i' for name in NUMERIC_ATTRIBUTES},
+    **{name: 'I' for name in ENUM_ATTRIBUTES},
+}
+
+# --where 條件，如 capacity_gb>=1000、socket=AM5
+_WHERE_PATTERN = re.compile(r'^(\w+)\s*(>=|<=|=)\s*(.+)$')
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pad(length: int) -> bytes:
+    return b'\0' * (-length % 8)
+
+
+def write_columnar(categories: List[Dict[str, Any]], output_file: str):
+    """將解析結果寫成欄位式二進位快照"""
+    columns = {name: array(typecode) for name, typecode in COLUMN_TYPES.items()}
+    string_ids = {}
+    strings = []
+
+    def string_id(value: Optional[str]) -> int:
+        if value is None:
+            return NULL_STRING
+        sid = string_ids.get(value)
+        if sid is None:
+            sid = string_ids[value] = len(strings)
+            strings.append(value)
+        return sid
+
+    def int_value(value: Optional[int]) -> int:
+        return NULL_INT if value is None else value
+
+    meta_categories = []
+    for cat_pos, category in enumerate(categories):
+        subcategories = []
+        for subcategory in category.get('subcategories', []):
+            start = len(columns['price'])
+            for product in subcategory['products']:
+                for name in INT_COLUMNS:
+                    columns[name].append(int_value(product.get(name)))
+                columns['category'].append(cat_pos)
+                columns['marker_bits'].append(markers_to_bits(product.get('markers', [])))
+                columns['index'].append(string_id(product.get('index')))
+                columns['product_id'].append(string_id(product.get('product_id')))
+                columns['group'].append(string_id(product.get('group')))
+                columns['brand'].append(string_id(product.get('brand')))
+                columns['model'].append(string_id(product.get('model')))
+                columns['specs'].append(string_id(SPEC_SEPARATOR.join(product.get('specs', []))))
+                columns['raw_text'].append(string_id(product.get('raw_text')))
+                attributes = product.get('attributes') or {}
+                for name in NUMERIC_ATTRIBUTES:
+                    columns[name].append(int_value(attributes.get(name)))
+                for name in ENUM_ATTRIBUTES:
+                    columns[name].append(string_id(attributes.get(name)))
+            subcategories.append({'name': subcategory['name'], 'start': start, 'end': len(columns['price'])})
+        meta_categories.append({
+            **{key: value for key, value in category.items() if key != 'subcategories'},
+            'subcategories': subcategories
+        })
+
+    encoded = [value.encode('utf-8') for value in strings]
+    string_offsets = array('I', [0])
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+
+    # 先計算各區段位置，再寫入 meta（meta 長度會影響後面的位置，因此反覆計算到穩定為止；
+    # 寫入的是最後一次計算的 meta，其中的位置才與實際長度相符）
+    sections = [(name, _to_little_endian(values)) for name, values in columns.items()]
+    sections.append(('string_offsets', _to_little_endian(string_offsets)))
+    sections.append(('string_data', b''.join(encoded)))
+
+    meta = {'categories': meta_categories, 'sections': {}}
+    meta_bytes = b''
+    while True:
+        position = _HEADER.size + len(meta_bytes)
+        position += len(_pad(position))
+        layout = {}
+        for name, data in sections:
+            layout[name] = [position, len(data)]
+            position += len(data) + len(_pad(len(data)))
+        meta['sections'] = layout
+        new_meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        stable = len(new_meta_bytes) == len(meta_bytes)
+        meta_bytes = new_meta_bytes
+        if stable:
+            break
+
+    with open(output_file, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(columns['price']), len(meta_bytes)))
+        f.write(meta_bytes)
+        f.write(_pad(_HEADER.size + len(meta_bytes)))
+        for name, data in sections:
+            f.write(data)
+            f.write(_pad(len(data)))
+
+
+class ProductView:
+    """單一商品的延遲讀取 view，只在存取屬性時讀取對應欄位"""
+
+    __slots__ = ('_snapshot', 'position')
+
+    def __init__(self, snapshot: 'ColumnarSnapshot', position: int):
+        self._snapshot = snapshot
+        self.position = position
+
+    def __getitem__(self, key: str) -> Any:
+        snapshot = self._snapshot
+        if key in INT_COLUMNS:
+            value = snapshot.column(key)[self.position]
+            return None if value == NULL_INT else value
+        if key == 'specs':
+            specs = snapshot.string(snapshot.column('specs')[self.position])
+            return specs.split(SPEC_SEPARATOR) if specs else []
+        if key in STRING_COLUMNS:
+            return snapshot.string(snapshot.column(key)[self.position])
+        if key == 'markers':
+            return bits_to_markers(snapshot.column('marker_bits')[self.position])
+        if key == 'attributes':
+            attributes = {}
+            for name in NUMERIC_ATTRIBUTES:
+                value = snapshot.column(name)[self.position]
+                if value != NULL_INT:
+                    attributes[name] = value
+            for name in ENUM_ATTRIBUTES:
+                value = snapshot.column(name)[self.position]
+                if value != NULL_STRING:
+                    attributes[name] = snapshot.string(value)
+            return attributes
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    @property
+    def category_id(self) -> str:
+        category_pos = self._snapshot.column('category')[self.position]
+        return self._snapshot.categories[category_pos]['category_id']
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉回與 _parse_product 相同的 dict 格式"""
+        return {key: self[key] for key in PRODUCT_FIELDS}
+
+
+class ColumnarSnapshot:
+    """以 mmap 開啟的欄位式快照"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.product_count, meta_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是欄位式快照文件: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"不支援的快照版本: {version}")
+        meta = json.loads(self._mmap[_HEADER.size:_HEADER.size + meta_length].decode('utf-8'))
+        self.categories = meta['categories']
+        self._sections = meta['sections']
+        self._columns = {}
+
+    def close(self):
+        # 先釋放所有 memoryview，mmap 才能關閉
+        for values in self._columns.values():
+            if isinstance(values, memoryview):
+                values.release()
+        self._columns.clear()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.product_count
+
+    def _section(self, name: str, typecode: str):
+        offset, length = self._sections[name]
+        if sys.byteorder == 'little':
+            return memoryview(self._mmap)[offset:offset + length].cast(typecode)
+        values = array(typecode, self._mmap[offset:offset + length])
+        values.byteswap()
+        return values
+
+    def column(self, name: str):
+        """取得欄位（第一次存取時才建立 memoryview，不複製資料）"""
+        values = self._columns.get(name)
+        if values is None:
+            typecode = 'I' if name == 'string_offsets' else COLUMN_TYPES[name]
+            values = self._columns[name] = self._section(name, typecode)
+        return values
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NULL_STRING:
+            return None
+        offsets = self.column('string_offsets')
+        base = self._sections['string_data'][0]
+        return self._mmap[base + offsets[string_id]:base + offsets[string_id + 1]].decode('utf-8')
+
+    def product(self, position: int) -> ProductView:
+        return ProductView(self, position)
+
+    def iter_products(self, category_id: Optional[str] = None) -> Iterator[ProductView]:
+        """依序產生商品 view，可限定類別"""
+        for category in self.categories:
+            if category_id is not None and category['category_id'] != str(category_id):
+                continue
+            for subcategory in category['subcategories']:
+                for position in range(subcategory['start'], subcategory['end']):
+                    yield ProductView(self, position)
+
+    def attribute_positions(self, name: str, value: Optional[str] = None,
+                            minimum: Optional[int] = None, maximum: Optional[int] = None) -> Set[int]:
+        """以整個屬性欄位篩選，回傳符合條件的商品位置（數值屬性用 minimum/maximum，列舉屬性用 value）"""
+        values = self.column(name)
+        if name in ENUM_ATTRIBUTES:
+            # 欄位中出現的字串編號各只解碼一次
+            matched_ids = {sid for sid in set(values) if sid != NULL_STRING and self.string(sid) == value}
+            return {position for position, sid in enumerate(values) if sid in matched_ids}
+        low = minimum if minimum is not None else NULL_INT + 1
+        high = maximum if maximum is not None else 2 ** 31 - 1
+        return {position for position, number in enumerate(values) if low <= number <= high}
+
+    def to_categories(self) -> List[Dict[str, Any]]:
+        """完整還原成 parse_html 的輸出格式"""
+        return [
+            {
+                **{key: value for key, value in category.items() if key != 'subcategories'},
+                'subcategories': [
+                    {
+                        'name': subcategory['name'],
+                        'products': [ProductView(self, position).to_dict()
+                                     for position in range(subcategory['start'], subcategory['end'])]
+                    }
+                    for subcategory in category['subcategories']
+                ]
+            }
+            for category in self.categories
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='讀取欄位式快照並列出最便宜的商品')
+    parser.add_argument('snapshot', help='coolpc_parser.py --columnar 匯出的快照文件')
+    parser.add_argument('--category', help='類別編號 (如 4 = CPU、12 = 顯示卡)')
+    parser.add_argument('--limit', type=int, default=10, help='結果數量限制 (預設: 10)')
+    parser.add_argument('--where', action='append', default=[], metavar='條件',
+                        help='規格屬性條件，可重複指定 (如 capacity_gb>=1000、socket=AM5)')
+
+    args = parser.parse_args()
+
+    conditions = []
+    for condition in args.where:
+        match = _WHERE_PATTERN.match(condition)
+        if not match or match.group(1) not in NUMERIC_ATTRIBUTES + ENUM_ATTRIBUTES:
+            parser.error(f"無效的條件: {condition}")
+        name, operator, value = match.groups()
+        if name in NUMERIC_ATTRIBUTES:
+            if not value.isdigit():
+                parser.error(f"{name} 必須是整數: {condition}")
+            value = int(value)
+            conditions.append((name, None, value if operator in ('>=', '=') else None,
+                               value if operator in ('<=', '=') else None))
+        elif operator != '=':
+            parser.error(f"{name} 只能使用 = 比對: {condition}")
+        else:
+            conditions.append((name, value, None, None))
+
+    start = time.perf_counter()
+    with ColumnarSnapshot(args.snapshot) as snapshot:
+        opened = time.perf_counter()
+        prices = snapshot.column('price')
+        allowed = None
+        for name, value, minimum, maximum in conditions:
+            positions = snapshot.attribute_positions(name, value, minimum, maximum)
+            allowed = positions if allowed is None else allowed & positions
+        products = [view for view in snapshot.iter_products(args.category)
+                    if prices[view.position] != NULL_INT and (allowed is None or view.position in allowed)]
+        products.sort(key=lambda view: prices[view.position])
+        for view in products[:args.limit]:
+            print(f"${view['price']}  {view['raw_text']}")
+        print(f"\n開啟快照: {(opened - start) * 1000:.2f} ms，共 {len(snapshot)} 項商品")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+精簡商品資料模型
+以 __slots__ 記錄類別取代每個商品的 dict：品牌、群組、子分類等重複字串共用同一物件（intern），
+特殊標記以位元旗標保存，規格屬性以 (名稱, 值) tuple 保存；可無損轉回 _parse_product 的 dict 格式供匯出使用。
+"""
+
+import sys
+import gc
+import argparse
+import tracemalloc
+from typing import List, Dict, Any, Optional
+
+# 特殊標記與位元旗標對照（順序與 _extract_markers 產生的順序相同）
+MARKER_NAMES = (
+    'discussion',
+    'image',
+    'hot',
+    'price_change',
+    'hot_and_price_change',
+    'time_limited',
+    'pre_order',
+    'cool_coin_discount',
+)
+MARKER_BITS = {name: 1 << i for i, name in enumerate(MARKER_NAMES)}
+
+# _parse_product 產生的 dict 欄位（依原本順序）
+PRODUCT_FIELDS = ('index', 'product_id', 'group', 'brand', 'model', 'specs', 'price',
+                  'original_price', 'discount_amount', 'markers', 'raw_text', 'attributes', 'rank_score')
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def markers_to_bits(markers: List[str]) -> int:
+    """將標記清單轉為位元旗標"""
+    bits = 0
+    for marker in markers:
+        bits |= MARKER_BITS[marker]
+    return bits
+
+
+def bits_to_markers(bits: int) -> List[str]:
+    """將位元旗標轉回標記清單"""
+    return [name for name in MARKER_NAMES if bits & MARKER_BITS[name]]
+
+
+class CompactProduct:
+    """以 __slots__ 保存的商品記錄，支援 get() / [] 讀取以相容原本的 dict 用法"""
+
+    __slots__ = ('index', 'product_id', 'group', 'brand', 'model', 'specs', 'price',
+                 'original_price', 'discount_amount', 'marker_bits', 'raw_text', 'attributes', 'rank_score')
+
+    def __init__(self, index, group, brand, model, specs, price,
+                 original_price, discount_amount, marker_bits, raw_text, attributes=(), rank_score=0,
+                 product_id=None):
+        self.index = index
+        self.product_id = product_id
+        self.group = group
+        self.brand = brand
+        self.model = model
+        self.specs = specs
+        self.price = price
+        self.original_price = original_price
+        self.discount_amount = discount_amount
+        self.marker_bits = marker_bits
+        self.raw_text = raw_text
+        self.attributes = attributes
+        self.rank_score = rank_score
+
+    @classmethod
+    def from_dict(cls, product: Dict[str, Any]) -> 'CompactProduct':
+        """由 _parse_product 的 dict 建立精簡記錄"""
+        index = product['index']
+        # 商品序號通常是十進位數字字串，以整數保存；其他格式則原樣保留
+        if index.isdigit() and str(int(index)) == index:
+            index = int(index)
+        return cls(
+            index,
+            _intern(product.get('group')),
+            _intern(product.get('brand')),
+            _intern(product.get('model')),
+            tuple(sys.intern(spec) for spec in product.get('specs', [])),
+            product.get('price'),
+            product.get('original_price'),
+            product.get('discount_amount'),
+            markers_to_bits(product.get('markers', [])),
+            product.get('raw_text'),
+            tuple((sys.intern(name), _intern(value) if isinstance(value, str) else value)
+                  for name, value in (product.get('attributes') or {}).items()),
+            product.get('rank_score', 0),
+            product.get('product_id')
+        )
+
+    @property
+    def markers(self) -> List[str]:
+        return bits_to_markers(self.marker_bits)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉回與 _parse_product 相同的 dict 格式"""
+        return {
+            'index': str(self.index),
+            'product_id': self.product_id,
+            'group': self.group,
+            'brand': self.brand,
+            'model': self.model,
+            'specs': list(self.specs),
+            'price': self.price,
+            'original_price': self.original_price,
+            'discount_amount': self.discount_amount,
+            'markers': bits_to_markers(self.marker_bits),
+            'raw_text': self.raw_text,
+            'attributes': dict(self.attributes),
+            'rank_score': self.rank_score
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'index':
+            return str(self.index)
+        if key == 'specs':
+            return list(self.specs)
+        if key == 'markers':
+            return self.markers
+        if key == 'attributes':
+            return dict(self.attributes)
+        if key in PRODUCT_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in PRODUCT_FIELDS else default
+
+
+def product_to_dict(product) -> Dict[str, Any]:
+    """將商品（dict 或 CompactProduct）轉為 dict 格式"""
+    return product.to_dict() if isinstance(product, CompactProduct) else product
+
+
+def compact_categories(categories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """將解析結果中的商品轉為 CompactProduct（類別與子分類結構不變）"""
+    compacted = []
+    for category in categories:
+        compacted.append({
+            **category,
+            'category_name': sys.intern(category['category_name']),
+            'subcategories': [
+                {
+                    'name': sys.intern(subcategory['name']),
+                    'products': [CompactProduct.from_dict(product) for product in subcategory['products']]
+                }
+                for subcategory in category.get('subcategories', [])
+            ]
+        })
+    return compacted
+
+
+def expand_categories(categories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """將精簡格式轉回原本的 dict 結構"""
+    return [
+        {
+            **category,
+            'subcategories': [
+                {
+                    'name': subcategory['name'],
+                    'products': [product_to_dict(product) for product in subcategory['products']]
+                }
+                for subcategory in category.get('subcategories', [])
+            ]
+        }
+        for category in categories
+    ]
+
+
+def benchmark_memory(html_file: str) -> Dict[str, int]:
+    """比較 dict 與 CompactProduct 兩種格式保存整份報價單所佔用的記憶體（位元組）"""
+    from coolpc_parser import WorkingCoolPCParser
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        categories = WorkingCoolPCParser(html_file).parse_html()
+        gc.collect()
+        dict_bytes = tracemalloc.get_traced_memory()[0] - base
+
+        compacted = compact_categories(categories)
+        del categories
+        gc.collect()
+        compact_bytes = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+
+    product_count = sum(len(subcategory['products'])
+                        for category in compacted
+                        for subcategory in category['subcategories'])
+    return {
+        'products': product_count,
+        'dict_bytes': dict_bytes,
+        'compact_bytes': compact_bytes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比較 dict 與精簡商品格式的記憶體用量')
+    parser.add_argument('input_file', nargs='?', default='evaluate.html', help='輸入的 HTML 文件路徑 (預設: evaluate.html)')
+
+    args = parser.parse_args()
+
+    result = benchmark_memory(args.input_file)
+    products = max(result['products'], 1)
+    print(f"商品總數: {result['products']}")
+    print(f"dict 格式: {result['dict_bytes'] / 1024 / 1024:.2f} MB ({result['dict_bytes'] / products:.0f} bytes/商品)")
+    print(f"精簡格式: {result['compact_bytes'] / 1024 / 1024:.2f} MB ({result['compact_bytes'] / products:.0f} bytes/商品)")
+    print(f"節省: {(1 - result['compact_bytes'] / max(result['dict_bytes'], 1)) * 100:.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CPU、主機板、記憶體相容性索引
+解析完成後依規格屬性（coolpc_attributes）預先建立：腳位 -> CPU / 主機板、DDR 世代與模組規格
+（桌上型 DIMM / 筆記型 SO-DIMM）-> 主機板 / 記憶體，
+各清單依價格排序。查詢「這顆 CPU 可用的主機板」或「這片主機板可用的記憶體」只需查一次字典，
+不必在查詢時交叉比對字串。與 --json 匯出一併存檔 (product.json -> product.compat.json)。
+"""
+
+import re
+import json
+import argparse
+from typing import List, Dict, Any, Optional
+
+COMPAT_VERSION = 2
+
+CPU_CATEGORY = '4'
+BOARD_CATEGORY = '5'
+MEMORY_CATEGORY = '6'
+
+# 只支援單一 DDR 世代的腳位；主機板文字沒有寫出 DDR 時以此推定（LGA1700 兩種都有，無法推定）
+SOCKET_DDR = {
+    'AM4': 'DDR4',
+    'AM5': 'DDR5',
+    'LGA1851': 'DDR5',
+}
+
+# 記憶體模組規格：筆記型電腦用的 SO-DIMM 無法安裝在桌上型主機板的 DIMM 插槽
+DIMM = 'DIMM'
+SO_DIMM = 'SO-DIMM'
+_SO_DIMM_PATTERN = re.compile(r'SO-?DIMM|筆記型|筆電', re.IGNORECASE)
+
+
+def dimm_type(product: Dict[str, Any], subcategory_name: Optional[str] = None) -> str:
+    """記憶體（或主機板插槽）的模組規格：商品文字、群組或子分類提到 SO-DIMM / 筆記型時為 SO-DIMM，否則為 DIMM"""
+    for text in (product.get('raw_text'), product.get('group'), subcategory_name):
+        if text and _SO_DIMM_PATTERN.search(text):
+            return SO_DIMM
+    return DIMM
+
+
+def memory_slot(generation: str, dimm: str) -> str:
+    """DDR 世代與模組規格都相同才相容，如 DDR5 DIMM、DDR5 SO-DIMM"""
+    return f"{generation} {dimm}"
+
+
+def compat_path_for(json_file: str) -> str:
+    """JSON 匯出檔對應的相容性索引檔路徑（product.json -> product.compat.json）"""
+    base = json_file[:-5] if json_file.lower().endswith('.json') else json_file
+    return f"{base}.compat.json"
+
+
+def _price_key(entry: List[Any]) -> float:
+    # 沒有價格的商品排在最後
+    return entry[1] if entry[1] is not None else float('inf')
+
+
+class CompatibilityIndex:
+    """相容性索引：商品編號與 QueryIndex 相同，為匯出 JSON 中依類別、子分類、商品順序展開後的位置"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.products = data['products']
+        self.sockets = data['sockets']
+        self.ddr = data['ddr']
+
+    @classmethod
+    def build(cls, categories: List[Dict[str, Any]]) -> 'CompatibilityIndex':
+        """由解析結果建立索引"""
+        products = {}
+        sockets = {}
+        ddr = {}
+
+        def add(table: Dict[str, Dict[str, list]], key: str, role: str, product_id: int, price: Optional[int]):
+            table.setdefault(key, {}).setdefault(role, []).append([product_id, price])
+
+        product_id = -1
+        for cat_pos, category in enumerate(categories):
+            category_id = category['category_id']
+            for sub_pos, subcategory in enumerate(category.get('subcategories', [])):
+                for prod_pos, product in enumerate(subcategory['products']):
+                    product_id += 1
+                    if category_id not in (CPU_CATEGORY, BOARD_CATEGORY, MEMORY_CATEGORY):
+                        continue
+                    attributes = product.get('attributes') or {}
+                    socket = attributes.get('socket')
+                    generation = attributes.get('ddr')
+                    dimm = dimm_type(product, subcategory['name'])
+                    price = product.get('price')
+                    if category_id == CPU_CATEGORY:
+                        if not socket:
+                            continue
+                        add(sockets, socket, 'cpus', product_id, price)
+                    elif category_id == BOARD_CATEGORY:
+                        generation = generation or SOCKET_DDR.get(socket)
+                        if not socket and not generation:
+                            continue
+                        if socket:
+                            add(sockets, socket, 'boards', product_id, price)
+                        if generation:
+                            add(ddr, memory_slot(generation, dimm), 'boards', product_id, price)
+                    else:
+                        if not generation:
+                            continue
+                        add(ddr, memory_slot(generation, dimm), 'memory', product_id, price)
+                    products[str(product_id)] = {
+                        'location': [cat_pos, sub_pos, prod_pos],
+                        'category_id': category_id,
+                        'socket': socket,
+                        'ddr': generation,
+                        'dimm': dimm if category_id != CPU_CATEGORY else None,
+                        'price': price
+                    }
+
+        # 清單依價格排序後只保留商品編號
+        for table in (sockets, ddr):
+            for roles in table.values():
+                for role, entries in roles.items():
+                    entries.sort(key=_price_key)
+                    roles[role] = [entry[0] for entry in entries]
+
+        return cls({
+            'version': COMPAT_VERSION,
+            'products': products,
+            'sockets': sockets,
+            'ddr': ddr
+        })
+
+    @classmethod
+    def load(cls, compat_file: str) -> 'CompatibilityIndex':
+        with open(compat_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != COMPAT_VERSION:
+            raise ValueError(f"相容性索引版本不符，請以 --compat 重新產生: {compat_file}")
+        return cls(data)
+
+    def save(self, compat_file: str):
+        with open(compat_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def _slot_key(entry: Dict[str, Any]) -> Optional[str]:
+        return memory_slot(entry['ddr'], entry['dimm']) if entry['ddr'] and entry['dimm'] else None
+
+    def _lookup(self, product_id: int, field: str, table: Dict[str, Dict[str, List[int]]], role: str,
+                limit: Optional[int], max_price: Optional[int]) -> List[int]:
+        entry = self.products.get(str(product_id))
+        if not entry:
+            return []
+        key = self._slot_key(entry) if field == 'ddr' else entry[field]
+        if not key:
+            return []
+        product_ids = table.get(key, {}).get(role, [])
+        if max_price is None:
+            return product_ids[:limit] if limit is not None else list(product_ids)
+        # 清單已依價格排序，遇到第一個超過上限的商品即可停止
+        results = []
+        for candidate in product_ids:
+            price = self.products[str(candidate)]['price']
+            if price is None or price > max_price or (limit is not None and len(results) >= limit):
+                break
+            results.append(candidate)
+        return results
+
+    def boards_for_cpu(self, cpu_id: int, limit: Optional[int] = None, max_price: Optional[int] = None) -> List[int]:
+        """與 CPU 腳位相同的主機板（依價格由低到高）"""
+        return self._lookup(cpu_id, 'socket', self.sockets, 'boards', limit, max_price)
+
+    def cpus_for_board(self, board_id: int, limit: Optional[int] = None, max_price: Optional[int] = None) -> List[int]:
+        """可安裝在主機板上的 CPU（依價格由低到高）"""
+        return self._lookup(board_id, 'socket', self.sockets, 'cpus', limit, max_price)
+
+    def memory_for_board(self, board_id: int, limit: Optional[int] = None, max_price: Optional[int] = None) -> List[int]:
+        """與主機板 DDR 世代及模組規格相同的記憶體（依價格由低到高）"""
+        return self._lookup(board_id, 'ddr', self.ddr, 'memory', limit, max_price)
+
+    def boards_for_memory(self, memory_id: int, limit: Optional[int] = None, max_price: Optional[int] = None) -> List[int]:
+        """支援記憶體 DDR 世代及模組規格的主機板（依價格由低到高）"""
+        return self._lookup(memory_id, 'ddr', self.ddr, 'boards', limit, max_price)
+
+    def compatible(self, cpu_id: Optional[int] = None, board_id: Optional[int] = None,
+                   memory_id: Optional[int] = None) -> bool:
+        """檢查指定的 CPU、主機板、記憶體是否互相相容（未指定的零件不檢查；缺少屬性時視為不相容）"""
+        def field(product_id: int, name: str) -> Optional[str]:
+            entry = self.products.get(str(product_id))
+            return entry[name] if entry else None
+
+        if board_id is None:
+            return True
+        if cpu_id is not None and (field(cpu_id, 'socket') is None or field(cpu_id, 'socket') != field(board_id, 'socket')):
+            return False
+        if memory_id is not None:
+            memory = self.products.get(str(memory_id))
+            board = self.products.get(str(board_id))
+            if not memory or not board or self._slot_key(memory) is None or self._slot_key(memory) != self._slot_key(board):
+                return False
+        return True
+
+    def resolve(self, product_id: int, categories: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """依商品編號從匯出的 JSON 資料中取出商品"""
+        cat_pos, sub_pos, prod_pos = self.products[str(product_id)]['location']
+        category = categories[cat_pos]
+        return category['subcategories'][sub_pos]['products'][prod_pos]
+
+    def find(self, category_id: str, keyword: str, categories: List[Dict[str, Any]]) -> Optional[int]:
+        """在索引中的商品找出文字含有關鍵字的第一項（CLI 用）"""
+        keyword = keyword.lower()
+        for product_id, entry in self.products.items():
+            if entry['category_id'] == category_id and \
+                    keyword in (self.resolve(int(product_id), categories).get('raw_text') or '').lower():
+                return int(product_id)
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查詢 CPU、主機板、記憶體相容性')
+    parser.add_argument('json_file', help='coolpc_parser.py 匯出的 JSON 文件 (同目錄需有 .compat.json)')
+    parser.add_argument('--cpu', help='CPU 關鍵字：列出相容的主機板')
+    parser.add_argument('--board', help='主機板關鍵字：列出相容的 CPU 與記憶體')
+    parser.add_argument('--max-price', type=int, help='最高價格')
+    parser.add_argument('--limit', type=int, default=10, help='每項結果數量限制 (預設: 10)')
+
+    args = parser.parse_args()
+
+    index = CompatibilityIndex.load(compat_path_for(args.json_file))
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        categories = json.load(f)
+
+    def show(title: str, product_ids: List[int]):
+        print(f"{title}:")
+        for product_id in product_ids:
+            product = index.resolve(product_id, categories)
+            print(f"  ${product['price']}  {product['raw_text']}")
+        if not product_ids:
+            print("  (無)")
+
+    if args.cpu:
+        cpu_id = index.find(CPU_CATEGORY, args.cpu, categories)
+        if cpu_id is None:
+            print(f"找不到可判斷腳位的 CPU: {args.cpu}")
+        else:
+            print(f"CPU: {index.resolve(cpu_id, categories)['raw_text']} ({index.products[str(cpu_id)]['socket']})")
+            show("相容的主機板", index.boards_for_cpu(cpu_id, args.limit, args.max_price))
+
+    if args.board:
+        board_id = index.find(BOARD_CATEGORY, args.board, categories)
+        if board_id is None:
+            print(f"找不到可判斷腳位或 DDR 世代的主機板: {args.board}")
+        else:
+            entry = index.products[str(board_id)]
+            print(f"主機板: {index.resolve(board_id, categories)['raw_text']} ({entry['socket']} / {entry['ddr']} {entry['dimm']})")
+            show("相容的 CPU", index.cpus_for_board(board_id, args.limit, args.max_price))
+            show("相容的記憶體", index.memory_for_board(board_id, args.limit, args.max_price))
+
+    if not args.cpu and not args.board:
+        print("請指定查詢方式 (--cpu 或 --board)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨類別重複商品分群
+同一商品常同時出現在一般類別、福利品出清 (類別 30) 與酷！PC 套裝產線，文字略有不同，
+比價時會被重複計算。解析完成後以正規化商品文字的詞彙集合計算 MinHash 簽章，
+再以 LSH 分段 (banding) 找出候選商品對，只對同一桶中的商品確認實際的 Jaccard 相似度，
+不必兩兩比較所有商品。
+
+只合併兩種商品：去除福利品等標示後文字完全相同者，以及不同類別中品牌相同、規格數字
+（容量、時脈、核心數、PCIe 版本、CL 值等）完全相同且相似度達門檻者。
+同一類別中文字相近的商品通常是不同規格的 SKU，不合併。
+
+相似的商品以 union-find 合併成群組，每個群組選出一個代表商品識別碼 (canonical id)：
+優先選一般類別的商品，其次取識別碼最小者，快照之間保持穩定。
+SQLite 匯出的 canonical_id 欄位與價格歷史 (--dedup) 都以此識別碼記錄。
+"""
+
+import json
+import zlib
+import random
+import argparse
+from typing import List, Dict, Any, FrozenSet
+
+from coolpc_index import tokenize
+from coolpc_fuzzy import normalize
+from coolpc_history import iter_keyed_products, normalize_text
+
+DEDUP_VERSION = 2
+DEFAULT_THRESHOLD = 0.8
+
+# 16 段 x 4 列：Jaccard 0.8 的商品對成為候選的機率約 99.98%，0.5 以下大多不會進入同一桶
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+# 同一桶中每項商品最多與幾個不同群組的代表比較；避免大量碰撞的桶退化成兩兩比較
+MAX_BUCKET_REPRESENTATIVES = 4
+
+# 福利品、套裝與一般商品的差異標示，不列入比對詞彙
+STOP_TOKENS = frozenset(['福利品', '出清', '福利品出清', '盒損', '拆封', '拆封品', '展示品', '整新品'])
+# 福利品出清、酷！PC 套裝產線：群組中有一般類別的商品時不作為代表
+SECONDARY_CATEGORIES = frozenset(['3', '30'])
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# 固定種子：每次執行的雜湊函數相同，分群結果可重現
+_rng = random.Random(20250101)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+
+def dedup_path_for(json_file: str) -> str:
+    """JSON 匯出檔對應的重複商品分群檔路徑（product.json -> product.dedup.json）"""
+    base = json_file[:-5] if json_file.lower().endswith('.json') else json_file
+    return f"{base}.dedup.json"
+
+
+def product_tokens(product: Dict[str, Any]) -> FrozenSet[str]:
+    """比對用的詞彙集合：正規化後的商品文字（不含價格與標記）去除福利品等標示後的詞彙，
+    加上相鄰兩個詞彙的組合，讓規格數字（如 8核/16緒 與 6核/12緒）的差異反映在相似度上"""
+    words = [word for word in tokenize(normalize_text(product.get('raw_text') or '')) if word not in STOP_TOKENS]
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def brand_tokens(product: Dict[str, Any]) -> FrozenSet[str]:
+    """品牌名稱的詞彙（中英並列的 "微星 MSI" 兩者皆可比對）"""
+    return frozenset(tokenize(product.get('brand')))
+
+
+def spec_numbers(words: FrozenSet[str]) -> FrozenSet[str]:
+    """商品詞彙中的數字（規格值），兩項商品必須完全相同才可能是同一商品"""
+    return frozenset(word for word in words if word.isdigit())
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+class _MinHasher:
+    """以詞彙為單位快取各雜湊函數的值，商品簽章只需對詞彙的值逐項取最小值"""
+
+    def __init__(self):
+        self._cache = {}
+
+    def token_hashes(self, token: str) -> List[int]:
+        values = self._cache.get(token)
+        if values is None:
+            h = zlib.crc32(token.encode('utf-8'))
+            values = self._cache[token] = [(a * h + b) % _MERSENNE_PRIME for a, b in _PERMUTATIONS]
+        return values
+
+    def signature(self, tokens: FrozenSet[str]) -> List[int]:
+        return list(map(min, *(self.token_hashes(token) for token in tokens))) if len(tokens) > 1 \
+            else list(self.token_hashes(next(iter(tokens))))
+
+
+class DuplicateClusters:
+    """重複商品分群結果：canonical 為每項商品識別碼 (coolpc_history.product_key) 對應的代表識別碼"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.canonical = {}
+        for cluster in data['clusters']:
+            for member in cluster['members']:
+                self.canonical[member['product_key']] = cluster['canonical_id']
+
+    @classmethod
+    def build(cls, categories: List[Dict[str, Any]], threshold: float = DEFAULT_THRESHOLD) -> 'DuplicateClusters':
+        """由解析結果分群；只保留兩項以上商品的群組"""
+        keys = []
+        entries = []
+        tokens = []
+        models = []
+        brands = []
+        numbers = []
+        hasher = _MinHasher()
+        buckets = {}
+
+        parent = []
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        # 詞彙完全相同的商品直接合併，只有第一項需要計算簽章
+        exact = {}
+        cat_pos = sub_pos = prod_pos = -1
+        last_category = last_subcategory = None
+        for key, category, subcategory, product in iter_keyed_products(categories):
+            # 記錄商品在匯出 JSON 中的位置（與 QueryIndex 的展開順序相同）
+            if category is not last_category:
+                cat_pos, sub_pos, last_category, last_subcategory = cat_pos + 1, -1, category, None
+            if subcategory is not last_subcategory:
+                sub_pos, prod_pos, last_subcategory = sub_pos + 1, -1, subcategory
+            prod_pos += 1
+
+            words = product_tokens(product)
+            if not words:
+                continue
+            product_id = len(keys)
+            keys.append(key)
+            entries.append((category['category_id'], [cat_pos, sub_pos, prod_pos], product.get('price')))
+            tokens.append(words)
+            models.append(normalize(product.get('model')))
+            brands.append(brand_tokens(product))
+            numbers.append(spec_numbers(words))
+            parent.append(product_id)
+
+            first = exact.get((words, models[product_id]))
+            if first is not None:
+                parent[product_id] = first
+                continue
+            exact[(words, models[product_id])] = product_id
+
+            signature = hasher.signature(words)
+            for band in range(NUM_BANDS):
+                start = band * ROWS_PER_BAND
+                bucket_key = (band, *signature[start:start + ROWS_PER_BAND])
+                bucket = buckets.get(bucket_key)
+                if bucket is None:
+                    buckets[bucket_key] = [product_id]
+                else:
+                    bucket.append(product_id)
+
+        # 同一對商品可能在多個分段進入同一桶，比較過且不相似的商品對不再重複比較
+        rejected = set()
+
+        def similar(a: int, b: int) -> bool:
+            if (a, b) in rejected:
+                return False
+            # 同一類別只合併文字完全相同者（已在前面直接合併）；不同類別還必須品牌相同、規格數字相同，
+            # 且兩者都有型號時型號相同（如 RTX 5070 與 RTX 5070 Ti 的卡）
+            if entries[a][0] != entries[b][0] \
+                    and (brands[a] & brands[b] or not (brands[a] or brands[b])) \
+                    and numbers[a] == numbers[b] \
+                    and (not models[a] or not models[b] or models[a] == models[b]) \
+                    and jaccard(tokens[a], tokens[b]) >= threshold:
+                return True
+            rejected.add((a, b))
+            return False
+
+        # 只確認同一桶中的商品；已在同一群組的商品不必再比較
+        for bucket in buckets.values():
+            if len(bucket) < 2:
+                continue
+            representatives = [bucket[0]]
+            for product_id in bucket[1:]:
+                root = find(product_id)
+                roots = [find(representative) for representative in representatives]
+                if root in roots:
+                    continue
+                for representative, representative_root in zip(representatives, roots):
+                    if similar(product_id, representative):
+                        parent[root] = representative_root
+                        break
+                else:
+                    if len(representatives) < MAX_BUCKET_REPRESENTATIVES:
+                        representatives.append(product_id)
+
+        groups = {}
+        for product_id in range(len(keys)):
+            groups.setdefault(find(product_id), []).append(product_id)
+
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            canonical = min(members, key=lambda m: (entries[m][0] in SECONDARY_CATEGORIES, keys[m]))
+            clusters.append({
+                'canonical_id': keys[canonical],
+                'members': [
+                    {
+                        'product_key': keys[m],
+                        'category_id': entries[m][0],
+                        'location': entries[m][1],
+                        'price': entries[m][2]
+                    }
+                    for m in members
+                ]
+            })
+        clusters.sort(key=lambda cluster: cluster['canonical_id'])
+
+        return cls({
+            'version': DEDUP_VERSION,
+            'threshold': threshold,
+            'products': len(keys),
+            'clusters': clusters
+        })
+
+    @classmethod
+    def load(cls, dedup_file: str) -> 'DuplicateClusters':
+        with open(dedup_file, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def save(self, dedup_file: str):
+        with open(dedup_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, separators=(',', ':'))
+
+    @property
+    def clusters(self) -> List[Dict[str, Any]]:
+        return self.data['clusters']
+
+    def canonical_id(self, product_key: str) -> str:
+        """商品的代表識別碼；沒有重複的商品即為本身的識別碼"""
+        return self.canonical.get(product_key, product_key)
+
+    @property
+    def duplicates(self) -> int:
+        """重複計算的商品數（各群組除代表外的成員數）"""
+        return sum(len(cluster['members']) - 1 for cluster in self.clusters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='找出跨類別重複的原價屋商品 (MinHash/LSH)')
+    parser.add_argument('json_file', help='coolpc_parser.py 匯出的 JSON 文件')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'視為重複的最低 Jaccard 相似度 (預設: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--output', help='分群結果輸出路徑 (預設: product.dedup.json)')
+    parser.add_argument('--limit', type=int, default=10, help='顯示的群組數量 (預設: 10)')
+
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        categories = json.load(f)
+    clusters = DuplicateClusters.build(categories, args.threshold)
+    output_file = args.output or dedup_path_for(args.json_file)
+    clusters.save(output_file)
+
+    print(f"{clusters.data['products']} 項商品中找到 {len(clusters.clusters)} 個重複群組 "
+          f"(重複 {clusters.duplicates} 項)")
+    largest = sorted(clusters.clusters, key=lambda cluster: -len(cluster['members']))[:args.limit]
+    for cluster in largest:
+        print(f"{cluster['canonical_id']}  {len(cluster['members'])} 項")
+        for member in cluster['members']:
+            cat_pos, sub_pos, prod_pos = member['location']
+            product = categories[cat_pos]['subcategories'][sub_pos]['products'][prod_pos]
+            print(f"  [{member['category_id']}] ${member['price']}  {product['raw_text']}")
+    print(f"分群結果已寫入 {output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+商品詳細頁面抓取
+帶有 ◆（討論）或 ★（圖片）標記的商品另有詳細頁面。以 asyncio 同時抓取多個頁面：
+總並行數以 Semaphore 限制，每個主機另有最小請求間隔；所有請求共用同一個連線池，
+回應存入磁碟快取（過期後以 ETag / Last-Modified 條件式請求驗證）。
+抓到的標題、說明、圖片與內文摘要合併到商品的 detail 欄位。
+
+    python3 coolpc_details.py product.json --output product.detail.json --cache-dir .detail-cache
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from coolpc_parser import (REQUEST_HEADERS, REQUEST_TIMEOUT, REQUEST_RETRIES, REQUEST_BACKOFF,
+                           decode_big5)
+
+# 詳細頁面網址，可用 {category_id}、{product_id}（原價屋商品編號，即 OPTION 的 value）與 {index}（在類別中的序號）
+DETAIL_URL_TEMPLATE = 'https://www.coolpc.com.tw/eachview.php?IGrp={category_id}&Pdid={product_id}'
+DEFAULT_MARKERS = ('discussion', 'image')
+DEFAULT_CONCURRENCY = 8
+# 每個主機每秒最多的請求數
+DEFAULT_RATE = 4.0
+CACHE_VERSION = 1
+
+# detail 欄位保留的內容上限
+MAX_IMAGES = 20
+MAX_TEXT_LENGTH = 500
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class _DetailPageParser(HTMLParser):
+    """取出頁面標題、說明、圖片網址與內文"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.description = None
+        self.images = []
+        self.text = []
+        self._in_title = False
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'title':
+            self._in_title = True
+        elif tag in ('script', 'style'):
+            self._skip += 1
+        elif tag == 'img' and attrs.get('src'):
+            self.images.append(attrs['src'])
+        elif tag == 'meta' and self.description is None and \
+                (attrs.get('name') or attrs.get('property') or '').lower() in ('description', 'og:description'):
+            self.description = attrs.get('content')
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        elif tag in ('script', 'style') and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.text.append(data)
+
+
+def extract_detail(url: str, body: str) -> Dict[str, Any]:
+    """由詳細頁面 HTML 取出要合併到商品的內容"""
+    page = _DetailPageParser()
+    page.feed(body)
+    page.close()
+    images = []
+    for src in page.images:
+        image = urljoin(url, src)
+        if image not in images:
+            images.append(image)
+    text = _WHITESPACE.sub(' ', ' '.join(page.text)).strip()
+    return {
+        'url': url,
+        'title': _WHITESPACE.sub(' ', page.title).strip() or None,
+        'description': page.description,
+        'images': images[:MAX_IMAGES],
+        'text': text[:MAX_TEXT_LENGTH]
+    }
+
+
+def _decode(response: requests.Response) -> str:
+    """原價屋頁面多為 Big5；標頭指定 UTF-8 或內容是合法的 UTF-8 時以 UTF-8 解碼"""
+    content_type = response.headers.get('Content-Type', '').lower()
+    if 'big5' not in content_type:
+        try:
+            return response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+    return decode_big5(response.content)
+
+
+class ResponseCache:
+    """以網址 SHA-256 為檔名的磁碟回應快取"""
+
+    def __init__(self, cache_dir: str, ttl: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('version') != CACHE_VERSION or entry.get('url') != url:
+            return None
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        # 未設定 ttl 時快取永不過期
+        return self.ttl is None or time.time() - entry['fetched_at'] < self.ttl
+
+    def put(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]):
+        path = self._path(url)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': CACHE_VERSION,
+                'url': url,
+                'fetched_at': time.time(),
+                'etag': etag,
+                'last_modified': last_modified,
+                'body': body
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class _HostRateLimiter:
+    """每個主機的請求之間至少間隔 1 / rate 秒"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = {}
+        self._locks = {}
+
+    async def wait(self, host: str):
+        if not self.interval:
+            return
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class DetailFetcher:
+    """以有限並行數抓取詳細頁面
+
+    requests 為同步函式庫，實際的 HTTP 請求在大小等於並行數的執行緒池中執行，
+    所有執行緒共用同一個 Session（連線池大小與並行數相同）。
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE,
+                 cache: Optional[ResponseCache] = None, timeout: float = REQUEST_TIMEOUT):
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        self.timeout = timeout
+        self._limiter = _HostRateLimiter(rate)
+        self.stats = {'fetched': 0, 'cached': 0, 'not_modified': 0, 'failed': 0}
+
+        retry = Retry(
+            total=REQUEST_RETRIES,
+            backoff_factor=REQUEST_BACKOFF,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False
+        )
+        self.session = requests.Session()
+        self.session.headers.update(REQUEST_HEADERS)
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    async def _fetch_one(self, url: str, semaphore: asyncio.Semaphore,
+                         executor: ThreadPoolExecutor) -> Optional[str]:
+        entry = self.cache.get(url) if self.cache else None
+        if entry is not None and self.cache.is_fresh(entry):
+            self.stats['cached'] += 1
+            return entry['body']
+
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        async with semaphore:
+            await self._limiter.wait(urlsplit(url).netloc)
+            try:
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(executor, self._get, url, headers)
+                if response.status_code == 304 and entry is None:
+                    # 沒有快取內容可沿用（例如快取在請求期間被清除）：不帶條件標頭重新抓取一次
+                    response = await loop.run_in_executor(executor, self._get, url, {'Cache-Control': 'no-cache'})
+                    if response.status_code == 304:
+                        raise requests.exceptions.HTTPError('伺服器回應 304，但沒有可沿用的快取內容', response=response)
+                if response.status_code == 304:
+                    body = entry['body']
+                    self.stats['not_modified'] += 1
+                else:
+                    response.raise_for_status()
+                    body = _decode(response)
+                    self.stats['fetched'] += 1
+            except requests.exceptions.RequestException as e:
+                self.stats['failed'] += 1
+                print(f"抓取失敗 {url}: {e}")
+                return None
+
+        if self.cache:
+            etag = response.headers.get('ETag') or (entry or {}).get('etag')
+            last_modified = response.headers.get('Last-Modified') or (entry or {}).get('last_modified')
+            self.cache.put(url, body, etag, last_modified)
+        return body
+
+    async def fetch_all(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """抓取所有網址（重複的網址只抓一次），回傳 {網址: 頁面內容}，失敗的網址為 None"""
+        urls = list(dict.fromkeys(urls))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            bodies = await asyncio.gather(*(self._fetch_one(url, semaphore, executor) for url in urls))
+        return dict(zip(urls, bodies))
+
+    def fetch(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """同步介面：在新的事件迴圈中執行 fetch_all"""
+        return asyncio.run(self.fetch_all(urls))
+
+    def close(self):
+        self.session.close()
+
+
+def select_products(categories: List[Dict[str, Any]], markers: Iterable[str] = DEFAULT_MARKERS,
+                    category_id: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """依序產生帶有指定標記的 (類別編號, 商品)"""
+    markers = set(markers)
+    for category in categories:
+        if category_id is not None and category['category_id'] != str(category_id):
+            continue
+        for subcategory in category.get('subcategories', []):
+            for product in subcategory['products']:
+                if markers.intersection(product.get('markers', [])):
+                    yield category['category_id'], product
+
+
+def detail_url(category_id: str, product: Dict[str, Any], url_template: str = DETAIL_URL_TEMPLATE) -> str:
+    """商品的詳細頁面網址"""
+    return url_template.format(category_id=category_id, product_id=product.get('product_id'),
+                               index=product.get('index'))
+
+
+def enrich_products(categories: List[Dict[str, Any]], fetcher: DetailFetcher,
+                    url_template: str = DETAIL_URL_TEMPLATE, markers: Iterable[str] = DEFAULT_MARKERS,
+                    category_id: Optional[str] = None, limit: Optional[int] = None) -> int:
+    """抓取符合條件商品的詳細頁面並合併到 product['detail']，回傳合併的商品數量"""
+    selected = []
+    missing = 0
+    for product_category, product in select_products(categories, markers, category_id):
+        if limit is not None and len(selected) >= limit:
+            break
+        if not product.get('product_id'):
+            # 舊版解析器匯出的 JSON 沒有商品編號，無法組出詳細頁面網址
+            missing += 1
+            continue
+        selected.append((detail_url(product_category, product, url_template), product))
+    if missing:
+        print(f"略過 {missing} 項沒有商品編號的商品 (請以新版 coolpc_parser.py 重新解析)")
+
+    bodies = fetcher.fetch([url for url, _ in selected])
+    details = {}
+    merged = 0
+    for url, product in selected:
+        body = bodies.get(url)
+        if body is None:
+            continue
+        if url not in details:
+            details[url] = extract_detail(url, body)
+        product['detail'] = details[url]
+        merged += 1
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='抓取帶有 ◆/★ 標記商品的詳細頁面並合併到 JSON 資料')
+    parser.add_argument('json_file', help='coolpc_parser.py 匯出的 JSON 文件')
+    parser.add_argument('--output', help='輸出 JSON 文件路徑 (預設: 覆寫輸入文件)')
+    parser.add_argument('--markers', nargs='+', default=list(DEFAULT_MARKERS), help='要抓取的商品標記 (預設: discussion image)')
+    parser.add_argument('--category', help='只處理指定類別編號')
+    parser.add_argument('--limit', type=int, help='最多處理的商品數量')
+    parser.add_argument('--url-template', default=DETAIL_URL_TEMPLATE,
+                        help='詳細頁面網址，可用 {category_id}、{product_id} 與 {index} (預設: %(default)s)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help=f'同時進行的請求數 (預設: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help=f'每個主機每秒最多請求數，0 表示不限制 (預設: {DEFAULT_RATE:g})')
+    parser.add_argument('--cache-dir', help='回應快取目錄')
+    parser.add_argument('--cache-ttl', type=float, help='搭配 --cache-dir：快取有效秒數，過期後以條件式請求驗證 (預設: 永不過期)')
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT, help=f'單一請求逾時秒數 (預設: {REQUEST_TIMEOUT})')
+
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        categories = json.load(f)
+
+    cache = ResponseCache(args.cache_dir, args.cache_ttl) if args.cache_dir else None
+    fetcher = DetailFetcher(args.concurrency, args.rate, cache, args.timeout)
+    start = time.perf_counter()
+    try:
+        merged = enrich_products(categories, fetcher, args.url_template, args.markers, args.category, args.limit)
+    finally:
+        fetcher.close()
+    elapsed = time.perf_counter() - start
+
+    output_file = args.output or args.json_file
+    tmp_path = f"{output_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(categories, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output_file)
+
+    stats = fetcher.stats
+    print(f"已合併 {merged} 項商品的詳細資料 ({elapsed:.1f} 秒)：下載 {stats['fetched']} / 快取 {stats['cached']} / "
+          f"未變更 {stats['not_modified']} / 失敗 {stats['failed']}")
+    print(f"數據已匯出到 {output_file}")
+
+if __name__ == "__main__":
+    main()
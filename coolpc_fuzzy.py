@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+型號模糊查詢索引
+以正規化後的品牌 + 型號 + 商品文字建立三字元 (trigram) 反向索引，每份快照建立一次。
+正規化會轉小寫並移除空白與符號，"RTX5070" 與 "RTX 5070"、"i5-14400F" 與 "i5 14400F" 得到相同的三字元；
+中英並列的品牌（如 "微星 MSI"）分別與型號組合後建立索引，只寫中文或英文品牌都能找到。
+
+查詢時只從查詢字串中最少見的幾個三字元取出候選商品（其餘商品不可能達到最低相似度），
+再以二分搜尋確認其他三字元，依「查詢三字元被包含的比例」排序，同分時較短（較接近）的商品在前。
+"""
+
+import re
+import json
+import math
+import heapq
+import bisect
+import argparse
+import unicodedata
+from array import array
+from itertools import chain
+from collections import Counter
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+DEFAULT_MIN_SIMILARITY = 0.5
+DEFAULT_LIMIT = 10
+
+# 正規化後只保留英數字與中文
+_STRIP_PATTERN = re.compile(r'[^0-9a-z一-鿿]+')
+# 價格及之後的標記不列入索引
+_PRICE_SUFFIX = re.compile(r',?\s*\$[0-9,].*$', re.DOTALL)
+# 候選商品數乘上此倍數仍少於清單長度時，改用二分搜尋確認（較建立集合快）
+_BISECT_RATIO = 16
+
+
+def normalize(text: Optional[str]) -> str:
+    """全形轉半形、轉小寫並移除空白與符號"""
+    if not text:
+        return ''
+    return _STRIP_PATTERN.sub('', unicodedata.normalize('NFKC', text).lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    """已正規化字串的三字元集合（不足三個字時為空集合）"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def product_trigrams(product: Dict[str, Any]) -> Set[str]:
+    """商品的三字元：型號、各品牌名稱 + 型號，以及去掉價格的商品文字"""
+    model = normalize(product.get('model'))
+    text = _PRICE_SUFFIX.sub('', product.get('raw_text') or '')
+    grams = trigrams(model)
+    # 沒有型號的商品（如主機板）以商品文字的各個詞代替型號，"微星 B850" 才會比對到品牌緊接型號的三字元
+    models = [model] if model else [normalize(word) for word in text.split()]
+    for name in (product.get('brand') or '').split():
+        name = normalize(name)
+        for word in models:
+            grams |= trigrams(name + word)
+    grams |= trigrams(normalize(text))
+    return grams
+
+
+class FuzzyIndex:
+    """三字元模糊查詢索引：商品編號與 QueryIndex 相同，為依類別、子分類、商品順序展開後的位置"""
+
+    def __init__(self, postings: Dict[str, array], sizes: array, locations: List[Tuple[int, int, int]]):
+        self.postings = postings
+        self.sizes = sizes
+        self.locations = locations
+
+    @classmethod
+    def build(cls, categories: List[Dict[str, Any]]) -> 'FuzzyIndex':
+        """由解析結果建立索引"""
+        postings = {}
+        sizes = array('I')
+        locations = []
+        for cat_pos, category in enumerate(categories):
+            for sub_pos, subcategory in enumerate(category.get('subcategories', [])):
+                for prod_pos, product in enumerate(subcategory['products']):
+                    product_id = len(locations)
+                    locations.append((cat_pos, sub_pos, prod_pos))
+                    grams = product_trigrams(product)
+                    sizes.append(len(grams))
+                    for gram in grams:
+                        posting = postings.get(gram)
+                        if posting is None:
+                            posting = postings[gram] = array('I')
+                        posting.append(product_id)
+        # 商品編號依序遞增，各清單本身即已排序，可直接二分搜尋
+        return cls(postings, sizes, locations)
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT,
+               min_similarity: float = DEFAULT_MIN_SIMILARITY) -> List[Tuple[int, float]]:
+        """回傳與查詢字串最接近的 (商品編號, 相似度)，相似度為查詢三字元被商品包含的比例"""
+        query_grams = trigrams(normalize(query))
+        if not query_grams:
+            return []
+        # 沒有任何商品含有的三字元仍計入分母，但不必查詢
+        postings = sorted((self.postings.get(gram, ()) for gram in query_grams), key=len)
+        total = len(postings)
+        required = max(1, math.ceil(min_similarity * total - 1e-9))
+        if required > total:
+            return []
+
+        # 前綴過濾：相符數至少要 required 個，則必定含有最少見的 total - required + 1 個三字元之一
+        prefix = total - required + 1
+        counts = Counter(chain.from_iterable(postings[:prefix]))
+
+        # 其餘三字元只需確認候選商品：候選少時逐一二分搜尋，多時以集合交集一次算完
+        for posting in postings[prefix:]:
+            if not counts:
+                break
+            if len(counts) * _BISECT_RATIO < len(posting):
+                length = len(posting)
+                matched = []
+                for product_id in counts:
+                    position = bisect.bisect_left(posting, product_id)
+                    if position < length and posting[position] == product_id:
+                        matched.append(product_id)
+            else:
+                matched = counts.keys() & set(posting)
+            counts.update(matched)
+
+        sizes = self.sizes
+        scored = ((count / total, 2 * count / (total + sizes[product_id]), -product_id)
+                  for product_id, count in counts.items() if count >= required)
+        return [(-product_id, round(similarity, 4))
+                for similarity, _, product_id in heapq.nlargest(limit, scored)]
+
+    def resolve(self, product_id: int, categories: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """依商品編號從解析結果中取出商品"""
+        cat_pos, sub_pos, prod_pos = self.locations[product_id]
+        category = categories[cat_pos]
+        subcategory = category['subcategories'][sub_pos]
+        return {
+            'category_id': category['category_id'],
+            'category': category['category_name'],
+            'subcategory': subcategory['name'],
+            **subcategory['products'][prod_pos]
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='以型號模糊查詢最接近的原價屋商品')
+    parser.add_argument('json_file', help='coolpc_parser.py 匯出的 JSON 文件')
+    parser.add_argument('query', nargs='+', help='查詢字串 (如 "RTX5070"、"微星 B850")')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help=f'結果數量限制 (預設: {DEFAULT_LIMIT})')
+    parser.add_argument('--min-similarity', type=float, default=DEFAULT_MIN_SIMILARITY,
+                        help=f'最低相似度 0~1 (預設: {DEFAULT_MIN_SIMILARITY})')
+
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        categories = json.load(f)
+    index = FuzzyIndex.build(categories)
+
+    for query in args.query:
+        print(f"{query}:")
+        results = index.search(query, args.limit, args.min_similarity)
+        for product_id, similarity in results:
+            product = index.resolve(product_id, categories)
+            print(f"  {similarity:.2f}  ${product['price']}  [{product['category']}] {product['raw_text']}")
+        if not results:
+            print("  查無相近的商品")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原價屋價格歷史資料庫
+每次解析的快照只記錄與上一次的差異（新上架、下架、價格或原價異動），
+以 SQLite 保存，可快速查詢單一商品的價格歷史或某時間點之後的所有變動。
+"""
+
+import re
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+# 事件類型
+EVENT_NEW = 'new'
+EVENT_REMOVED = 'removed'
+# 售價或原價（特價前的價格）任一改變；只有原價改變時 price 與 previous_price 相同
+EVENT_PRICE = 'price'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at TEXT NOT NULL,
+    source TEXT,
+    product_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    product_key TEXT PRIMARY KEY,
+    category_id TEXT,
+    category_name TEXT,
+    subcategory TEXT,
+    brand TEXT,
+    model TEXT,
+    raw_text TEXT,
+    first_snapshot INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS current_prices (
+    product_key TEXT PRIMARY KEY,
+    price INTEGER,
+    original_price INTEGER
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    snapshot_id INTEGER NOT NULL,
+    product_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    price INTEGER,
+    original_price INTEGER,
+    previous_price INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_events_product ON events (product_key, snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_events_snapshot ON events (snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_snapshots_taken_at ON snapshots (taken_at);
+'''
+
+# 正規化商品文字：去掉價格及之後的標記，讓價格變動不影響商品識別
+_PRICE_SUFFIX = re.compile(r',?\s*\$[0-9,].*$', re.DOTALL)
+_SYMBOLS = re.compile(r'[◆★]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(raw_text: str) -> str:
+    """正規化商品文字（去除價格、標記符號及多餘空白）"""
+    text = _PRICE_SUFFIX.sub('', raw_text or '')
+    text = _SYMBOLS.sub('', text)
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+
+def product_key(category_id: str, product: Dict[str, Any]) -> str:
+    """由類別、品牌、型號及正規化文字產生穩定的商品識別碼"""
+    identity = '\x1f'.join([
+        str(category_id),
+        product.get('brand') or '',
+        product.get('model') or '',
+        normalize_text(product.get('raw_text', ''))
+    ])
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+
+
+def iter_keyed_products(categories: List[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+    """依序產生 (商品識別碼, 類別, 子分類, 商品)；同一快照中重複的商品以 #2、#3 區分"""
+    seen = {}
+    for category in categories:
+        for subcategory in category.get('subcategories', []):
+            for product in subcategory['products']:
+                key = product_key(category['category_id'], product)
+                count = seen.get(key, 0) + 1
+                seen[key] = count
+                if count > 1:
+                    key = f"{key}#{count}"
+                yield key, category, subcategory, product
+
+
+class PriceHistory:
+    """以差異方式保存每次快照的價格歷史資料庫"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record_snapshot(self, categories: List[Dict[str, Any]], taken_at: Optional[str] = None,
+                        source: Optional[str] = None, canonical: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+        """記錄一次快照，只寫入與上一次快照的差異，回傳各類事件數量
+
+        指定 canonical（商品識別碼 -> 代表識別碼，見 coolpc_dedup）時只記錄代表商品本身的價格，
+        同一群組的其他商品（福利品、套裝等）不記錄，其上架或下架不會成為代表商品的價格異動；
+        同一資料庫應固定使用或不使用。
+        """
+        taken_at = taken_at or datetime.now().isoformat(timespec='seconds')
+
+        previous = {row['product_key']: (row['price'], row['original_price'])
+                    for row in self.conn.execute('SELECT product_key, price, original_price FROM current_prices')}
+
+        products = {}
+        for key, category, subcategory, product in iter_keyed_products(categories):
+            if canonical is not None and canonical.get(key, key) != key:
+                continue
+            products[key] = (category, subcategory, product)
+
+        current = {}
+        new_products = []
+        for key, (category, subcategory, product) in products.items():
+            current[key] = (product.get('price'), product.get('original_price'))
+            if key not in previous:
+                new_products.append((key, category, subcategory, product))
+
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO snapshots (taken_at, source, product_count) VALUES (?, ?, ?)',
+                (taken_at, source, len(current))
+            )
+            snapshot_id = cursor.lastrowid
+
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO products (product_key, category_id, category_name, subcategory, '
+                'brand, model, raw_text, first_snapshot) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(key, category['category_id'], category['category_name'], subcategory['name'],
+                  product.get('brand'), product.get('model'), product.get('raw_text'), snapshot_id)
+                 for key, category, subcategory, product in new_products]
+            )
+
+            events = []
+            for key, category, subcategory, product in new_products:
+                price, original_price = current[key]
+                events.append((snapshot_id, key, EVENT_NEW, price, original_price, None))
+            removed = [key for key in previous if key not in current]
+            for key in removed:
+                events.append((snapshot_id, key, EVENT_REMOVED, None, None, previous[key][0]))
+            changed = [key for key, prices in current.items() if key in previous and previous[key] != prices]
+            for key in changed:
+                price, original_price = current[key]
+                events.append((snapshot_id, key, EVENT_PRICE, price, original_price, previous[key][0]))
+
+            self.conn.executemany(
+                'INSERT INTO events (snapshot_id, product_key, kind, price, original_price, previous_price) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                events
+            )
+
+            # 更新目前價格表，下次快照只需與此比對；只寫入新上架、異動及下架的商品
+            self.conn.executemany(
+                'DELETE FROM current_prices WHERE product_key = ?',
+                [(key,) for key in removed]
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO current_prices (product_key, price, original_price) VALUES (?, ?, ?)',
+                [(key, *current[key]) for key, category, subcategory, product in new_products]
+                + [(key, *current[key]) for key in changed]
+            )
+
+        return {
+            'snapshot_id': snapshot_id,
+            'new': len(new_products),
+            'removed': len(removed),
+            'price_changed': len(changed)
+        }
+
+    def price_history(self, key: str) -> List[Dict[str, Any]]:
+        """查詢單一商品的價格歷史（依時間排序）"""
+        rows = self.conn.execute(
+            'SELECT s.taken_at, e.kind, e.price, e.original_price, e.previous_price '
+            'FROM events e JOIN snapshots s ON s.id = e.snapshot_id '
+            'WHERE e.product_key = ? ORDER BY e.snapshot_id, e.id',
+            (key,)
+        )
+        return [dict(row) for row in rows]
+
+    def changes_since(self, since: str) -> List[Dict[str, Any]]:
+        """查詢指定時間（ISO 8601）之後的所有變動"""
+        rows = self.conn.execute(
+            'SELECT s.taken_at, e.kind, e.product_key, e.price, e.original_price, e.previous_price, '
+            'p.category_name, p.brand, p.model, p.raw_text '
+            'FROM snapshots s JOIN events e ON e.snapshot_id = s.id '
+            'LEFT JOIN products p ON p.product_key = e.product_key '
+            'WHERE s.taken_at >= ? ORDER BY e.snapshot_id, e.id',
+            (since,)
+        )
+        return [dict(row) for row in rows]
+
+    def find_products(self, keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """以關鍵字搜尋商品識別碼"""
+        rows = self.conn.execute(
+            'SELECT product_key, category_name, brand, model, raw_text FROM products '
+            'WHERE raw_text LIKE ? ORDER BY first_snapshot LIMIT ?',
+            (f'%{keyword}%', limit)
+        )
+        return [dict(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='原價屋價格歷史查詢')
+    parser.add_argument('db', help='價格歷史資料庫路徑')
+    parser.add_argument('--find', help='以關鍵字搜尋商品識別碼')
+    parser.add_argument('--product', help='查詢指定商品識別碼的價格歷史')
+    parser.add_argument('--since', help='列出指定時間 (ISO 8601，如 2025-01-01T00:00:00) 之後的變動')
+
+    args = parser.parse_args()
+
+    with PriceHistory(args.db) as history:
+        if args.find:
+            for row in history.find_products(args.find):
+                print(f"{row['product_key']}  [{row['category_name']}] {row['raw_text']}")
+
+        if args.product:
+            for row in history.price_history(args.product):
+                print(f"{row['taken_at']}  {row['kind']:<8} {row['previous_price']} -> {row['price']}")
+
+        if args.since:
+            for row in history.changes_since(args.since):
+                print(f"{row['taken_at']}  {row['kind']:<8} {row['previous_price']} -> {row['price']}  "
+                      f"[{row['category_name']}] {row['raw_text']}")
+
+        if not args.find and not args.product and not args.since:
+            print("請指定查詢方式 (--find、--product 或 --since)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原價屋商品查詢索引
+與 --json 匯出一併產生：各類別依價格排序的商品編號、品牌/型號/規格詞彙的反向索引及品牌索引
+（中英並列的品牌如 "華碩 ASUS" 分別以 "華碩"、"asus" 索引），
+查詢時只需交集索引清單並以 heap 取出前 K 筆，不必掃描並排序所有商品。
+"""
+
+import re
+import json
+import heapq
+import bisect
+import argparse
+from typing import List, Dict, Any, Iterable, Optional
+
+INDEX_VERSION = 2
+
+# 英文、數字、中文分開切詞，讓 "RTX5070" 與 "RTX 5070" 得到相同的詞彙
+_TOKEN_PATTERN = re.compile(r'[a-z]+|[0-9]+|[\u4e00-\u9fff]+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """將文字正規化並切成查詢詞彙"""
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def brand_names(brand: Optional[str]) -> List[str]:
+    """以空白分開的各個品牌名稱（正規化後），"華碩 ASUS" -> ["華碩", "asus"]"""
+    names = []
+    for word in (brand or '').split():
+        name = ''.join(tokenize(word))
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def index_path_for(json_file: str) -> str:
+    """JSON 匯出檔對應的索引檔路徑（product.json -> product.index.json）"""
+    base = json_file[:-5] if json_file.lower().endswith('.json') else json_file
+    return f"{base}.index.json"
+
+
+def _price_key(price: Optional[int]) -> float:
+    # 沒有價格的商品排在最後
+    return price if price is not None else float('inf')
+
+
+class QueryIndex:
+    """商品查詢索引：商品編號為匯出 JSON 中依類別、子分類、商品順序展開後的位置"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.locations = data['products']
+        self.prices = data['prices']
+        self.categories = data['categories']
+        self.tokens = data['tokens']
+        self.brands = data['brands']
+
+    @classmethod
+    def build(cls, categories: List[Dict[str, Any]]) -> 'QueryIndex':
+        """由解析結果建立索引"""
+        locations = []
+        prices = []
+        category_index = {}
+        tokens = {}
+        brands = {}
+
+        for cat_pos, category in enumerate(categories):
+            start = len(locations)
+            for sub_pos, subcategory in enumerate(category.get('subcategories', [])):
+                for prod_pos, product in enumerate(subcategory['products']):
+                    product_id = len(locations)
+                    locations.append([cat_pos, sub_pos, prod_pos])
+                    prices.append(product.get('price'))
+
+                    terms = set(tokenize(product.get('brand')))
+                    terms.update(tokenize(product.get('model')))
+                    for spec in product.get('specs', []):
+                        terms.update(tokenize(spec))
+                    for term in terms:
+                        tokens.setdefault(term, []).append(product_id)
+
+                    for name in brand_names(product.get('brand')):
+                        brands.setdefault(name, []).append(product_id)
+
+            end = len(locations)
+            category_index[category['category_id']] = {
+                'range': [start, end],
+                'by_price': sorted(range(start, end), key=lambda i: _price_key(prices[i]))
+            }
+
+        return cls({
+            'version': INDEX_VERSION,
+            'products': locations,
+            'prices': prices,
+            'categories': category_index,
+            'tokens': tokens,
+            'brands': brands
+        })
+
+    @classmethod
+    def load(cls, index_file: str) -> 'QueryIndex':
+        with open(index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"查詢索引版本不符，請以 --index 重新產生: {index_file}")
+        return cls(data)
+
+    def save(self, index_file: str):
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, separators=(',', ':'))
+
+    def query(self, keyword: Optional[str] = None, category_id: Optional[str] = None,
+              brand: Optional[str] = None, min_price: Optional[int] = None,
+              max_price: Optional[int] = None, limit: int = 10,
+              sort_by: str = 'price_asc') -> List[int]:
+        """查詢商品編號
+
+        keyword 的每個詞彙都必須出現在品牌、型號或規格中；brand 的每個名稱都必須是商品品牌的名稱之一
+        （"ASUS"、"華碩" 或 "華碩 ASUS" 皆可）。結果依價格排序，只取前 limit 筆。
+        """
+        postings = []
+        for term in set(tokenize(keyword)):
+            posting = self.tokens.get(term)
+            if posting is None:
+                return []
+            postings.append(posting)
+        for name in brand_names(brand):
+            posting = self.brands.get(name)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        id_range = None
+        if category_id is not None:
+            category = self.categories.get(str(category_id))
+            if category is None:
+                return []
+            id_range = category['range']
+
+        def in_price_range(product_id: int) -> bool:
+            price = self.prices[product_id]
+            if min_price is not None and (price is None or price < min_price):
+                return False
+            if max_price is not None and (price is None or price > max_price):
+                return False
+            return True
+
+        # 只有類別條件時，直接沿著類別的價格排序清單取出前幾筆
+        if not postings and id_range is not None:
+            by_price = category['by_price']
+            ordered = by_price if sort_by != 'price_desc' else self._descending(by_price)
+            results = []
+            for product_id in ordered:
+                if in_price_range(product_id):
+                    results.append(product_id)
+                    if len(results) >= limit:
+                        break
+            return results
+
+        candidates = self._intersect(postings, id_range) if postings else (
+            range(len(self.locations)) if id_range is None else range(*id_range))
+        candidates = (product_id for product_id in candidates if in_price_range(product_id))
+
+        if sort_by == 'price_desc':
+            return heapq.nlargest(limit, candidates,
+                                  key=lambda i: self.prices[i] if self.prices[i] is not None else float('-inf'))
+        return heapq.nsmallest(limit, candidates, key=lambda i: _price_key(self.prices[i]))
+
+    def _descending(self, by_price: List[int]) -> List[int]:
+        # 價格由高到低，沒有價格的商品仍排在最後
+        priced = [i for i in by_price if self.prices[i] is not None]
+        unpriced = [i for i in by_price if self.prices[i] is None]
+        return priced[::-1] + unpriced
+
+    @staticmethod
+    def _intersect(postings: List[List[int]], id_range: Optional[List[int]]) -> Iterable[int]:
+        """以最短的索引清單為基準，用二分搜尋檢查其他清單"""
+        postings = sorted(postings, key=len)
+        shortest, others = postings[0], postings[1:]
+        if id_range is not None:
+            lo = bisect.bisect_left(shortest, id_range[0])
+            hi = bisect.bisect_left(shortest, id_range[1])
+            shortest = shortest[lo:hi]
+        for product_id in shortest:
+            for posting in others:
+                pos = bisect.bisect_left(posting, product_id)
+                if pos == len(posting) or posting[pos] != product_id:
+                    break
+            else:
+                yield product_id
+
+    def resolve(self, product_id: int, categories: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """依商品編號從匯出的 JSON 資料中取出商品"""
+        cat_pos, sub_pos, prod_pos = self.locations[product_id]
+        category = categories[cat_pos]
+        subcategory = category['subcategories'][sub_pos]
+        return {
+            'category_id': category['category_id'],
+            'category': category['category_name'],
+            'subcategory': subcategory['name'],
+            **subcategory['products'][prod_pos]
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='以預建索引查詢原價屋商品')
+    parser.add_argument('json_file', help='coolpc_parser.py 匯出的 JSON 文件 (同目錄需有 .index.json)')
+    parser.add_argument('--keyword', help='關鍵字 (品牌、型號、規格)')
+    parser.add_argument('--category', help='類別編號 (如 4 = CPU、12 = 顯示卡)')
+    parser.add_argument('--brand', help='品牌')
+    parser.add_argument('--min-price', type=int, help='最低價格')
+    parser.add_argument('--max-price', type=int, help='最高價格')
+    parser.add_argument('--sort-by', choices=['price_asc', 'price_desc'], default='price_asc', help='排序方式')
+    parser.add_argument('--limit', type=int, default=10, help='結果數量限制 (預設: 10)')
+
+    args = parser.parse_args()
+
+    index = QueryIndex.load(index_path_for(args.json_file))
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        categories = json.load(f)
+
+    product_ids = index.query(args.keyword, args.category, args.brand, args.min_price,
+                              args.max_price, args.limit, args.sort_by)
+    for product_id in product_ids:
+        product = index.resolve(product_id, categories)
+        print(f"${product['price']}  [{product['category']}] {product['raw_text']}")
+
+    if not product_ids:
+        print("查無符合條件的商品")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+商品文字關鍵字分類
+群組標題特徵、商品特徵、特殊標記與型號括號略過字詞等關鍵字集中設定在 KEYWORD_CLASSES，
+載入時將所有類別的關鍵字組成一個字典樹並編譯成單一正規表示式（KEYWORDS），每個關鍵字帶有所屬類別的位元旗標；
+每段文字只掃描一次，即得到所有出現過的關鍵字類別，群組標題、商品特徵與特殊標記的判斷共用同一次掃描結果。
+"""
+
+import re
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+# 關鍵字類別設定；新增關鍵字或類別只需修改這裡，不會增加掃描次數
+KEYWORD_CLASSES = {
+    # 群組標題的特徵
+    'group_indicator': (
+        '❤',  # 心型符號開頭
+        '※',  # 註記符號
+        '↪',  # 箭頭符號（通常是附加說明）
+        '推薦用於',  # 推薦說明
+        '系列',  # 系列名稱
+        '專區',  # 專區標題
+        '配件',  # 配件分類
+        '周邊',  # 周邊分類
+    ),
+    # 較短的文字含有這些字元或品牌時視為商品而非標題
+    'product_char': ('/', 'G', 'GB', 'TB', 'Hz', 'W'),
+    'product_brand': ('ASUS', 'MSI', 'Intel', 'AMD', 'NVIDIA'),
+    # 型號括號中的保固、CPU 規格、記憶體規格等非型號內容
+    'bracket_skip': ('年保', '保固', '核/', '緒', 'GB', 'TB', 'MHz', 'W/', 'nm'),
+    # 特殊標記（類別名稱為 marker: 加上 _extract_markers 的標記名稱）
+    'marker:discussion': ('◆',),
+    'marker:image': ('★',),
+    'marker:hot': ('熱賣',),
+    'marker:price_change': ('價格異動', '↘'),
+    'marker:time_limited': ('限時', '下殺'),
+    'marker:pre_order': ('【訂】',),
+    'marker:cool_coin_discount': ('酷幣',),
+}
+
+# 各類別的位元旗標（所有分類器共用，結果可直接以 | 合併）
+KEYWORD_BITS = {name: 1 << i for i, name in enumerate(KEYWORD_CLASSES)}
+
+
+class KeywordClassifier:
+    """由關鍵字類別設定編譯的單次掃描分類器"""
+
+    def __init__(self, keyword_classes: Dict[str, Iterable[str]], class_names: Optional[Iterable[str]] = None):
+        if class_names is None:
+            class_names = keyword_classes
+        self.bits = {name: 1 << i for i, name in enumerate(keyword_classes)}
+
+        keyword_bits = {}
+        for name in class_names:
+            for keyword in keyword_classes[name]:
+                keyword_bits[keyword] = keyword_bits.get(keyword, 0) | self.bits[name]
+
+        # 每個關鍵字的旗標包含所有出現在其中的關鍵字，被較長比對結果蓋住的關鍵字也不會遺漏
+        self._keyword_bits = {keyword: self._contained_bits(keyword, keyword_bits) for keyword in keyword_bits}
+
+        # 正規表示式一次只取得互不重疊的比對結果；若有兩個關鍵字前後部分重疊，且後者會帶來新的類別
+        # （如「年保」與「保固」分屬不同類別），改為在每個位置以 lookahead 比對，速度較慢但不會遺漏
+        pattern = self._trie_pattern(keyword_bits)
+        self.overlapping = self._has_partial_overlap(self._keyword_bits)
+        self._pattern = re.compile(f'(?=({pattern}))' if self.overlapping else pattern)
+
+    @staticmethod
+    def _contained_bits(string: str, keyword_bits: Dict[str, int]) -> int:
+        bits = 0
+        for keyword, keyword_bit in keyword_bits.items():
+            if keyword in string:
+                bits |= keyword_bit
+        return bits
+
+    @staticmethod
+    def _has_partial_overlap(keyword_bits: Dict[str, int]) -> bool:
+        for left, left_bits in keyword_bits.items():
+            for right, right_bits in keyword_bits.items():
+                if right_bits & ~left_bits and any(left.endswith(right[:overlap])
+                                                   for overlap in range(1, min(len(left), len(right)))):
+                    return True
+        return False
+
+    @staticmethod
+    def _trie_pattern(strings: Iterable[str]) -> str:
+        """將字串組成字典樹後轉為正規表示式（共同前綴只比對一次，同一位置取最長的字串）"""
+        trie = {}
+        for string in strings:
+            node = trie
+            for char in string:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node: Dict[str, Any]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            if '' in node:
+                return f"(?:{pattern})?" if len(branches) == 1 else f"{pattern}?"
+            return pattern
+
+        return build(trie)
+
+    def classify(self, text: str) -> int:
+        """掃描一次文字，回傳出現過的關鍵字類別旗標"""
+        bits = 0
+        keyword_bits = self._keyword_bits
+        for keyword in self._pattern.findall(text):
+            bits |= keyword_bits[keyword]
+        return bits
+
+    def names(self, bits: int) -> Tuple[str, ...]:
+        """將旗標轉回類別名稱（除錯用）"""
+        return tuple(name for name, bit in self.bits.items() if bits & bit)
+
+
+KEYWORDS = KeywordClassifier(KEYWORD_CLASSES)
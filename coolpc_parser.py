@@ -9,174 +9,829 @@ import re
 import json
 import csv
 import html
-from typing import List, Dict, Any
+import io
+import os
+import codecs
+import functools
+import hashlib
+import gzip
+import mmap
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Pattern, Tuple, Union
 import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from coolpc_history import PriceHistory
+from coolpc_compact import compact_categories, product_to_dict
+from coolpc_index import QueryIndex, index_path_for
+from coolpc_compat import CompatibilityIndex, compat_path_for
+from coolpc_dedup import DuplicateClusters, dedup_path_for, DEFAULT_THRESHOLD as DEDUP_THRESHOLD
+from coolpc_columnar import write_columnar
+from coolpc_sqlite import SQLiteExport
+from coolpc_profile import StageProfiler, NULL_PROFILER
+from coolpc_ranking import ranking_rule, rank_products
+from coolpc_keywords import KEYWORD_BITS, KEYWORDS
+from coolpc_attributes import extract_attributes
+from coolpc_watch import SnapshotStore, make_server, run_watch, DEFAULT_LISTEN
+
+COOLPC_URL = 'https://www.coolpc.com.tw/evaluate.php'
+
+# 設置請求標頭，模擬瀏覽器
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate'
+}
+REQUEST_TIMEOUT = 30
+
+# 連線失敗或伺服器暫時錯誤時的重試次數與退避係數（1, 2, 4 秒）
+REQUEST_RETRIES = 3
+REQUEST_BACKOFF = 1.0
+
+# download_html / fetch_html 的結果
+FETCH_UPDATED = 'updated'
+FETCH_NOT_MODIFIED = 'not_modified'
+FETCH_FAILED = 'failed'
+
+_session = None
+
+# 串流下載/讀取時每次處理的位元組數
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 解析器版本標記：解析邏輯或輸出格式改變時必須更新，讓舊的快取結果失效
+PARSER_VERSION = '8'
+
+# 類別編號與名稱對照表
+CATEGORY_NAMES = {
+    '1': '品牌小主機、AIO|VR虛擬',
+    '2': '筆電|平板|穿戴配件',
+    '3': '酷！PC 套裝產線',
+    '4': '處理器 CPU',
+    '5': '主機板 MB',
+    '6': '記憶體 RAM',
+    '7': '固態硬碟 M.2|SSD',
+    '8': '2.5/3.5 傳統內接硬碟HDD',
+    '9': '隨身碟|隨身硬碟|記憶卡',
+    '10': '散熱器|散熱墊|散熱膏',
+    '11': '封閉式|開放式水冷',
+    '12': '顯示卡VGA',
+    '13': '螢幕|投影機|壁掛',
+    '14': 'CASE 機殼(+電源)',
+    '15': '電源供應器',
+    '16': '機殼風扇|機殼配件',
+    '17': '鍵盤+鼠|搖桿|桌+椅',
+    '18': '滑鼠|鼠墊|數位板',
+    '19': 'IP分享器|網卡|網通設備',
+    '20': '網路NAS|網路IPCAM',
+    '21': '音效卡|電視卡(盒)|影音',
+    '22': '喇叭|耳機|麥克風',
+    '23': '燒錄器 CD/DVD/BD',
+    '24': 'USB週邊|硬碟座|讀卡機',
+    '25': '行車紀錄器|USB視訊鏡頭',
+    '26': 'UPS不斷電|印表機|掃描',
+    '27': '介面擴充卡|專業Raid卡',
+    '28': '網路、傳輸線、轉頭|KVM',
+    '29': 'OS+應用軟體|禮物卡',
+    '30': '福利品出清'
+}
+
+# 預先編譯的正則表達式，解析過程中不再重複編譯
+_PATTERNS = {
+    # 頁面結構
+    'select': re.compile(r'<SELECT[^>]*name=n(\d+)[^>]*>(.*?)</SELECT>', re.DOTALL | re.IGNORECASE),
+    'select_close': re.compile(r'</SELECT>', re.IGNORECASE),
+    # SELECT 內容的標籤邊界：OPTION 內容會延伸到下一個邊界為止
+    'tag_boundary': re.compile(r'<(OPTION|OPTGROUP|/SELECT|/OPTGROUP|/OPTION)', re.IGNORECASE),
+    'optgroup': re.compile(r'<OPTGROUP\s+LABEL=[\'"](.*?)[\'"]>', re.IGNORECASE),
+    'option': re.compile(r'<OPTION([^>]*?)>', re.IGNORECASE),
+    'html_tag': re.compile(r'<[^>]*>'),
+    'option_value': re.compile(r'value=([^>\s]*)'),
+    'option_class': re.compile(r'class=([^>\s]*)'),
+    # 商品文字
+    'price': re.compile(r'\$([0-9,]+)'),
+    'price_suffix': re.compile(r'\$[0-9,]+.*$'),
+    'symbol_suffix': re.compile(r'[◆★↓→].*'),
+    'promo_prefix': re.compile(r'^\[[^\]]+\]\s*'),
+    'english_prefix': re.compile(r'^[A-Za-z]+\s*'),
+    'chinese_english_brand': re.compile(r'^([\u4e00-\u9fff]+)\s+([A-Za-z]+)'),
+    'english_brand': re.compile(r'^([A-Za-z]+)'),
+    'bracket': re.compile(r'【([^】]+)】'),
+    'specs': re.compile(r'】([^$]+)\$'),
+    'discount': re.compile(r'\$([0-9,]+)↘\$([0-9,]+)'),
+    'cool_coin': re.compile(r'酷幣(\d+)'),
+}
+
+# 原始 Big5 位元組用的頁面結構正則表達式（parse_raw）：'<'、'>'、引號都小於 0x40，
+# 不會出現在 Big5 雙位元組字元中，因此以這些字元為界的位置必定是完整字元的邊界
+_RAW_PATTERNS = {
+    name: re.compile(_PATTERNS[name].pattern.encode('ascii'), _PATTERNS[name].flags & ~re.UNICODE)
+    for name in ('select', 'tag_boundary', 'optgroup', 'option')
+}
+
+# 類別摘要中的統計欄位
+_STATS_PATTERNS = (
+    ('total_items', re.compile(r'共有商品\s*(\d+)\s*樣')),
+    ('hot_items', re.compile(r'熱賣\s*(\d+)')),
+    ('with_images', re.compile(r'圖片\s*(\d+)')),
+    ('with_discussions', re.compile(r'討論\s*(\d+)')),
+    ('price_changes', re.compile(r'價格異動\s*(\d+)')),
+    ('time_limited', re.compile(r'限時下殺▼(\d+)')),
+)
+
+# 群組標題、商品特徵、特殊標記及型號括號略過字詞的關鍵字類別（設定見 coolpc_keywords.KEYWORD_CLASSES）
+_GROUP_INDICATOR = KEYWORD_BITS['group_indicator']
+_PRODUCT_FEATURE = KEYWORD_BITS['product_char'] | KEYWORD_BITS['product_brand']
+_BRACKET_SKIP = KEYWORD_BITS['bracket_skip']
+
+# 特殊標記：(標記名稱, 關鍵字類別旗標, 對應的 CSS class)，順序即 markers 清單的順序
+_MARKER_RULES = tuple(
+    (marker, KEYWORD_BITS.get(f'marker:{marker}', 0), css_class)
+    for marker, css_class in (
+        ('discussion', None),
+        ('image', None),
+        ('hot', 'r'),
+        ('price_change', 'g'),
+        ('hot_and_price_change', 'b'),
+        ('time_limited', None),
+        ('pre_order', None),
+        ('cool_coin_discount', None),
+    )
+)
+_MARKER_MASK = functools.reduce(lambda bits, rule: bits | rule[1], _MARKER_RULES, 0)
+_marker_cache = {}
+
+# 依品牌產生的型號正則表達式範本，{brand} 會被替換為英文品牌名稱
+_BRAND_PATTERN_TEMPLATES = {
+    # Pattern: 威剛 ADATA LEGEND 900 512GB
+    'chinese_english_model': r'^[\u4e00-\u9fff]+\s+{brand}\s+([A-Za-z0-9\s\-]+?)(?:\s+\d+(?:GB|TB|G)|/)',
+    # Examples: "AMD R7 7800X3D", "Intel i5-14400F", "AMD R5 3400G"
+    'cpu_model': r'^{brand}\s+([A-Za-z0-9\-X3D]+(?:\s+[A-Za-z0-9\-X3D]+)*?)(?:\s*(?:代理盒裝|盒)|(?:\s+MPK)|【)',
+    'cpu_fallback': r'^{brand}\s+([A-Za-z0-9\-X3D]+(?:\s+[A-Za-z0-9\-X3D]+)*?)(?:\s*(?:代理盒裝|盒|含風扇)|(?:\s+MPK)|【)',
+    # Pattern: Brand ModelName Capacity/Specs
+    'model': r'^{brand}\s+([A-Za-z0-9\-]+)\s+(?:\d+(?:GB|TB|G)|/)',
+}
+
+# 品牌正則表達式快取上限（品牌數量有限，足以涵蓋整份報價單）
+BRAND_PATTERN_CACHE_SIZE = 512
+
+
+@functools.lru_cache(maxsize=BRAND_PATTERN_CACHE_SIZE)
+def _brand_pattern(kind: str, brand: str) -> Pattern:
+    """取得依品牌編譯的型號正則表達式（LRU 快取）"""
+    return re.compile(_BRAND_PATTERN_TEMPLATES[kind].format(brand=brand))
+
+
+def regex_cache_stats() -> Dict[str, int]:
+    """取得品牌正則表達式快取的命中統計"""
+    info = _brand_pattern.cache_info()
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'maxsize': info.maxsize,
+        'currsize': info.currsize
+    }
+
+
+def get_session() -> requests.Session:
+    """取得共用的 requests Session（保持連線並自動重試）"""
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=REQUEST_RETRIES,
+            backoff_factor=REQUEST_BACKOFF,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False
+        )
+        session = requests.Session()
+        session.headers.update(REQUEST_HEADERS)
+        adapter = HTTPAdapter(max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _session = session
+    return _session
+
+
+def _fetch_meta_path(output_file: str) -> str:
+    """HTML 文件對應的下載中繼資料（ETag / Last-Modified）路徑"""
+    return f"{output_file}.meta.json"
+
+
+def _load_fetch_meta(output_file: str, url: str, raw: bool = False) -> Dict[str, str]:
+    """讀取上次下載的中繼資料；HTML 文件不存在、網址不同或保存格式（原始 Big5 / UTF-8）不同時視為沒有"""
+    meta_path = _fetch_meta_path(output_file)
+    if not (os.path.exists(output_file) and os.path.exists(meta_path)):
+        return {}
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # 沒有 raw 欄位的中繼資料是加入 --raw 之前下載的，文件一律為 UTF-8
+    if meta.get('url') != url or meta.get('raw', False) != raw:
+        return {}
+    return meta
+
+
+def decode_big5(data: bytes) -> str:
+    """解碼原價屋的 Big5 網頁內容"""
+    # 嘗試用 BIG5 解碼，如果失敗則嘗試其他編碼
+    try:
+        return data.decode('big5')
+    except UnicodeDecodeError:
+        try:
+            return data.decode('big5-hkscs')
+        except UnicodeDecodeError:
+            # 如果還是失敗，使用 ignore 參數忽略無法解碼的字符
+            return data.decode('big5', errors='ignore')
+
+
+class _Big5StreamDecoder(codecs.IncrementalDecoder):
+    """漸進式 Big5 解碼器
+    
+    與 download_html 相同的策略：先以 Big5 解碼，遇到無法解碼的位元組時，
+    從該區塊起改用 Big5-HKSCS 並忽略仍無法解碼的字元。
+    """
+    
+    def __init__(self, errors: str = 'strict'):
+        super().__init__(errors)
+        self._decoder = codecs.getincrementaldecoder('big5')()
+        self._fallback = False
+    
+    def decode(self, input: bytes, final: bool = False) -> str:
+        if not self._fallback:
+            pending = self._decoder.getstate()[0]
+            try:
+                return self._decoder.decode(input, final)
+            except UnicodeDecodeError:
+                self._decoder = codecs.getincrementaldecoder('big5hkscs')(errors='ignore')
+                self._fallback = True
+                input = pending + input
+        return self._decoder.decode(input, final)
+    
+    def reset(self):
+        self._decoder = codecs.getincrementaldecoder('big5')()
+        self._fallback = False
+
+
+def _iter_source_text(source: Union[str, 'os.PathLike', Iterable[bytes]], encoding: Optional[str] = None) -> Iterator[str]:
+    """將檔案路徑、串流回應或位元組迭代器逐段解碼為文字
+    
+    檔案路徑預設為 UTF-8（download_html 寫出的格式），其餘來源預設為原價屋原始的 Big5 位元組。
+    換行字元與以文字模式讀檔相同，統一轉為 LF。
+    """
+    file_obj = None
+    if isinstance(source, (str, os.PathLike)):
+        file_obj = open(source, 'rb')
+        chunks = iter(lambda: file_obj.read(STREAM_CHUNK_SIZE), b'')
+        encoding = encoding or 'utf-8'
+    elif hasattr(source, 'iter_content'):
+        chunks = source.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+    else:
+        chunks = iter(source)
+    
+    if encoding is None or encoding.replace('-', '').lower() == 'big5':
+        byte_decoder = _Big5StreamDecoder()
+    else:
+        byte_decoder = codecs.getincrementaldecoder(encoding)()
+    decoder = io.IncrementalNewlineDecoder(byte_decoder, translate=True)
+    
+    try:
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+    finally:
+        if file_obj is not None:
+            file_obj.close()
+
+
+class CategoryCache:
+    """以 SELECT 區塊原始內容雜湊為鍵的類別解析結果磁碟快取
+    
+    每個區塊存成 <sha256>.json，鍵值包含 PARSER_VERSION，解析器更新後舊結果自動失效。
+    """
+    
+    _FILE_PATTERN = re.compile(r'^[0-9a-f]{64}\.json$')
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def block_key(select_id: str, select_content: Union[str, '_RawBlock']) -> str:
+        """計算 SELECT 區塊的快取鍵（_RawBlock 直接以原始位元組計算，不複製內容）"""
+        digest = hashlib.sha256()
+        digest.update(f"{PARSER_VERSION}\0{select_id}\0".encode('utf-8'))
+        if isinstance(select_content, _RawBlock):
+            digest.update(b'raw\0')
+            with memoryview(select_content.data()) as view:
+                digest.update(view[select_content.start:select_content.end])
+        else:
+            digest.update(select_content.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """讀取快取，回傳 (是否命中, 類別資料)；類別資料可能為 None（區塊沒有商品）"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return True, json.load(f)
+        except (OSError, ValueError):
+            return False, None
+    
+    def put(self, key: str, category_data: Optional[Dict[str, Any]]):
+        """寫入快取（先寫暫存檔再取代，避免留下不完整的檔案）"""
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(category_data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    def prune(self, keep_keys: Iterable[str]):
+        """刪除不屬於目前快照的快取檔案"""
+        keep = {f"{key}.json" for key in keep_keys}
+        for name in os.listdir(self.cache_dir):
+            if self._FILE_PATTERN.match(name) and name not in keep:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+
+# CSV 匯出欄位
+CSV_FIELDS = ('category_id', 'category', 'subcategory', 'group', 'brand', 'model', 'specs',
+              'price', 'original_price', 'discount_amount', 'markers', 'raw_text')
+
+
+def _open_output(output_file: str):
+    """開啟文字輸出檔，副檔名為 .gz 時以 gzip 壓縮寫入"""
+    if output_file.endswith('.gz'):
+        return gzip.open(output_file, 'wt', encoding='utf-8', newline='')
+    return open(output_file, 'w', encoding='utf-8', newline='')
+
+
+def _csv_row(category: Dict[str, Any], subcategory: Dict[str, Any], product) -> Dict[str, Any]:
+    return {
+        'category_id': category['category_id'],
+        'category': category['category_name'],
+        'subcategory': subcategory['name'],
+        'group': product.get('group', ''),
+        'brand': product.get('brand', ''),
+        'model': product.get('model', ''),
+        'specs': ' / '.join(product.get('specs', [])),
+        'price': product.get('price'),
+        'original_price': product.get('original_price'),
+        'discount_amount': product.get('discount_amount'),
+        'markers': ', '.join(product.get('markers', [])),
+        'raw_text': product.get('raw_text', '')
+    }
+
+
+def _jsonl_row(category: Dict[str, Any], subcategory: Dict[str, Any], product) -> Dict[str, Any]:
+    return {
+        'category_id': category['category_id'],
+        'category': category['category_name'],
+        'subcategory': subcategory['name'],
+        **product_to_dict(product)
+    }
+
+
+def _parse_select_block(block: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """在工作行程中解析單一 SELECT 區塊（只傳遞原始區塊文字）"""
+    select_id, select_content = block
+    return WorkingCoolPCParser('')._parse_category(select_content, select_id)
+
+
+def _parse_select_block_timed(block: Tuple[str, str]) -> Tuple[Optional[Dict[str, Any]], float, float, Dict[str, int]]:
+    """同 _parse_select_block，另外回傳工作行程中的實際時間、CPU 時間及品牌正則表達式快取的命中變化（效能分析用）"""
+    cache = _brand_pattern.cache_info()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    category_data = _parse_select_block(block)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    after = _brand_pattern.cache_info()
+    return category_data, wall, cpu, {'regex_cache_hits': after.hits - cache.hits,
+                                      'regex_cache_misses': after.misses - cache.misses}
+
+
+def _count_products(category_data: Optional[Dict[str, Any]]) -> int:
+    if not category_data:
+        return 0
+    return sum(len(subcategory['products']) for subcategory in category_data['subcategories'])
+
+
+def _clean_option_text(content: str) -> str:
+    """去除 OPTION 內容前後空白及殘留的 HTML 標籤"""
+    content = content.strip()
+    if '<' in content:
+        content = _PATTERNS['html_tag'].sub('', content)
+    return content
+
+
+# 直接取得 Big5 codec 的解碼函式，省去每次 bytes.decode 查詢 codec 的成本（片段很短時佔大部分時間）
+_big5_decode = codecs.lookup('big5').decode
+
+
+def _decode_raw(data: bytes) -> str:
+    """解碼原始 Big5 片段（規則同 decode_big5）；換行字元與以文字模式讀檔相同，統一轉為 LF"""
+    try:
+        text = _big5_decode(data)[0]
+    except UnicodeDecodeError:
+        text = decode_big5(data)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+# 工作行程中已開啟的原始文件 mmap（路徑 -> mmap），同一文件的多個區塊共用
+_raw_maps = {}
+
+
+class _RawBlock:
+    """原始 Big5 文件中一個 SELECT 區塊內容的位置
+
+    不複製區塊內容；傳給工作行程時只傳遞路徑與位置，由工作行程自行 mmap 文件。
+    """
+
+    __slots__ = ('path', 'start', 'end', '_data')
+
+    def __init__(self, path: str, start: int, end: int, data: Optional[mmap.mmap] = None):
+        self.path = path
+        self.start = start
+        self.end = end
+        self._data = data
+
+    def __reduce__(self):
+        return _RawBlock, (self.path, self.start, self.end)
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def data(self) -> mmap.mmap:
+        if self._data is None:
+            data = _raw_maps.get(self.path)
+            if data is None:
+                with open(self.path, 'rb') as f:
+                    data = _raw_maps[self.path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data = data
+        return self._data
+
+    def options(self) -> Iterator[Tuple[Optional[str], str, str]]:
+        """同 WorkingCoolPCParser._iter_options，直接在 mmap 上尋找標籤邊界，只解碼各 OPTION 的文字"""
+        data = self.data()
+        current_optgroup = None
+        optgroup_end = 0
+        option_end = 0
+        pending = None
+        
+        for boundary in _RAW_PATTERNS['tag_boundary'].finditer(data, self.start, self.end):
+            pos = boundary.start()
+            
+            if pending is not None and pos >= pending[2]:
+                yield pending[0], pending[1], _clean_option_text(_decode_raw(data[pending[2]:pos]))
+                pending = None
+            
+            tag = boundary.group(1).upper()
+            if tag == b'OPTGROUP':
+                if pos >= optgroup_end:
+                    optgroup_match = _RAW_PATTERNS['optgroup'].match(data, pos, self.end)
+                    if optgroup_match:
+                        current_optgroup = _decode_raw(optgroup_match.group(1))
+                        optgroup_end = optgroup_match.end()
+            elif tag == b'OPTION':
+                if pos >= option_end:
+                    option_match = _RAW_PATTERNS['option'].match(data, pos, self.end)
+                    if option_match:
+                        option_end = option_match.end()
+                        pending = (current_optgroup, _decode_raw(option_match.group(1)), option_end)
+        
+        if pending is not None:
+            yield pending[0], pending[1], _clean_option_text(_decode_raw(data[pending[2]:self.end]))
+
 
 class WorkingCoolPCParser:
-    def __init__(self, html_file: str):
+    def __init__(self, html_file: str, cache_dir: Optional[str] = None, profiler: Optional[StageProfiler] = None):
         self.html_file = html_file
         self.categories = []
+        # 指定 cache_dir 時，內容未變更的 SELECT 區塊直接沿用上次的解析結果
+        self.cache = CategoryCache(cache_dir) if cache_dir else None
+        self.cache_stats = None
+        # 跨類別重複商品分群（find_duplicates 之後才有）；SQLite 匯出記錄其代表識別碼，價格歷史只記錄代表商品
+        self.duplicates = None
+        # 效能分析（見 coolpc_profile）；未指定時為空操作
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
     
     @staticmethod
     def download_html(output_file: str = 'evaluate.html') -> bool:
-        """從 CoolPC 網站下載並轉換 HTML 文件"""
-        url = 'https://www.coolpc.com.tw/evaluate.php'
-
+        """從 CoolPC 網站下載並轉換 HTML 文件（網頁未變更時沿用既有文件）"""
+        return WorkingCoolPCParser.fetch_html(output_file) != FETCH_FAILED
+    
+    @staticmethod
+    def fetch_html(output_file: str = 'evaluate.html', url: str = COOLPC_URL, raw: bool = False,
+                   profiler=NULL_PROFILER) -> str:
+        """以條件式請求下載 HTML 文件
+        
+        使用共用 Session 保持連線，並帶上次保存的 ETag / Last-Modified；
+        回傳 FETCH_UPDATED、FETCH_NOT_MODIFIED（伺服器回應 304，文件維持不變）或 FETCH_FAILED。
+        raw 為 True 時直接保存原始的 Big5 位元組（供 parse_raw 使用），不轉成 UTF-8。
+        """
         try:
             print(f"正在從 {url} 下載資料...")
 
-            # 設置請求標頭，模擬瀏覽器
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            # 文件格式與這次不同時不帶條件標頭，避免 304 後沿用格式不符的文件
+            meta = _load_fetch_meta(output_file, url, raw)
+            headers = {}
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
 
             # 使用 requests 下載資料（timeout 設定 30 秒）
-            response = requests.get(url, headers=headers, timeout=30)
+            response = get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+
+            if response.status_code == 304:
+                print(f"資料未變更，沿用 {output_file}")
+                return FETCH_NOT_MODIFIED
 
             # 檢查 HTTP 狀態碼
             response.raise_for_status()
 
-            # 嘗試用 BIG5 解碼，如果失敗則嘗試其他編碼
-            try:
-                content = response.content.decode('big5')
-            except UnicodeDecodeError:
-                try:
-                    content = response.content.decode('big5-hkscs')
-                except UnicodeDecodeError:
-                    # 如果還是失敗，使用 ignore 參數忽略無法解碼的字符
-                    content = response.content.decode('big5', errors='ignore')
-
             # 寫入文件
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            if raw:
+                with open(output_file, 'wb') as f:
+                    f.write(response.content)
+            else:
+                with profiler.stage('decode') as stage:
+                    content = decode_big5(response.content)
+                    stage.add(bytes=len(response.content))
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+            # 保存驗證資訊供下次條件式請求使用
+            with open(_fetch_meta_path(output_file), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'url': url,
+                    'raw': raw,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }, f, ensure_ascii=False, indent=2)
 
             print(f"成功下載並保存到 {output_file}")
-            return True
+            return FETCH_UPDATED
 
-        except requests.exceptions.SSLError as e:
+        except Exception as e:
+            WorkingCoolPCParser._report_request_error(e)
+            return FETCH_FAILED
+    
+    @staticmethod
+    def open_stream(url: str = COOLPC_URL) -> Optional[requests.Response]:
+        """以串流模式連線到 CoolPC 網站，回傳尚未讀取內容的回應（失敗時回傳 None）"""
+        try:
+            print(f"正在從 {url} 串流下載資料...")
+            response = get_session().get(url, timeout=REQUEST_TIMEOUT, stream=True)
+            response.raise_for_status()
+            return response
+        except Exception as e:
+            WorkingCoolPCParser._report_request_error(e)
+            return None
+    
+    @staticmethod
+    def _report_request_error(e: Exception):
+        """列印下載錯誤訊息及排除建議"""
+        if isinstance(e, requests.exceptions.SSLError):
             print(f"SSL 錯誤: {e}")
             print("提示: 可能是 SSL 證書問題，請嘗試更新 certifi: pip3 install --upgrade certifi")
-            return False
-        except requests.exceptions.Timeout:
-            print(f"連線逾時: 伺服器回應時間超過 30 秒")
-            return False
-        except requests.exceptions.ConnectionError as e:
+        elif isinstance(e, requests.exceptions.Timeout):
+            print(f"連線逾時: 伺服器回應時間超過 {REQUEST_TIMEOUT} 秒")
+        elif isinstance(e, requests.exceptions.ConnectionError):
             print(f"連線錯誤: {e}")
             print("提示: 請檢查網路連線")
-            return False
-        except requests.exceptions.HTTPError as e:
+        elif isinstance(e, requests.exceptions.HTTPError):
             print(f"HTTP 錯誤: {e}")
-            print(f"狀態碼: {response.status_code}")
-            return False
-        except requests.exceptions.RequestException as e:
+            print(f"狀態碼: {e.response.status_code}")
+        elif isinstance(e, requests.exceptions.RequestException):
             print(f"網路錯誤: {e}")
-            return False
-        except Exception as e:
+        else:
             print(f"發生錯誤: {e}")
-            return False
         
-    def parse_html(self) -> List[Dict[str, Any]]:
-        """解析 HTML 文件並提取商品數據"""
+    def parse_html(self, jobs: int = 1) -> List[Dict[str, Any]]:
+        """解析 HTML 文件並提取商品數據
+        
+        jobs 大於 1 時以多個行程平行解析各 SELECT 區塊，0 表示使用所有 CPU 核心；
+        結果依原始類別順序合併，與單行程解析完全相同。
+        """
+        profiler = self.profiler
         
-        with open(self.html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        with profiler.stage('read') as stage:
+            with open(self.html_file, 'rb') as f:
+                data = f.read()
+            stage.add(bytes=len(data))
+        
+        with profiler.stage('decode') as stage:
+            html_content = data.decode('utf-8')
+            # 換行字元與以文字模式讀檔相同
+            if '\r' in html_content:
+                html_content = html_content.replace('\r\n', '\n').replace('\r', '\n')
+            stage.add(bytes=len(data))
+        del data
         
         # 使用与简化版本相同的逻辑
-        select_pattern = r'<SELECT[^>]*name=n(\d+)[^>]*>(.*?)</SELECT>'
-        select_matches = re.findall(select_pattern, html_content, re.DOTALL | re.IGNORECASE)
+        with profiler.stage('select_split') as stage:
+            select_matches = _PATTERNS['select'].findall(html_content)
+            stage.add(blocks=len(select_matches))
+        
+        return self._parse_select_blocks(select_matches, jobs)
+    
+    def parse_raw(self, jobs: int = 1) -> List[Dict[str, Any]]:
+        """解析原始 Big5 HTML 文件（fetch_html(raw=True) 保存的格式），結果與 parse_html 相同
+        
+        以 mmap 開啟文件，直接在位元組上切割 SELECT 區塊及尋找 OPTION 邊界，只解碼各 OPTION 的文字，
+        不需要先將整份網頁解碼成字串。jobs 大於 1 時工作行程各自 mmap 同一文件，只傳遞區塊位置。
+        """
+        profiler = self.profiler
+        profiler.note('--raw 只解碼各 OPTION 的文字，Big5 解碼時間計入 parse_categories')
         
-        categories = []
+        with profiler.stage('read') as stage:
+            size = os.path.getsize(self.html_file)
+            stage.add(bytes=size)
+            if size == 0:
+                self.categories = []
+                return self.categories
         
-        for select_id, select_content in select_matches:
-            category_data = self._parse_category(select_content, select_id)
-            if category_data:
-                categories.append(category_data)
+        with open(self.html_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with profiler.stage('select_split') as stage:
+                select_matches = [
+                    (match.group(1).decode('ascii'), _RawBlock(self.html_file, match.start(2), match.end(2), data))
+                    for match in _RAW_PATTERNS['select'].finditer(data)
+                ]
+                stage.add(blocks=len(select_matches))
+            return self._parse_select_blocks(select_matches, jobs)
+    
+    def _parse_select_blocks(self, select_matches: List[Tuple[str, Union[str, _RawBlock]]],
+                             jobs: int) -> List[Dict[str, Any]]:
+        """解析切割好的 SELECT 區塊（parse_html 與 parse_raw 共用），並套用類別快取"""
+        profiler = self.profiler
+        parsed = [None] * len(select_matches)
+        pending = list(range(len(select_matches)))
+        
+        # 先從快取取出內容未變更的區塊，只重新解析有變動的類別
+        if self.cache is not None:
+            cache_keys = [CategoryCache.block_key(select_id, select_content)
+                          for select_id, select_content in select_matches]
+            pending = []
+            for i, key in enumerate(cache_keys):
+                found, category_data = self.cache.get(key)
+                if found:
+                    parsed[i] = category_data
+                else:
+                    pending.append(i)
+        
+        blocks = [select_matches[i] for i in pending]
+        with profiler.stage('parse_categories') as stage:
+            if jobs != 1 and len(blocks) > 1:
+                results = self._parse_categories_parallel(blocks, jobs, profiler)
+            else:
+                parse_category = self._profiled_parse_category if profiler.enabled else self._parse_category
+                results = [parse_category(select_content, select_id)
+                           for select_id, select_content in blocks]
+            stage.add(categories=len(blocks))
+        
+        for i, category_data in zip(pending, results):
+            parsed[i] = category_data
+        
+        if self.cache is not None:
+            for i in pending:
+                self.cache.put(cache_keys[i], parsed[i])
+            self.cache.prune(cache_keys)
+            self.cache_stats = {'reused': len(select_matches) - len(pending), 'parsed': len(pending)}
+        
+        categories = [category_data for category_data in parsed if category_data]
         
         self.categories = categories
         return categories
     
-    def _get_category_name(self, select_id: str) -> str:
-        """获取类别名称 - 使用完整映射表"""
+    def iter_categories(self, source=None, encoding: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """串流解析：每讀到一個完整的 SELECT 區塊就立即產生該類別的解析結果
         
-        category_mapping = {
-            '1': '品牌小主機、AIO|VR虛擬',
-            '2': '筆電|平板|穿戴配件',
-            '3': '酷！PC 套裝產線',
-            '4': '處理器 CPU',
-            '5': '主機板 MB',
-            '6': '記憶體 RAM',
-            '7': '固態硬碟 M.2|SSD',
-            '8': '2.5/3.5 傳統內接硬碟HDD',
-            '9': '隨身碟|隨身硬碟|記憶卡',
-            '10': '散熱器|散熱墊|散熱膏',
-            '11': '封閉式|開放式水冷',
-            '12': '顯示卡VGA',
-            '13': '螢幕|投影機|壁掛',
-            '14': 'CASE 機殼(+電源)',
-            '15': '電源供應器',
-            '16': '機殼風扇|機殼配件',
-            '17': '鍵盤+鼠|搖桿|桌+椅',
-            '18': '滑鼠|鼠墊|數位板',
-            '19': 'IP分享器|網卡|網通設備',
-            '20': '網路NAS|網路IPCAM',
-            '21': '音效卡|電視卡(盒)|影音',
-            '22': '喇叭|耳機|麥克風',
-            '23': '燒錄器 CD/DVD/BD',
-            '24': 'USB週邊|硬碟座|讀卡機',
-            '25': '行車紀錄器|USB視訊鏡頭',
-            '26': 'UPS不斷電|印表機|掃描',
-            '27': '介面擴充卡|專業Raid卡',
-            '28': '網路、傳輸線、轉頭|KVM',
-            '29': 'OS+應用軟體|禮物卡',
-            '30': '福利品出清'
-        }
+        source 可以是檔案路徑（預設為 self.html_file）、requests 的串流回應或任何位元組迭代器，
+        編碼規則見 _iter_source_text。已解析的區塊會立即從緩衝區移除，記憶體用量只與單一類別大小相關。
+        """
+        if source is None:
+            source = self.html_file
+        
+        select_pattern = _PATTERNS['select']
+        close_pattern = _PATTERNS['select_close']
+        buffer = ''
+        scan_from = 0  # 尚未搜尋過 </SELECT> 的起點
+        cache_keys = []
+        if self.cache is not None:
+            self.cache_stats = {'reused': 0, 'parsed': 0}
+        parse_category = self._profiled_parse_category if self.profiler.enabled else self._parse_category
+        self.profiler.note('串流解析的解碼與解析交錯進行，解碼時間計入 stream_parse / parse')
+        
+        for text in _iter_source_text(source, encoding):
+            buffer += text
+            while True:
+                close_match = close_pattern.search(buffer, scan_from)
+                if not close_match:
+                    # 保留可能被切斷的 </SELECT> 開頭
+                    scan_from = max(0, len(buffer) - len('</SELECT>') + 1)
+                    break
+                
+                select_match = select_pattern.search(buffer, 0, close_match.end())
+                if not select_match:
+                    scan_from = close_match.end()
+                    continue
+                
+                select_id, select_content = select_match.groups()
+                if self.cache is not None:
+                    key = CategoryCache.block_key(select_id, select_content)
+                    cache_keys.append(key)
+                    found, category_data = self.cache.get(key)
+                    if found:
+                        self.cache_stats['reused'] += 1
+                    else:
+                        category_data = parse_category(select_content, select_id)
+                        self.cache.put(key, category_data)
+                        self.cache_stats['parsed'] += 1
+                else:
+                    category_data = parse_category(select_content, select_id)
+                if category_data:
+                    yield category_data
+                
+                buffer = buffer[select_match.end():]
+                scan_from = 0
         
-        return category_mapping.get(select_id, f"類別 {select_id}")
+        if self.cache is not None:
+            self.cache.prune(cache_keys)
     
-    def _parse_category(self, select_content: str, select_id: str) -> Dict[str, Any]:
-        """解析類別內容"""
+    def parse_stream(self, source=None, encoding: Optional[str] = None) -> List[Dict[str, Any]]:
+        """以串流方式解析來源，結果與 parse_html 相同"""
+        categories = list(self.iter_categories(source, encoding))
+        self.categories = categories
+        return categories
+    
+    @staticmethod
+    def _parse_categories_parallel(select_matches: List[Tuple[str, str]], jobs: int,
+                                   profiler=NULL_PROFILER) -> List[Optional[Dict[str, Any]]]:
+        """以行程池平行解析 SELECT 區塊，並依原始順序回傳結果"""
+        workers = jobs if jobs > 0 else (os.cpu_count() or 1)
+        workers = min(workers, len(select_matches))
         
-        # 獲取類別名稱
-        category_name = self._get_category_name(select_id)
+        # 較大的區塊（如顯示卡、機殼）先送出，避免最後只剩單一行程在工作
+        order = sorted(range(len(select_matches)), key=lambda i: -len(select_matches[i][1]))
+        results = [None] * len(select_matches)
         
-        # 先找到所有的 OPTGROUP 和 OPTION 元素
-        # 解析 OPTGROUP
-        optgroup_pattern = r'<OPTGROUP\s+LABEL=[\'"](.*?)[\'"]>'
-        optgroup_matches = list(re.finditer(optgroup_pattern, select_content, re.IGNORECASE))
+        worker = _parse_select_block_timed if profiler.enabled else _parse_select_block
+        profiler.note('--jobs 平行解析：regex_cache 只含主行程，工作行程的命中統計見 workers；'
+                      'cProfile 也只記錄主行程')
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(i, executor.submit(worker, select_matches[i])) for i in order]
+            for i, future in futures:
+                results[i] = future.result()
+        
+        if profiler.enabled:
+            for i, (category_data, wall, cpu, counters) in enumerate(results):
+                profiler.add_worker_counters(tasks=1, **counters)
+                select_id, select_content = select_matches[i]
+                profiler.record_category(select_id, CATEGORY_NAMES.get(select_id, f"類別 {select_id}"), wall, cpu,
+                                         len(select_content), _count_products(category_data))
+                results[i] = category_data
+        
+        return results
+    
+    def _profiled_parse_category(self, select_content: str, select_id: str) -> Dict[str, Any]:
+        """_parse_category 並記錄該類別的耗時（只在啟用效能分析時使用）"""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        category_data = self._parse_category(select_content, select_id)
+        self.profiler.record_category(select_id, self._get_category_name(select_id), time.perf_counter() - wall,
+                                      time.process_time() - cpu, len(select_content), _count_products(category_data))
+        return category_data
+    
+    def _get_category_name(self, select_id: str) -> str:
+        """获取类别名称 - 使用完整映射表"""
         
-        # 建立 OPTGROUP 位置索引
-        optgroup_positions = [(match.start(), match.end(), match.group(1)) for match in optgroup_matches]
+        return CATEGORY_NAMES.get(select_id, f"類別 {select_id}")
+    
+    def _parse_category(self, select_content: Union[str, _RawBlock], select_id: str) -> Dict[str, Any]:
+        """解析類別內容（select_content 可以是文字或原始 Big5 文件中的 _RawBlock）"""
         
-        # 找到所有 OPTION 元素（處理沒有關閉標籤的情況）
-        # 先找到所有 OPTION 標籤的位置
-        option_starts = list(re.finditer(r'<OPTION([^>]*?)>', select_content, re.IGNORECASE))
-        option_matches = []
+        # 獲取類別名稱
+        category_name = self._get_category_name(select_id)
         
-        for i, match in enumerate(option_starts):
-            attrs = match.group(1)
-            start_pos = match.end()
-            
-            # 找到下一個標籤的開始位置
-            next_tag_match = re.search(r'<(?:OPTION|OPTGROUP|/SELECT|/OPTGROUP|/OPTION)', select_content[start_pos:], re.IGNORECASE)
-            if next_tag_match:
-                end_pos = start_pos + next_tag_match.start()
-            else:
-                end_pos = len(select_content)
-            
-            content = select_content[start_pos:end_pos].strip()
-            
-            # Remove any remaining HTML tags from content
-            content = re.sub(r'<[^>]*>', '', content)
-            
-            # 確定這個 OPTION 屬於哪個 OPTGROUP
-            option_pos = match.start()
-            current_optgroup = None
-            for og_start, og_end, og_label in optgroup_positions:
-                if option_pos > og_start:
-                    current_optgroup = og_label
-            
-            option_matches.append((attrs, content, current_optgroup))
+        # 單次掃描 SELECT 內容，依序取得每個 OPTION 及其所屬 OPTGROUP
+        options = (select_content.options() if isinstance(select_content, _RawBlock)
+                   else self._iter_options(select_content))
+        option_matches = [(attrs, content, optgroup_label)
+                          for optgroup_label, attrs, content in options]
         
         if not option_matches:
             return None
@@ -185,11 +840,11 @@ class WorkingCoolPCParser:
         parsed_options = []
         for attrs_str, content, optgroup_label in option_matches:
             # 提取 value
-            value_match = re.search(r'value=([^>\s]*)', attrs_str)
-            value = value_match.group(1) if value_match else ''
+            value_match = _PATTERNS['option_value'].search(attrs_str)
+            value = value_match.group(1).strip('\'"') if value_match else ''
             
             # 提取 class
-            class_match = re.search(r'class=([^>\s]*)', attrs_str)
+            class_match = _PATTERNS['option_class'].search(attrs_str)
             css_class = class_match.group(1) if class_match else ''
             
             # 檢查是否 disabled
@@ -218,6 +873,7 @@ class WorkingCoolPCParser:
         # 按子分類組織商品
         subcategories = {}
         current_group = None
+        ranking = ranking_rule(select_id)
         
         for i, option in enumerate(parsed_options):
             content = option['content']
@@ -230,13 +886,20 @@ class WorkingCoolPCParser:
             if option['is_supplement'] and '↪' in content:
                 continue
             
+            # 掃描一次關鍵字，供群組標題及特殊標記判斷共用
+            keyword_bits = KEYWORDS.classify(content)
+            
             # 判斷是否為群組標題
-            if self._is_group_header(content):
+            if self._is_group_header(content, keyword_bits):
                 current_group = content
             else:
                 # 這是商品
-                product = self._parse_product(str(i), content, option['class'], current_group)
+                product = self._parse_product(str(i), content, option['class'], current_group, keyword_bits,
+                                              option['value'])
                 if product:
+                    # 排序分數只計算一次並存在商品上
+                    product['rank_score'] = ranking.score(product) if ranking else 0
+                    
                     # 確定子分類
                     subcategory = option['optgroup'] if option['optgroup'] else '其他'
                     
@@ -248,10 +911,10 @@ class WorkingCoolPCParser:
                     
                     subcategories[subcategory]['products'].append(product)
         
-        # 對某些類別的產品進行優先排序
-        if select_id == '12':  # 顯示卡VGA
+        # 有排序規則的類別（CPU、記憶體、顯示卡、機殼）依分數排序，見 coolpc_ranking
+        if ranking:
             for subcategory in subcategories.values():
-                subcategory['products'] = self._prioritize_vga_products(subcategory['products'])
+                subcategory['products'] = rank_products(subcategory['products'])
         
         return {
             'category_id': select_id,
@@ -261,48 +924,79 @@ class WorkingCoolPCParser:
             'subcategories': list(subcategories.values())
         }
     
-    def _is_group_header(self, content: str) -> bool:
-        """判斷是否為群組標題"""
+    @staticmethod
+    def _iter_options(select_content: str) -> Iterator[Tuple[Optional[str], str, str]]:
+        """單次掃描 SELECT 內容，依序產生 (optgroup, attrs, text) 事件
+        
+        只走訪一次所有標籤邊界：OPTION 的內容延伸到下一個邊界為止（處理沒有關閉標籤的情況），
+        目前所屬的 OPTGROUP 則在掃描過程中隨時更新，不需要對每個 OPTION 重新搜尋。
+        """
+        current_optgroup = None
+        optgroup_end = 0   # 上一個 OPTGROUP 標籤的結束位置（標籤不可重疊）
+        option_end = 0     # 上一個 OPTION 標籤的結束位置
+        pending = None     # 尚未找到內容結尾的 OPTION: (optgroup, attrs, 內容起點)
+        
+        for boundary in _PATTERNS['tag_boundary'].finditer(select_content):
+            pos = boundary.start()
+            
+            # 第一個位於前一個 OPTION 標籤之後的邊界，就是該 OPTION 內容的結尾
+            if pending is not None and pos >= pending[2]:
+                yield pending[0], pending[1], _clean_option_text(select_content[pending[2]:pos])
+                pending = None
+            
+            tag = boundary.group(1).upper()
+            if tag == 'OPTGROUP':
+                if pos >= optgroup_end:
+                    optgroup_match = _PATTERNS['optgroup'].match(select_content, pos)
+                    if optgroup_match:
+                        current_optgroup = optgroup_match.group(1)
+                        optgroup_end = optgroup_match.end()
+            elif tag == 'OPTION':
+                if pos >= option_end:
+                    option_match = _PATTERNS['option'].match(select_content, pos)
+                    if option_match:
+                        option_end = option_match.end()
+                        pending = (current_optgroup, option_match.group(1), option_end)
+        
+        if pending is not None:
+            yield pending[0], pending[1], _clean_option_text(select_content[pending[2]:])
+    
+    def _is_group_header(self, content: str, keyword_bits: Optional[int] = None) -> bool:
+        """判斷是否為群組標題（keyword_bits 為 KEYWORDS.classify 的結果，未提供時自行掃描）"""
         
         # 如果包含價格，通常是商品
-        if '$' in content and re.search(r'\$[0-9,]+', content):
+        if '$' in content and _PATTERNS['price'].search(content):
             return False
         
         # 如果包含型號格式【xxx】，通常是商品
         if '【' in content and '】' in content:
             return False
         
-        # 群組標題的特徵
-        group_indicators = [
-            '❤',  # 心型符號開頭
-            '※',  # 註記符號
-            '↪',  # 箭頭符號（通常是附加說明）
-            '推薦用於',  # 推薦說明
-            '系列',  # 系列名稱
-            '專區',  # 專區標題
-            '配件',  # 配件分類
-            '周邊',  # 周邊分類
-        ]
+        if keyword_bits is None:
+            keyword_bits = KEYWORDS.classify(content)
         
         # 檢查是否包含群組指示符
-        if any(indicator in content for indicator in group_indicators):
+        if keyword_bits & _GROUP_INDICATOR:
             return True
         
         # 檢查是否是純標題格式（沒有具體商品信息）
-        if len(content) < 50 and not any(char in content for char in ['/', 'G', 'GB', 'TB', 'Hz', 'W']):
-            if not any(word in content for word in ['ASUS', 'MSI', 'Intel', 'AMD', 'NVIDIA']):
-                return True
+        if len(content) < 50 and not keyword_bits & _PRODUCT_FEATURE:
+            return True
         
         return False
     
-    def _parse_product(self, index: str, text: str, css_class: str, group_name: str = None) -> Dict[str, Any]:
-        """解析商品數據"""
+    def _parse_product(self, index: str, text: str, css_class: str, group_name: str = None,
+                       keyword_bits: Optional[int] = None, product_id: Optional[str] = None) -> Dict[str, Any]:
+        """解析商品數據（index 為 OPTION 在類別中的序號，product_id 為 OPTION 的 value，即原價屋的商品編號）"""
         
         if not text:
             return None
         
+        if keyword_bits is None:
+            keyword_bits = KEYWORDS.classify(text)
+        
         # 解析價格
-        price_match = re.search(r'\$([0-9,]+)', text)
+        price_match = _PATTERNS['price'].search(text)
         price = None
         if price_match:
             price = int(price_match.group(1).replace(',', ''))
@@ -314,13 +1008,14 @@ class WorkingCoolPCParser:
         specs = self._extract_specs(text)
         
         # 檢查特殊標記
-        markers = self._extract_markers(text, css_class)
+        markers = self._extract_markers(text, css_class, keyword_bits)
         
         # 解析折扣信息
         discount = self._extract_discount(text)
         
         return {
             'index': index,
+            'product_id': product_id or None,
             'group': group_name,
             'brand': brand_model.get('brand'),
             'model': brand_model.get('model'),
@@ -329,24 +1024,16 @@ class WorkingCoolPCParser:
             'original_price': discount.get('original_price') if discount else None,
             'discount_amount': discount.get('discount_amount') if discount else None,
             'markers': markers,
-            'raw_text': text
+            'raw_text': text,
+            'attributes': extract_attributes(text)
         }
     
     def _parse_category_stats(self, summary_text: str) -> Dict[str, int]:
         """解析類別統計數據"""
         stats = {}
         
-        patterns = {
-            'total_items': r'共有商品\s*(\d+)\s*樣',
-            'hot_items': r'熱賣\s*(\d+)',
-            'with_images': r'圖片\s*(\d+)',
-            'with_discussions': r'討論\s*(\d+)',
-            'price_changes': r'價格異動\s*(\d+)',
-            'time_limited': r'限時下殺▼(\d+)'
-        }
-        
-        for key, pattern in patterns.items():
-            match = re.search(pattern, summary_text)
+        for key, pattern in _STATS_PATTERNS:
+            match = pattern.search(summary_text)
             stats[key] = int(match.group(1)) if match else 0
         
         return stats
@@ -354,24 +1041,22 @@ class WorkingCoolPCParser:
     def _extract_brand_model(self, text: str) -> Dict[str, str]:
         """提取品牌和型號"""
         # Remove price and special symbols from the end to clean up text
-        clean_text = re.sub(r'\$[0-9,]+.*$', '', text)
-        clean_text = re.sub(r'[◆★↓→].*', '', clean_text)
+        clean_text = _PATTERNS['price_suffix'].sub('', text)
+        clean_text = _PATTERNS['symbol_suffix'].sub('', clean_text)
         clean_text = clean_text.strip()
         
         # Handle promotional prefixes like "[精選78X3D]", "[強勢精選7500F]"
-        clean_text = re.sub(r'^\[[^\]]+\]\s*', '', clean_text)
+        clean_text = _PATTERNS['promo_prefix'].sub('', clean_text)
         
         # Handle both English and Chinese brand names
         # Pattern 1: Chinese brand followed by English brand (e.g., "威剛 ADATA")
-        chinese_english_match = re.match(r'^([\u4e00-\u9fff]+)\s+([A-Za-z]+)', clean_text.strip())
+        chinese_english_match = _PATTERNS['chinese_english_brand'].match(clean_text.strip())
         if chinese_english_match:
             chinese_brand = chinese_english_match.group(1)
             english_brand = chinese_english_match.group(2)
             brand = f"{chinese_brand} {english_brand}"  # Keep both Chinese and English names
             # Look for model after the brand names
-            # Pattern: 威剛 ADATA LEGEND 900 512GB
-            model_pattern = rf'^[\u4e00-\u9fff]+\s+{english_brand}\s+([A-Za-z0-9\s\-]+?)(?:\s+\d+(?:GB|TB|G)|/)'
-            model_match = re.search(model_pattern, clean_text.strip())
+            model_match = _brand_pattern('chinese_english_model', english_brand).search(clean_text.strip())
             if model_match:
                 model = model_match.group(1).strip()
             else:
@@ -379,7 +1064,7 @@ class WorkingCoolPCParser:
             return {'brand': brand, 'model': model}
         
         # Pattern 2: English brand only (like AMD, Intel, etc.)
-        brand_match = re.match(r'^([A-Za-z]+)', clean_text.strip())
+        brand_match = _PATTERNS['english_brand'].match(clean_text.strip())
         brand = brand_match.group(1) if brand_match else None
         
         model = None
@@ -387,37 +1072,30 @@ class WorkingCoolPCParser:
             # Special handling for CPU brands (AMD, Intel)
             if brand in ['AMD', 'Intel']:
                 # For CPUs, extract the full model including series and specific model
-                # Examples: "AMD R7 7800X3D", "Intel i5-14400F", "AMD R5 3400G"
                 # Updated pattern to capture full CPU model names including X3D suffix
                 # Fixed: Handle various patterns - space before some keywords, no space before others
-                cpu_model_pattern = rf'^{brand}\s+([A-Za-z0-9\-X3D]+(?:\s+[A-Za-z0-9\-X3D]+)*?)(?:\s*(?:代理盒裝|盒)|(?:\s+MPK)|【)'
-                cpu_model_match = re.search(cpu_model_pattern, clean_text)
+                cpu_model_match = _brand_pattern('cpu_model', brand).search(clean_text)
                 if cpu_model_match:
                     model = cpu_model_match.group(1).strip()
                 else:
                     # Fallback: try to extract everything after brand until common CPU description words
                     # Updated to match the main pattern for consistency
-                    fallback_pattern = rf'^{brand}\s+([A-Za-z0-9\-X3D]+(?:\s+[A-Za-z0-9\-X3D]+)*?)(?:\s*(?:代理盒裝|盒|含風扇)|(?:\s+MPK)|【)'
-                    fallback_match = re.search(fallback_pattern, clean_text)
+                    fallback_match = _brand_pattern('cpu_fallback', brand).search(clean_text)
                     if fallback_match:
                         model = fallback_match.group(1).strip()
             else:
                 # For non-CPU products, use the original logic
-                # Pattern: Brand ModelName Capacity/Specs
-                model_pattern = rf'^{brand}\s+([A-Za-z0-9\-]+)\s+(?:\d+(?:GB|TB|G)|/)'
-                model_match = re.search(model_pattern, clean_text.strip())
+                model_match = _brand_pattern('model', brand).search(clean_text.strip())
                 if model_match:
                     model = model_match.group(1)
         
         # If no model found yet, try the bracket method but exclude warranty info and CPU specs
         if not model:
             # Find all bracket contents
-            bracket_matches = re.findall(r'【([^】]+)】', clean_text)
+            bracket_matches = _PATTERNS['bracket'].findall(clean_text)
             for bracket_content in bracket_matches:
                 # Skip if it's warranty info, CPU specs, or memory specs
-                if any(skip_pattern in bracket_content for skip_pattern in [
-                    '年保', '保固', '核/', '緒', 'GB', 'TB', 'MHz', 'W/', 'nm'
-                ]):
+                if KEYWORDS.classify(bracket_content) & _BRACKET_SKIP:
                     continue
                 model = bracket_content
                 break
@@ -426,16 +1104,16 @@ class WorkingCoolPCParser:
     
     def _extract_specs(self, text: str) -> List[str]:
         """提取規格信息"""
-        spec_match = re.search(r'】([^$]+)\$', text)
+        spec_match = _PATTERNS['specs'].search(text)
         if spec_match:
             spec_text = spec_match.group(1).strip()
             specs = [spec.strip() for spec in spec_text.split('/') if spec.strip()]
             return specs
         
         # 如果沒有找到型號】格式，嘗試其他方式提取規格
-        clean_text = re.sub(r'^[A-Za-z]+\s*', '', text)
-        clean_text = re.sub(r'\$[0-9,]+.*$', '', clean_text)
-        clean_text = re.sub(r'[◆★↓→].*', '', clean_text)
+        clean_text = _PATTERNS['english_prefix'].sub('', text)
+        clean_text = _PATTERNS['price_suffix'].sub('', clean_text)
+        clean_text = _PATTERNS['symbol_suffix'].sub('', clean_text)
         
         if '/' in clean_text:
             specs = [spec.strip() for spec in clean_text.split('/') if spec.strip()]
@@ -443,32 +1121,23 @@ class WorkingCoolPCParser:
         
         return []
     
-    def _extract_markers(self, text: str, css_class: str) -> List[str]:
-        """提取特殊標記"""
-        markers = []
-        
-        if '◆' in text:
-            markers.append('discussion')
-        if '★' in text:
-            markers.append('image')
-        if 'r' in css_class or '熱賣' in text:
-            markers.append('hot')
-        if 'g' in css_class or '價格異動' in text or '↘' in text:
-            markers.append('price_change')
-        if 'b' in css_class:
-            markers.append('hot_and_price_change')
-        if '限時' in text or '下殺' in text:
-            markers.append('time_limited')
-        if '【訂】' in text:
-            markers.append('pre_order')
-        if '酷幣' in text:
-            markers.append('cool_coin_discount')
-        
-        return markers
+    def _extract_markers(self, text: str, css_class: str, keyword_bits: Optional[int] = None) -> List[str]:
+        """提取特殊標記（文字關鍵字見 coolpc_keywords 的 marker: 類別）"""
+        if keyword_bits is None:
+            keyword_bits = KEYWORDS.classify(text)
+        
+        # 標記組合有限，依 (關鍵字旗標, CSS class) 快取結果
+        key = (keyword_bits & _MARKER_MASK, css_class)
+        markers = _marker_cache.get(key)
+        if markers is None:
+            markers = _marker_cache[key] = tuple(
+                marker for marker, marker_bit, marker_class in _MARKER_RULES
+                if keyword_bits & marker_bit or (marker_class and marker_class in css_class))
+        return list(markers)
     
     def _extract_discount(self, text: str) -> Dict[str, Any]:
         """提取折扣信息"""
-        discount_match = re.search(r'\$([0-9,]+)↘\$([0-9,]+)', text)
+        discount_match = _PATTERNS['discount'].search(text)
         if discount_match:
             original = int(discount_match.group(1).replace(',', ''))
             current = int(discount_match.group(2).replace(',', ''))
@@ -478,7 +1147,7 @@ class WorkingCoolPCParser:
                 'discount_amount': original - current
             }
         
-        cool_coin_match = re.search(r'酷幣(\d+)', text)
+        cool_coin_match = _PATTERNS['cool_coin'].search(text)
         if cool_coin_match:
             return {
                 'cool_coin_discount': int(cool_coin_match.group(1))
@@ -486,138 +1155,109 @@ class WorkingCoolPCParser:
         
         return None
     
-    def _prioritize_vga_products(self, products):
-        """對顯卡產品進行優先排序，將主流顯卡排在前面"""
-        
-        # 定義優先級權重
-        def get_vga_priority(product):
-            text = product.get('raw_text', '').upper()
-            priority = 0
-            
-            # RTX 50系列 - 最高優先級
-            if 'RTX 50' in text or 'RTX5' in text:
-                priority += 1000
-                if 'RTX 5090' in text or 'RTX5090' in text:
-                    priority += 900
-                elif 'RTX 5080' in text or 'RTX5080' in text:
-                    priority += 800
-                elif 'RTX 5070' in text or 'RTX5070' in text:
-                    priority += 700
-                elif 'RTX 5060' in text or 'RTX5060' in text:
-                    priority += 600
-            
-            # RTX 40系列 - 次高優先級
-            elif 'RTX 40' in text or 'RTX4' in text:
-                priority += 800
-                if 'RTX 4090' in text or 'RTX4090' in text:
-                    priority += 900
-                elif 'RTX 4080' in text or 'RTX4080' in text:
-                    priority += 800
-                elif 'RTX 4070' in text or 'RTX4070' in text:
-                    priority += 700
-                elif 'RTX 4060' in text or 'RTX4060' in text:
-                    priority += 600
-            
-            # AMD RX 7000系列
-            elif 'RX 7' in text:
-                priority += 700
-                if 'RX 7900' in text:
-                    priority += 900
-                elif 'RX 7800' in text:
-                    priority += 800
-                elif 'RX 7700' in text:
-                    priority += 700
-                elif 'RX 7600' in text:
-                    priority += 600
-            
-            # AMD RX 9000系列 - 最新
-            elif 'RX 9' in text:
-                priority += 900
-                if 'RX 9070' in text:
-                    priority += 800
-                elif 'RX 9060' in text:
-                    priority += 700
-            
-            # RTX 30系列 - 中等優先級
-            elif 'RTX 30' in text or 'RTX3' in text:
-                priority += 500
-                if 'RTX 3090' in text or 'RTX3090' in text:
-                    priority += 400
-                elif 'RTX 3080' in text or 'RTX3080' in text:
-                    priority += 300
-                elif 'RTX 3070' in text or 'RTX3070' in text:
-                    priority += 200
-                elif 'RTX 3060' in text or 'RTX3060' in text:
-                    priority += 100
-            
-            # Intel ARC系列
-            elif 'ARC' in text:
-                priority += 400
-                if 'B580' in text:
-                    priority += 100
-                elif 'B570' in text:
-                    priority += 80
-                elif 'A770' in text:
-                    priority += 60
-            
-            # 降低配件的優先級
-            if any(keyword in text for keyword in ['支撐架', '支架', 'HOLDER', 'SUPPORT']):
-                priority -= 2000
-            
-            # 降低低階顯卡的優先級
-            if any(keyword in text for keyword in ['GT710', 'GT730', 'GT1030']):
-                priority -= 1000
-            
-            # 熱賣商品加分
-            if product.get('markers') and 'hot' in product.get('markers'):
-                priority += 50
-            
-            # 有價格異動的商品加分
-            if product.get('markers') and 'price_change' in product.get('markers'):
-                priority += 30
-            
-            return priority
-        
-        # 排序產品：按優先級降序，然後按原始順序
-        sorted_products = sorted(products, key=lambda p: (-get_vga_priority(p), products.index(p)))
-        return sorted_products
+    def compact(self):
+        """將已解析的商品轉為精簡格式（CompactProduct），降低長時間執行時的記憶體用量"""
+        self.categories = compact_categories(self.categories)
+        return self.categories
     
     def export_to_json(self, output_file: str):
-        """匯出為 JSON 格式"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(self.categories, f, ensure_ascii=False, indent=2)
+        """匯出為 JSON 格式（寫入暫存檔後再取代，讀取端不會讀到寫到一半的內容）"""
+        tmp_path = f"{output_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.categories, f, ensure_ascii=False, indent=2, default=product_to_dict)
+        os.replace(tmp_path, output_file)
         print(f"數據已匯出到 {output_file}")
     
-    def export_to_csv(self, output_file: str):
-        """匯出為 CSV 格式"""
-        rows = []
-        
-        for category in self.categories:
-            for subcategory in category.get('subcategories', []):
-                for product in subcategory['products']:
-                    row = {
-                        'category_id': category['category_id'],
-                        'category': category['category_name'],
-                        'subcategory': subcategory['name'],
-                        'group': product.get('group', ''),
-                        'brand': product.get('brand', ''),
-                        'model': product.get('model', ''),
-                        'specs': ' / '.join(product.get('specs', [])),
-                        'price': product.get('price'),
-                        'original_price': product.get('original_price'),
-                        'discount_amount': product.get('discount_amount'),
-                        'markers': ', '.join(product.get('markers', [])),
-                        'raw_text': product.get('raw_text', '')
-                    }
-                    rows.append(row)
-        
-        with open(output_file, 'w', encoding='utf-8', newline='') as f:
-            if rows:
-                writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-                writer.writeheader()
-                writer.writerows(rows)
+    def export_index(self, output_file: str):
+        """匯出查詢索引（商品編號對應 export_to_json 輸出中的展開順序）"""
+        tmp_path = f"{output_file}.tmp"
+        QueryIndex.build(self.categories).save(tmp_path)
+        os.replace(tmp_path, output_file)
+        print(f"查詢索引已匯出到 {output_file}")
+    
+    def export_compat(self, output_file: str):
+        """匯出 CPU、主機板、記憶體相容性索引（商品編號同 export_index）"""
+        tmp_path = f"{output_file}.tmp"
+        CompatibilityIndex.build(self.categories).save(tmp_path)
+        os.replace(tmp_path, output_file)
+        print(f"相容性索引已匯出到 {output_file}")
+    
+    def find_duplicates(self, threshold: float = DEDUP_THRESHOLD) -> DuplicateClusters:
+        """以 MinHash/LSH 找出跨類別的重複商品（見 coolpc_dedup）"""
+        self.duplicates = DuplicateClusters.build(self.categories, threshold)
+        print(f"重複商品分群: {len(self.duplicates.clusters)} 個群組 (重複 {self.duplicates.duplicates} 項)")
+        return self.duplicates
+    
+    def export_dedup(self, output_file: str):
+        """匯出重複商品分群（商品位置同 export_index）"""
+        tmp_path = f"{output_file}.tmp"
+        self.duplicates.save(tmp_path)
+        os.replace(tmp_path, output_file)
+        print(f"重複商品分群已匯出到 {output_file}")
+    
+    def export_to_columnar(self, output_file: str):
+        """匯出為欄位式二進位快照（見 coolpc_columnar）"""
+        tmp_path = f"{output_file}.tmp"
+        write_columnar(self.categories, tmp_path)
+        os.replace(tmp_path, output_file)
+        print(f"數據已匯出到 {output_file}")
+    
+    def export_to_sqlite(self, output_file: str, fts: bool = False):
+        """匯出為正規化的 SQLite 資料庫（見 coolpc_sqlite）；資料庫已存在時以 upsert 更新"""
+        with SQLiteExport(output_file) as db:
+            counts = db.export(self.categories, fts=fts, source=self.html_file,
+                               canonical=self.duplicates.canonical if self.duplicates else None)
+        print(f"數據已匯出到 {output_file} (新增 {counts['new']} / 更新 {counts['updated']} / 本次未出現 {counts['absent']})")
+    
+    def export_to_csv(self, output_file: str, categories: Optional[Iterable[Dict[str, Any]]] = None):
+        """匯出為 CSV 格式（副檔名為 .gz 時壓縮）"""
+        self.export_rows(categories, csv_file=output_file)
         print(f"數據已匯出到 {output_file}")
     
+    def export_to_jsonl(self, output_file: str, categories: Optional[Iterable[Dict[str, Any]]] = None):
+        """匯出為 JSON Lines 格式：每行一項商品，並附上類別與子分類（副檔名為 .gz 時壓縮）"""
+        self.export_rows(categories, jsonl_file=output_file)
+        print(f"數據已匯出到 {output_file}")
+    
+    def export_rows(self, categories: Optional[Iterable[Dict[str, Any]]] = None,
+                    jsonl_file: Optional[str] = None, csv_file: Optional[str] = None) -> int:
+        """逐項商品寫出 JSON Lines / CSV，不先建立完整的資料列清單
+        
+        categories 可以是 iter_categories() 的產生器，邊解析邊寫出；每個類別寫完即 flush，
+        下游程式可在匯出完成前開始讀取。回傳寫出的商品數量。
+        """
+        if categories is None:
+            categories = self.categories
+        
+        jsonl_out = _open_output(jsonl_file) if jsonl_file else None
+        csv_out = _open_output(csv_file) if csv_file else None
+        csv_writer = None
+        count = 0
+        
+        try:
+            for category in categories:
+                for subcategory in category.get('subcategories', []):
+                    for product in subcategory['products']:
+                        if jsonl_out is not None:
+                            jsonl_out.write(json.dumps(_jsonl_row(category, subcategory, product), ensure_ascii=False))
+                            jsonl_out.write('\n')
+                        if csv_out is not None:
+                            # 與原本相同：沒有任何商品時不寫入標題列
+                            if csv_writer is None:
+                                csv_writer = csv.DictWriter(csv_out, fieldnames=CSV_FIELDS)
+                                csv_writer.writeheader()
+                            csv_writer.writerow(_csv_row(category, subcategory, product))
+                        count += 1
+                for out in (jsonl_out, csv_out):
+                    if out is not None:
+                        out.flush()
+        finally:
+            for out in (jsonl_out, csv_out):
+                if out is not None:
+                    out.close()
+        
+        return count
+    
     def print_summary(self):
         """列印解析摘要"""
         total_categories = len(self.categories)
@@ -631,6 +1271,8 @@ class WorkingCoolPCParser:
         print(f"\n=== 解析摘要 ===")
         print(f"類別總數: {total_categories}")
         print(f"商品總數: {total_products}")
+        if self.cache_stats is not None:
+            print(f"增量解析: 沿用快取 {self.cache_stats['reused']} 類別 / 重新解析 {self.cache_stats['parsed']} 類別")
         print(f"\n各類別商品數量:")
         
         for category in self.categories:
@@ -647,45 +1289,235 @@ class WorkingCoolPCParser:
                 print(f"      - 熱賣: {stats.get('hot_items', 0)}")
                 print(f"      - 價格異動: {stats.get('price_changes', 0)}")
                 print(f"      - 限時下殺: {stats.get('time_limited', 0)}")
+        
+        cache_stats = regex_cache_stats()
+        print(f"\n品牌正則快取: 命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']} "
+              f"(已快取 {cache_stats['currsize']}/{cache_stats['maxsize']})")
+
+def _watch_loader(args) -> Callable[[], Optional[List[Dict[str, Any]]]]:
+    """--watch 每次更新執行的工作：下載（若有指定）、解析並寫出指定的輸出
+
+    輸入文件的修改時間與大小都沒有改變時（含伺服器回應 304）不重新解析，回傳 None。
+    """
+    last_signature = None
+
+    def load() -> Optional[List[Dict[str, Any]]]:
+        nonlocal last_signature
+        if args.download and WorkingCoolPCParser.fetch_html(args.input_file, raw=args.raw) == FETCH_FAILED:
+            raise RuntimeError('下載失敗')
+        stat = os.stat(args.input_file)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == last_signature:
+            return None
+
+        coolpc_parser = WorkingCoolPCParser(args.input_file, cache_dir=args.cache_dir)
+        categories = coolpc_parser.parse_raw(jobs=args.jobs) if args.raw else coolpc_parser.parse_html(jobs=args.jobs)
+        if args.dedup:
+            coolpc_parser.find_duplicates(args.dedup_threshold)
+        if args.json:
+            coolpc_parser.export_to_json(args.json)
+            if args.index:
+                coolpc_parser.export_index(index_path_for(args.json))
+            if args.compat:
+                coolpc_parser.export_compat(compat_path_for(args.json))
+            if args.dedup:
+                coolpc_parser.export_dedup(dedup_path_for(args.json))
+        if args.csv:
+            coolpc_parser.export_to_csv(args.csv)
+        if args.jsonl:
+            coolpc_parser.export_to_jsonl(args.jsonl)
+        if args.columnar:
+            coolpc_parser.export_to_columnar(args.columnar)
+        if args.sqlite:
+            coolpc_parser.export_to_sqlite(args.sqlite, fts=args.sqlite_fts)
+        if args.history:
+            with PriceHistory(args.history) as history:
+                changes = history.record_snapshot(categories, source=args.input_file,
+                                                  canonical=coolpc_parser.duplicates.canonical if args.dedup else None)
+            print(f"價格歷史已更新: 新上架 {changes['new']} / 下架 {changes['removed']} / 價格異動 {changes['price_changed']}")
+        last_signature = signature
+        return categories
+
+    return load
+
 
 def main():
     parser = argparse.ArgumentParser(description='最終工作版原價屋商品報價解析器')
     parser.add_argument('input_file', nargs='?', default='evaluate.html', help='輸入的 HTML 文件路徑 (預設: evaluate.html)')
     parser.add_argument('--download', action='store_true', help='從 CoolPC 網站下載最新資料')
     parser.add_argument('--json', help='匯出 JSON 文件路徑')
-    parser.add_argument('--csv', help='匯出 CSV 文件路徑')
+    parser.add_argument('--index', action='store_true', help='搭配 --json：同時產生查詢索引 (product.json -> product.index.json)')
+    parser.add_argument('--compat', action='store_true', help='搭配 --json：同時產生 CPU/主機板/記憶體相容性索引 (product.json -> product.compat.json)')
+    parser.add_argument('--dedup', action='store_true',
+                        help='找出跨類別的重複商品 (福利品、套裝產線等)：--json 時另存 product.dedup.json，--sqlite 記錄代表識別碼，--history 只記錄代表商品')
+    parser.add_argument('--dedup-threshold', type=float, default=DEDUP_THRESHOLD,
+                        help=f'搭配 --dedup：視為重複的最低相似度 (預設: {DEDUP_THRESHOLD})')
+    parser.add_argument('--csv', help='匯出 CSV 文件路徑 (副檔名 .gz 時壓縮)')
+    parser.add_argument('--jsonl', help='匯出 JSON Lines 文件路徑，每行一項商品 (副檔名 .gz 時壓縮)')
+    parser.add_argument('--columnar', help='匯出欄位式二進位快照路徑 (可用 mmap 快速載入)')
+    parser.add_argument('--sqlite', help='匯出正規化的 SQLite 資料庫路徑 (已存在時以 upsert 更新)')
+    parser.add_argument('--sqlite-fts', action='store_true', help='搭配 --sqlite：建立 raw_text 的 FTS5 全文檢索表')
     parser.add_argument('--summary', action='store_true', help='顯示解析摘要')
+    parser.add_argument('--history', help='價格歷史資料庫路徑 (SQLite)，記錄本次快照與上次的差異')
+    parser.add_argument('--skip-unchanged', action='store_true', help='搭配 --download：網頁未變更時不重新解析，直接結束')
+    parser.add_argument('--stream', action='store_true', help='串流解析 (搭配 --download 時直接解析下載內容，不寫入 HTML 文件)')
+    parser.add_argument('--cache-dir', help='類別解析快取目錄：內容未變更的類別直接沿用上次結果')
+    parser.add_argument('--jobs', type=int, default=1, help='平行解析的行程數 (預設: 1，0 表示使用所有 CPU 核心)')
+    parser.add_argument('--profile', help='效能分析：將各階段、各類別的耗時寫入 metrics JSON 文件')
+    parser.add_argument('--cprofile', help='搭配 --profile：以 cProfile 記錄解析過程並寫入 pstats 文件 (--jobs 時只含主行程)')
+    parser.add_argument('--raw', action='store_true',
+                        help='輸入文件為原價屋原始的 Big5 HTML：搭配 --download 時直接保存原始位元組，解析時以 mmap 讀取')
+    parser.add_argument('--watch', type=float, metavar='SECONDS', help='監看模式：常駐執行，每隔指定秒數重新解析並更新快照與輸出文件')
+    parser.add_argument('--listen', default=DEFAULT_LISTEN,
+                        help=f'搭配 --watch：查詢服務位址，"host:port" 或 "unix:/path/to.sock" (預設: {DEFAULT_LISTEN})')
     
     args = parser.parse_args()
+    if args.cprofile and not args.profile:
+        parser.error('--cprofile 需搭配 --profile 使用')
+    if args.sqlite_fts and not args.sqlite:
+        parser.error('--sqlite-fts 需搭配 --sqlite 使用')
+    if not 0 < args.dedup_threshold <= 1:
+        parser.error('--dedup-threshold 必須介於 0 與 1 之間')
+    if args.jobs < 0:
+        parser.error('--jobs 不能小於 0')
     
-    # 如果指定了 --download，先下載 HTML
-    if args.download:
-        if not WorkingCoolPCParser.download_html(args.input_file):
-            print("下載失敗，程式結束")
+    if args.watch is not None:
+        if args.watch <= 0:
+            parser.error('--watch 的間隔必須大於 0')
+        if args.stream or args.skip_unchanged or args.profile:
+            parser.error('--watch 不能與 --stream、--skip-unchanged 或 --profile 同時使用')
+        if not args.download and not os.path.exists(args.input_file):
+            print(f"錯誤: 找不到文件 '{args.input_file}'")
+            print("提示: 使用 --download 參數可以從網站下載最新資料")
             return
-    
-    # 檢查文件是否存在
-    import os
-    if not os.path.exists(args.input_file):
-        print(f"錯誤: 找不到文件 '{args.input_file}'")
-        print("提示: 使用 --download 參數可以從網站下載最新資料")
+        store = SnapshotStore(args.watch,
+                              metrics=lambda: {'parser_version': PARSER_VERSION, 'regex_cache': regex_cache_stats()})
+        try:
+            server = make_server(args.listen, store)
+        except (ValueError, OSError) as e:
+            # 無效、已被其他文件佔用或無法綁定的 --listen 位址
+            print(f"錯誤: {e}")
+            return
+        run_watch(_watch_loader(args), server, args.listen)
         return
     
-    coolpc_parser = WorkingCoolPCParser(args.input_file)
-    print("正在解析 HTML 文件...")
-    coolpc_parser.parse_html()
+    profiler = StageProfiler(args.cprofile) if args.profile else NULL_PROFILER
+    coolpc_parser = WorkingCoolPCParser(args.input_file, cache_dir=args.cache_dir, profiler=profiler)
+    exported_rows = None
+    
+    # 串流模式且只需要逐項匯出 (--jsonl / --csv) 時，邊解析邊寫出，不保留完整的解析結果
+    direct_export = (args.stream and bool(args.jsonl or args.csv)
+                     and not (args.json or args.columnar or args.sqlite or args.summary or args.history or args.dedup))
+    
+    # 串流模式：邊下載邊解析，不經過暫存的 HTML 文件
+    if args.download and args.stream:
+        response = WorkingCoolPCParser.open_stream()
+        if response is None:
+            print("下載失敗，程式結束")
+            return
+        print("正在串流解析下載資料...")
+        try:
+            with response, profiler.stage('stream_parse'), profiler.hot_path():
+                if direct_export:
+                    exported_rows = coolpc_parser.export_rows(coolpc_parser.iter_categories(response),
+                                                              jsonl_file=args.jsonl, csv_file=args.csv)
+                else:
+                    coolpc_parser.parse_stream(response)
+        except requests.exceptions.RequestException as e:
+            WorkingCoolPCParser._report_request_error(e)
+            print("下載失敗，程式結束")
+            return
+    
+    else:
+        # 如果指定了 --download，先下載 HTML
+        if args.download:
+            with profiler.stage('download') as stage:
+                fetch_status = WorkingCoolPCParser.fetch_html(args.input_file, raw=args.raw, profiler=profiler)
+                if fetch_status == FETCH_UPDATED:
+                    stage.add(bytes=os.path.getsize(args.input_file))
+            if fetch_status == FETCH_FAILED:
+                print("下載失敗，程式結束")
+                return
+            if fetch_status == FETCH_NOT_MODIFIED and args.skip_unchanged:
+                print("網頁未變更，略過解析")
+                return
+        
+        # 檢查文件是否存在
+        if not os.path.exists(args.input_file):
+            print(f"錯誤: 找不到文件 '{args.input_file}'")
+            print("提示: 使用 --download 參數可以從網站下載最新資料")
+            return
+        
+        print("正在解析 HTML 文件...")
+        with profiler.stage('parse'), profiler.hot_path():
+            # 原始 Big5 文件的串流解析以 Big5 逐段解碼
+            encoding = 'big5' if args.raw else None
+            if direct_export:
+                exported_rows = coolpc_parser.export_rows(coolpc_parser.iter_categories(encoding=encoding),
+                                                          jsonl_file=args.jsonl, csv_file=args.csv)
+            elif args.stream:
+                coolpc_parser.parse_stream(encoding=encoding)
+            elif args.raw:
+                coolpc_parser.parse_raw(jobs=args.jobs)
+            else:
+                coolpc_parser.parse_html(jobs=args.jobs)
     
     if args.summary:
         coolpc_parser.print_summary()
     
+    if args.dedup:
+        with profiler.stage('dedup'):
+            coolpc_parser.find_duplicates(args.dedup_threshold)
+    
     if args.json:
-        coolpc_parser.export_to_json(args.json)
+        with profiler.stage('export_json'):
+            coolpc_parser.export_to_json(args.json)
+        if args.index:
+            with profiler.stage('export_index'):
+                coolpc_parser.export_index(index_path_for(args.json))
+        if args.compat:
+            with profiler.stage('export_compat'):
+                coolpc_parser.export_compat(compat_path_for(args.json))
+        if args.dedup:
+            coolpc_parser.export_dedup(dedup_path_for(args.json))
+    
+    if direct_export:
+        for output_file in (args.jsonl, args.csv):
+            if output_file:
+                print(f"數據已匯出到 {output_file}")
+    else:
+        if args.csv:
+            with profiler.stage('export_csv'):
+                coolpc_parser.export_to_csv(args.csv)
+        
+        if args.jsonl:
+            with profiler.stage('export_jsonl'):
+                coolpc_parser.export_to_jsonl(args.jsonl)
+    
+    if args.columnar:
+        with profiler.stage('export_columnar'):
+            coolpc_parser.export_to_columnar(args.columnar)
+    
+    if args.sqlite:
+        with profiler.stage('export_sqlite'):
+            coolpc_parser.export_to_sqlite(args.sqlite, fts=args.sqlite_fts)
+    
+    if args.history:
+        with profiler.stage('history'):
+            with PriceHistory(args.history) as history:
+                changes = history.record_snapshot(coolpc_parser.categories, source=args.input_file,
+                                                  canonical=coolpc_parser.duplicates.canonical if args.dedup else None)
+        print(f"價格歷史已更新: 新上架 {changes['new']} / 下架 {changes['removed']} / 價格異動 {changes['price_changed']}")
     
-    if args.csv:
-        coolpc_parser.export_to_csv(args.csv)
+    if args.profile:
+        products = exported_rows if direct_export else sum(
+            _count_products(category) for category in coolpc_parser.categories)
+        profiler.save(args.profile, parser_version=PARSER_VERSION, products=products,
+                      category_cache=coolpc_parser.cache_stats, regex_cache=regex_cache_stats())
+        print(f"效能分析已寫入 {args.profile}" + (f"，cProfile 結果已寫入 {args.cprofile}" if args.cprofile else ""))
     
-    if not args.json and not args.csv and not args.summary:
-        print("請指定輸出格式 (--json 或 --csv) 或使用 --summary 查看摘要")
+    if not (args.json or args.csv or args.jsonl or args.columnar or args.sqlite or args.summary or args.history or args.profile):
+        print("請指定輸出格式 (--json、--csv 或 --jsonl) 或使用 --summary 查看摘要")
 
 if __name__ == "__main__":
     main()
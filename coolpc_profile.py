@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析流程效能分析
+記錄各階段（下載、讀取、解碼、SELECT 切割、類別解析、匯出）及各類別的實際時間與 CPU 時間、
+商品數量、處理的資料量，寫成 metrics JSON；可另外以 cProfile 記錄解析熱點。
+decode 階段分別計入所在的 download / parse 階段；無法單獨計時的部分（逐段解碼、工作行程）記在 notes。
+未啟用時使用 NULL_PROFILER，所有方法皆為空操作，不影響解析效能。
+"""
+
+import json
+import time
+import cProfile
+import contextlib
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+METRICS_VERSION = 2
+
+
+class _Stage:
+    """單一階段的計時區塊，可在區塊內以 add() 累加計數"""
+
+    __slots__ = ('_record', '_wall', '_cpu')
+
+    def __init__(self, record: Dict[str, Any]):
+        self._record = record
+
+    def __enter__(self) -> '_Stage':
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = self._record
+        record['wall_seconds'] += time.perf_counter() - self._wall
+        record['cpu_seconds'] += time.process_time() - self._cpu
+        record['calls'] += 1
+
+    def add(self, **counters: int):
+        for name, value in counters.items():
+            self._record[name] = self._record.get(name, 0) + value
+
+
+class StageProfiler:
+    """記錄各階段與各類別的耗時"""
+
+    enabled = True
+
+    def __init__(self, cprofile_file: Optional[str] = None):
+        self.stages = {}
+        self.categories = []
+        # --jobs 時工作行程回報的計數（主行程看不到工作行程的快取統計）
+        self.workers = {}
+        self.notes = []
+        self.cprofile_file = cprofile_file
+        self._profile = cProfile.Profile() if cprofile_file else None
+        self._started_at = datetime.now(timezone.utc)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def stage(self, name: str) -> _Stage:
+        """計時區塊；同名階段重複進入時累加時間"""
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0}
+        return _Stage(record)
+
+    def record_category(self, category_id: str, category_name: str, wall_seconds: float,
+                        cpu_seconds: float, characters: int, products: int):
+        self.categories.append({
+            'category_id': category_id,
+            'category_name': category_name,
+            'wall_seconds': wall_seconds,
+            'cpu_seconds': cpu_seconds,
+            'characters': characters,
+            'products': products
+        })
+
+    def add_worker_counters(self, **counters: int):
+        for name, value in counters.items():
+            self.workers[name] = self.workers.get(name, 0) + value
+
+    def note(self, message: str):
+        """記錄量測範圍的限制，原樣寫入 metrics 的 notes"""
+        if message not in self.notes:
+            self.notes.append(message)
+
+    @contextlib.contextmanager
+    def hot_path(self):
+        """以 cProfile 記錄區塊內的函式呼叫（建立時有指定 cprofile_file 才會啟用）"""
+        if self._profile is None:
+            yield
+            return
+        self._profile.enable()
+        try:
+            yield
+        finally:
+            self._profile.disable()
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        """彙整結果；extra 會原樣加入（如正規表示式快取統計）"""
+        return {
+            'version': METRICS_VERSION,
+            'started_at': self._started_at.isoformat(timespec='seconds'),
+            'wall_seconds': time.perf_counter() - self._wall,
+            'cpu_seconds': time.process_time() - self._cpu,
+            'stages': self.stages,
+            # 最慢的類別排在前面，方便找出異常的類別
+            'categories': sorted(self.categories, key=lambda c: -c['wall_seconds']),
+            'workers': self.workers,
+            'notes': self.notes,
+            **extra
+        }
+
+    def save(self, metrics_file: str, **extra: Any):
+        """寫出 metrics JSON，並在有啟用 cProfile 時寫出 pstats 文件"""
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(self.report(**extra), f, ensure_ascii=False, indent=2)
+        if self._profile is not None:
+            self._profile.dump_stats(self.cprofile_file)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullStage':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def add(self, **counters: int):
+        pass
+
+
+class _NullProfiler:
+    """未啟用效能分析時使用，所有方法皆為空操作"""
+
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name: str) -> _NullStage:
+        return self._stage
+
+    def record_category(self, *args, **kwargs):
+        pass
+
+    def add_worker_counters(self, **counters: int):
+        pass
+
+    def note(self, message: str):
+        pass
+
+    def hot_path(self):
+        return self._stage
+
+
+NULL_PROFILER = _NullProfiler()
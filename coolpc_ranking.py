@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+商品排序規則
+以表格描述各類別的型號等級、配件扣分與標記加分；每個類別的規則在載入時編譯成單一多字串比對的
+正規表示式，每項商品只掃描一次文字即算出分數並存入 rank_score，排序時直接以分數做穩定排序。
+
+有規則的類別（處理器 4、記憶體 6、顯示卡 12、機殼 14）匯出時各子分類的商品依 rank_score 由高到低排列，
+同分時維持網頁上的順序；其他類別維持網頁順序，rank_score 為 0。
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+# 各類別的排序規則（鍵為類別編號），關鍵字皆以大寫比對商品原始文字：
+#   tiers     : [(系列關鍵字, 系列分數, [(型號關鍵字, 型號加分), ...]), ...]
+#               依序取第一個符合的系列，再取該系列中第一個符合的型號
+#   penalties : [(關鍵字, 分數), ...]，任一關鍵字出現即加上該分數（每組只計一次）
+#   markers   : {標記: 分數}，商品帶有該標記即加分
+# Ryzen / Core 的等級（依序取第一個符合的型號）
+_CPU_CLASSES = [
+    (('R9 ', 'I9-', 'ULTRA 9'), 300),
+    (('R7 ', 'I7-', 'ULTRA 7'), 200),
+    (('R5 ', 'I5-', 'ULTRA 5'), 100),
+]
+
+# 記憶體總容量（"32GB(16G*2)" 先比對到較大的總容量）
+_MEMORY_CAPACITIES = [
+    (('128G', '96G', '64G'), 300),
+    (('48G', '32G'), 200),
+    (('24G', '16G'), 100),
+]
+
+# 機殼支援的最大主機板尺寸（"M-ATX" 中也含 "ATX"，較小的尺寸必須先比對）
+_CASE_SIZES = [
+    (('E-ATX', 'EATX'), 300),
+    (('M-ATX', 'MATX', 'MICRO-ATX'), 100),
+    (('ITX',), 50),
+    (('ATX',), 200),
+]
+
+RANKING_RULES = {
+    # 處理器 CPU：X3D 遊戲處理器與新平台排在前面
+    '4': {
+        'tiers': [
+            (('X3D',), 1000, _CPU_CLASSES),
+            (('ULTRA',), 900, _CPU_CLASSES),
+            (('R9 ', 'R7 ', 'R5 ', 'R3 '), 800, _CPU_CLASSES),
+            (('I9-', 'I7-', 'I5-', 'I3-'), 800, _CPU_CLASSES),
+        ],
+        'penalties': [
+            (('AM4', 'LGA1200', '/1200/'), -300),  # 舊平台
+        ],
+        'markers': {'hot': 50, 'price_change': 30},
+    },
+    # 記憶體 RAM：新世代、大容量排在前面
+    '6': {
+        'tiers': [
+            (('DDR5',), 1000, _MEMORY_CAPACITIES),
+            (('DDR4',), 600, _MEMORY_CAPACITIES),
+        ],
+        'penalties': [
+            (('DDR3',), -1000),  # 舊世代
+        ],
+        'markers': {'hot': 50, 'price_change': 30},
+    },
+    # 機殼：玻璃側板、大尺寸排在前面，配件排在最後
+    '14': {
+        'tiers': [
+            (('全景', '雙玻璃', '雙面玻璃', '雙側玻璃'), 800, _CASE_SIZES),
+            (('玻璃',), 600, _CASE_SIZES),
+            (('網孔', '金屬'), 400, _CASE_SIZES),
+        ],
+        'penalties': [
+            (('支撐架', '支架', '延長線', '防塵網', '濾網'), -2000),  # 配件
+        ],
+        'markers': {'hot': 50, 'price_change': 30},
+    },
+    # 顯示卡VGA：主流顯卡排在前面
+    '12': {
+        'tiers': [
+            (('RTX 50', 'RTX5'), 1000, [
+                (('RTX 5090', 'RTX5090'), 900),
+                (('RTX 5080', 'RTX5080'), 800),
+                (('RTX 5070', 'RTX5070'), 700),
+                (('RTX 5060', 'RTX5060'), 600),
+            ]),
+            (('RTX 40', 'RTX4'), 800, [
+                (('RTX 4090', 'RTX4090'), 900),
+                (('RTX 4080', 'RTX4080'), 800),
+                (('RTX 4070', 'RTX4070'), 700),
+                (('RTX 4060', 'RTX4060'), 600),
+            ]),
+            (('RX 7',), 700, [
+                (('RX 7900',), 900),
+                (('RX 7800',), 800),
+                (('RX 7700',), 700),
+                (('RX 7600',), 600),
+            ]),
+            (('RX 9',), 900, [
+                (('RX 9070',), 800),
+                (('RX 9060',), 700),
+            ]),
+            (('RTX 30', 'RTX3'), 500, [
+                (('RTX 3090', 'RTX3090'), 400),
+                (('RTX 3080', 'RTX3080'), 300),
+                (('RTX 3070', 'RTX3070'), 200),
+                (('RTX 3060', 'RTX3060'), 100),
+            ]),
+            (('ARC',), 400, [
+                (('B580',), 100),
+                (('B570',), 80),
+                (('A770',), 60),
+            ]),
+        ],
+        'penalties': [
+            (('支撐架', '支架', 'HOLDER', 'SUPPORT'), -2000),  # 配件
+            (('GT710', 'GT730', 'GT1030'), -1000),             # 低階顯卡
+        ],
+        'markers': {'hot': 50, 'price_change': 30},
+    },
+}
+
+
+class RankingRule:
+    """編譯後的單一類別排序規則"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.tiers = [(frozenset(series), base, [(frozenset(model), bonus) for model, bonus in models])
+                      for series, base, models in spec.get('tiers', [])]
+        self.penalties = [(frozenset(keywords), score) for keywords, score in spec.get('penalties', [])]
+        self.markers = dict(spec.get('markers', {}))
+
+        keywords = set()
+        for series, _, models in self.tiers:
+            keywords |= series
+            for model, _ in models:
+                keywords |= model
+        for group, _ in self.penalties:
+            keywords |= group
+
+        # 以零寬度的 lookahead 在每個位置取最長的關鍵字；同一位置較短的關鍵字必為其前綴，
+        # 因此預先算好每個關鍵字包含的前綴關鍵字，一次掃描即可得到所有出現過的關鍵字
+        self._prefixes = {keyword: frozenset(other for other in keywords if keyword.startswith(other))
+                          for keyword in keywords}
+        alternatives = '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+        self._pattern = re.compile(f'(?=({alternatives}))') if keywords else None
+
+    def matched_keywords(self, text: str) -> frozenset:
+        """商品文字（大寫）中出現的所有關鍵字"""
+        if self._pattern is None:
+            return frozenset()
+        found = set()
+        prefixes = self._prefixes
+        for match in self._pattern.finditer(text):
+            found |= prefixes[match.group(1)]
+        return frozenset(found)
+
+    def score(self, product: Dict[str, Any]) -> int:
+        """計算商品分數"""
+        found = self.matched_keywords((product.get('raw_text') or '').upper())
+        score = 0
+
+        if found:
+            for series, base, models in self.tiers:
+                if not series.isdisjoint(found):
+                    score += base
+                    for model, bonus in models:
+                        if not model.isdisjoint(found):
+                            score += bonus
+                            break
+                    break
+
+            for group, penalty in self.penalties:
+                if not group.isdisjoint(found):
+                    score += penalty
+
+        for marker in product.get('markers') or ():
+            score += self.markers.get(marker, 0)
+
+        return score
+
+
+_COMPILED_RULES = {category_id: RankingRule(spec) for category_id, spec in RANKING_RULES.items()}
+
+
+def ranking_rule(category_id: str) -> Optional[RankingRule]:
+    """取得類別的排序規則，沒有規則的類別回傳 None"""
+    return _COMPILED_RULES.get(category_id)
+
+
+def rank_products(products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """依 rank_score 由高到低排序；同分時維持原本順序"""
+    return sorted(products, key=lambda product: -product['rank_score'])
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 正規化匯出
+將解析結果寫入 categories、subcategories、products、specs、markers 資料表，
+並在類別、品牌、型號與價格上建立索引，另可建立 raw_text 的 FTS5 全文檢索表。
+
+商品以與價格歷史相同的商品識別碼 (coolpc_history.product_key) 為主鍵；
+重新匯出到既有資料庫時以 upsert 更新，本次快照沒有出現的商品保留原資料並標記 present = 0。
+canonical_id 為跨類別重複商品的代表識別碼（--dedup，見 coolpc_dedup），未分群時與 product_key 相同。
+"""
+
+import json
+import sqlite3
+import argparse
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from coolpc_history import iter_keyed_products
+from coolpc_attributes import ATTRIBUTE_NAMES, ENUM_ATTRIBUTES
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS categories (
+    category_id TEXT PRIMARY KEY,
+    category_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    stats TEXT
+);
+CREATE TABLE IF NOT EXISTS subcategories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    UNIQUE (category_id, name)
+);
+CREATE TABLE IF NOT EXISTS products (
+    product_key TEXT PRIMARY KEY,
+    canonical_id TEXT,
+    category_id TEXT NOT NULL,
+    subcategory_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    product_index TEXT,
+    product_group TEXT,
+    brand TEXT,
+    model TEXT,
+    price INTEGER,
+    original_price INTEGER,
+    discount_amount INTEGER,
+    rank_score INTEGER,
+    raw_text TEXT,
+    {attribute_columns},
+    present INTEGER NOT NULL DEFAULT 1,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS specs (
+    product_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    spec TEXT NOT NULL,
+    PRIMARY KEY (product_key, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS markers (
+    product_key TEXT NOT NULL,
+    marker TEXT NOT NULL,
+    PRIMARY KEY (product_key, marker)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS exports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    exported_at TEXT NOT NULL,
+    source TEXT,
+    product_count INTEGER NOT NULL
+);
+'''.format(attribute_columns=',\n    '.join(
+    f"{name} {'TEXT' if name in ENUM_ATTRIBUTES else 'INTEGER'}"
+    for name in ATTRIBUTE_NAMES))
+
+# 索引在資料載入後才建立：新資料庫不必在每次插入時維護索引
+_INDEXES = '''
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id, price);
+CREATE INDEX IF NOT EXISTS idx_products_brand ON products (brand, price);
+CREATE INDEX IF NOT EXISTS idx_products_model ON products (model);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (price);
+CREATE INDEX IF NOT EXISTS idx_products_subcategory ON products (subcategory_id);
+CREATE INDEX IF NOT EXISTS idx_products_canonical ON products (canonical_id, price);
+CREATE INDEX IF NOT EXISTS idx_markers_marker ON markers (marker);
+'''
+
+_PRODUCT_COLUMNS = ('product_key', 'canonical_id', 'category_id', 'subcategory_id', 'position', 'product_index', 'product_group',
+                    'brand', 'model', 'price', 'original_price', 'discount_amount', 'rank_score', 'raw_text') \
+    + ATTRIBUTE_NAMES + ('present', 'first_seen', 'last_seen')
+
+# 重新匯出時除了 first_seen 之外全部以本次快照為準
+_UPSERT_PRODUCT = 'INSERT INTO products ({columns}) VALUES ({placeholders}) ON CONFLICT (product_key) DO UPDATE SET {updates}'.format(
+    columns=', '.join(_PRODUCT_COLUMNS),
+    placeholders=', '.join('?' * len(_PRODUCT_COLUMNS)),
+    updates=', '.join(f"{column} = excluded.{column}" for column in _PRODUCT_COLUMNS
+                      if column not in ('product_key', 'first_seen'))
+)
+
+
+class SQLiteExport:
+    """正規化的 SQLite 商品資料庫"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        # 批次寫入與重建索引時使用較大的頁面快取 (64MB)
+        self.conn.execute("PRAGMA cache_size = -65536")
+        self.conn.executescript(_SCHEMA)
+        # 早期建立的資料庫沒有 canonical_id 欄位
+        if 'canonical_id' not in {row[1] for row in self.conn.execute('PRAGMA table_info(products)')}:
+            self.conn.execute('ALTER TABLE products ADD COLUMN canonical_id TEXT')
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def has_fts(self) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'").fetchone() is not None
+
+    def _create_fts(self):
+        """建立 raw_text 全文檢索表；trigram 分詞可直接搜尋中文子字串，舊版 SQLite 沒有時改用 unicode61"""
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                self.conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+                    f"raw_text, content='products', content_rowid='rowid', tokenize='{tokenizer}')")
+                return
+            except sqlite3.OperationalError:
+                continue
+        print("此 SQLite 不支援 FTS5，略過全文檢索表")
+
+    def export(self, categories: List[Dict[str, Any]], fts: bool = False,
+               exported_at: Optional[str] = None, source: Optional[str] = None,
+               canonical: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+        """在單一交易中以 executemany 寫入一次快照，回傳新增與更新的商品數量
+
+        canonical 為商品識別碼 -> 代表識別碼（DuplicateClusters.canonical），寫入 canonical_id 欄位。
+        """
+        canonical = canonical or {}
+        exported_at = exported_at or datetime.now().isoformat(timespec='seconds')
+        conn = self.conn
+        previous_keys = {row[0] for row in conn.execute('SELECT product_key FROM products')}
+
+        with conn:
+            conn.executemany(
+                'INSERT INTO categories (category_id, category_name, position, stats) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (category_id) DO UPDATE SET category_name = excluded.category_name, '
+                'position = excluded.position, stats = excluded.stats',
+                [(category['category_id'], category['category_name'], position,
+                  json.dumps(category.get('stats') or {}, ensure_ascii=False))
+                 for position, category in enumerate(categories)]
+            )
+            conn.executemany(
+                'INSERT INTO subcategories (category_id, name, position) VALUES (?, ?, ?) '
+                'ON CONFLICT (category_id, name) DO UPDATE SET position = excluded.position',
+                [(category['category_id'], subcategory['name'], position)
+                 for category in categories
+                 for position, subcategory in enumerate(category.get('subcategories', []))]
+            )
+            subcategory_ids = {(row[0], row[1]): row[2]
+                               for row in conn.execute('SELECT category_id, name, id FROM subcategories')}
+
+            product_rows = []
+            spec_rows = []
+            marker_rows = []
+            position = 0
+            for key, category, subcategory, product in iter_keyed_products(categories):
+                attributes = product.get('attributes') or {}
+                product_rows.append((
+                    key, canonical.get(key, key), category['category_id'], subcategory_ids[(category['category_id'], subcategory['name'])],
+                    position, product.get('index'), product.get('group'), product.get('brand'), product.get('model'),
+                    product.get('price'), product.get('original_price'), product.get('discount_amount'),
+                    product.get('rank_score'), product.get('raw_text'),
+                    *(attributes.get(name) for name in ATTRIBUTE_NAMES),
+                    1, exported_at, exported_at
+                ))
+                spec_rows.extend((key, spec_position, spec)
+                                 for spec_position, spec in enumerate(product.get('specs') or ()))
+                marker_rows.extend((key, marker) for marker in product.get('markers') or ())
+                position += 1
+
+            # 本次快照的商品先清除舊的規格與標記再重新寫入；沒有出現的商品保留資料並標記為 present = 0
+            # 依主鍵排序後寫入，B-tree 只需依序附加，不必在隨機位置分裂頁面
+            product_rows.sort()
+            spec_rows.sort()
+            marker_rows.sort()
+            current_keys = {row[0] for row in product_rows}
+            updated_keys = sorted((key,) for key in current_keys if key in previous_keys)
+            conn.execute('UPDATE products SET present = 0 WHERE present = 1')
+            conn.executemany('DELETE FROM specs WHERE product_key = ?', updated_keys)
+            conn.executemany('DELETE FROM markers WHERE product_key = ?', updated_keys)
+            conn.executemany(_UPSERT_PRODUCT, product_rows)
+            conn.executemany('INSERT INTO specs (product_key, position, spec) VALUES (?, ?, ?)', spec_rows)
+            conn.executemany('INSERT INTO markers (product_key, marker) VALUES (?, ?)', marker_rows)
+            for statement in _INDEXES.strip().split(';\n'):
+                conn.execute(statement)
+
+            if fts:
+                self._create_fts()
+            if self.has_fts:
+                # 外部內容的 FTS 表不會自動同步，重建即可反映本次的 upsert
+                conn.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+            conn.execute('INSERT INTO exports (exported_at, source, product_count) VALUES (?, ?, ?)',
+                         (exported_at, source, len(product_rows)))
+
+        return {
+            'products': len(product_rows),
+            'new': len(product_rows) - len(updated_keys),
+            'updated': len(updated_keys),
+            'absent': len(previous_keys - current_keys)
+        }
+
+    def search(self, keyword: Optional[str] = None, category: Optional[str] = None, brand: Optional[str] = None,
+               min_price: Optional[int] = None, max_price: Optional[int] = None,
+               limit: int = 20, unique: bool = False) -> List[Dict[str, Any]]:
+        """查詢目前快照中的商品（依價格由低到高）；有 FTS 表且關鍵字至少 3 個字時使用全文檢索
+
+        unique 時同一 canonical_id 的重複商品只列出最低價的一項。
+        """
+        conditions = ['p.present = 1']
+        params = []
+        source = 'products p'
+        if keyword:
+            if self.has_fts and len(keyword) >= 3:
+                source = 'products_fts f JOIN products p ON p.rowid = f.rowid'
+                conditions.append('products_fts MATCH ?')
+                params.append('"' + keyword.replace('"', '""') + '"')
+            else:
+                conditions.append('p.raw_text LIKE ?')
+                params.append(f'%{keyword}%')
+        if category:
+            conditions.append('p.category_id = ?')
+            params.append(category)
+        if brand:
+            conditions.append('p.brand = ?')
+            params.append(brand)
+        if min_price is not None:
+            conditions.append('p.price >= ?')
+            params.append(min_price)
+        if max_price is not None:
+            conditions.append('p.price <= ?')
+            params.append(max_price)
+        columns = 'p.product_key, p.canonical_id, p.category_id, p.brand, p.model, p.price, p.raw_text'
+        if unique:
+            # SQLite 的 MIN() 聚合查詢中，其餘欄位取自最低價的那一列
+            rows = self.conn.execute(
+                f"SELECT {columns}, MIN(p.price) AS _min_price FROM {source} "
+                f"WHERE {' AND '.join(conditions)} GROUP BY p.canonical_id "
+                f"ORDER BY _min_price LIMIT ?",
+                (*params, limit)
+            )
+            return [{key: row[key] for key in row.keys() if key != '_min_price'} for row in rows]
+        rows = self.conn.execute(
+            f"SELECT {columns} FROM {source} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY p.price LIMIT ?",
+            (*params, limit)
+        )
+        return [dict(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='原價屋 SQLite 商品資料庫查詢')
+    parser.add_argument('db', help='coolpc_parser.py --sqlite 匯出的資料庫路徑')
+    parser.add_argument('--keyword', help='商品文字關鍵字')
+    parser.add_argument('--category', help='類別編號')
+    parser.add_argument('--brand', help='品牌')
+    parser.add_argument('--min-price', type=int, help='最低價格')
+    parser.add_argument('--max-price', type=int, help='最高價格')
+    parser.add_argument('--limit', type=int, default=20, help='結果數量 (預設: 20)')
+    parser.add_argument('--unique', action='store_true', help='重複商品 (同一 canonical_id) 只列出最低價的一項')
+
+    args = parser.parse_args()
+
+    with SQLiteExport(args.db) as db:
+        for row in db.search(args.keyword, args.category, args.brand, args.min_price, args.max_price, args.limit,
+                             args.unique):
+            print(f"{row['price']:>8}  [{row['category_id']}] {row['raw_text']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+監看模式 (coolpc_parser.py --watch)
+常駐行程依排程重新下載並解析報價單，每次解析完成後建立新的快照（解析結果 + 查詢索引），
+以替換參照的方式切換；查詢端只讀取目前的快照參照，不需要加鎖，也不會讀到更新到一半的資料。
+另以本機 HTTP 或 Unix socket 提供查詢、健康檢查與統計數據：
+
+    GET /health                      快照狀態（尚未完成第一次解析或資料過舊時回應 503）
+    GET /metrics                     更新次數、耗時、失敗原因、請求數等統計
+    GET /categories                  各類別名稱與商品數量
+    GET /query?keyword=&category=&brand=&min_price=&max_price=&sort_by=&limit=
+    GET /lookup?q=&limit=&min_similarity=    以型號模糊查詢最接近的商品 (如 q=RTX5070)
+"""
+
+import os
+import json
+import stat
+import time
+import signal
+import threading
+import socketserver
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from typing import List, Dict, Any, Callable, Optional
+
+from coolpc_index import QueryIndex
+from coolpc_fuzzy import FuzzyIndex, DEFAULT_MIN_SIMILARITY
+
+DEFAULT_LISTEN = '127.0.0.1:8765'
+# 查詢結果數量上限
+MAX_QUERY_LIMIT = 200
+# 超過幾個更新週期沒有成功更新時，健康檢查視為資料過舊
+STALE_INTERVALS = 3
+
+
+class Snapshot:
+    """一次解析的結果與查詢索引；建立後不再修改，可在多個執行緒間共用"""
+
+    def __init__(self, categories: List[Dict[str, Any]], generation: int):
+        self.categories = categories
+        self.generation = generation
+        self.index = QueryIndex.build(categories)
+        self.fuzzy = FuzzyIndex.build(categories)
+        self.created_at = time.time()
+        self.products = len(self.index.locations)
+        self.category_summary = [
+            {
+                'category_id': category['category_id'],
+                'category_name': category['category_name'],
+                'products': sum(len(subcategory['products']) for subcategory in category.get('subcategories', []))
+            }
+            for category in categories
+        ]
+
+
+class SnapshotStore:
+    """保存目前的快照與更新統計
+
+    只有更新執行緒會替換 current；讀取端直接取用 current 參照，替換後舊快照在沒有讀取端使用時自動釋放。
+    """
+
+    def __init__(self, interval: float, metrics: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.interval = interval
+        self.current = None
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self.stats = {
+            'refreshes': 0,
+            'unchanged': 0,
+            'failures': 0,
+            'last_refresh_at': None,
+            'last_refresh_seconds': None,
+            'last_success_at': None,
+            'last_error': None,
+            'requests': {}
+        }
+
+    def refresh(self, load: Callable[[], Optional[List[Dict[str, Any]]]]):
+        """執行一次更新；load 回傳 None 表示資料沒有變更，發生例外時保留原本的快照"""
+        start = time.perf_counter()
+        snapshot = error = None
+        try:
+            categories = load()
+            if categories is not None:
+                previous = self.current
+                snapshot = Snapshot(categories, previous.generation + 1 if previous else 1)
+        except Exception as e:
+            error = e
+            print(f"更新失敗，繼續使用目前的快照: {e}")
+
+        if snapshot is not None:
+            # 替換參照即完成切換
+            self.current = snapshot
+            print(f"快照已更新: 第 {snapshot.generation} 版，{snapshot.products} 項商品")
+
+        with self._lock:
+            stats = self.stats
+            if error is not None:
+                stats['failures'] += 1
+                stats['last_error'] = f"{type(error).__name__}: {error}"
+            else:
+                stats['refreshes' if snapshot is not None else 'unchanged'] += 1
+                stats['last_error'] = None
+                stats['last_success_at'] = time.time()
+            stats['last_refresh_at'] = time.time()
+            stats['last_refresh_seconds'] = time.perf_counter() - start
+
+    def count_request(self, endpoint: str):
+        with self._lock:
+            requests = self.stats['requests']
+            requests[endpoint] = requests.get(endpoint, 0) + 1
+
+    def health(self) -> Dict[str, Any]:
+        snapshot = self.current
+        if snapshot is None:
+            return {'status': 'starting'}
+        last_success = self.stats['last_success_at'] or snapshot.created_at
+        stale = time.time() - last_success > self.interval * STALE_INTERVALS
+        return {
+            'status': 'stale' if stale else 'ok',
+            'generation': snapshot.generation,
+            'products': snapshot.products,
+            'snapshot_age_seconds': time.time() - snapshot.created_at
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        snapshot = self.current
+        with self._lock:
+            stats = {**self.stats, 'requests': dict(self.stats['requests'])}
+        for key in ('last_refresh_at', 'last_success_at'):
+            if stats[key] is not None:
+                stats[key] = datetime.fromtimestamp(stats[key], timezone.utc).isoformat(timespec='seconds')
+        return {
+            'uptime_seconds': time.time() - self._started_at,
+            'interval_seconds': self.interval,
+            'generation': snapshot.generation if snapshot else 0,
+            'products': snapshot.products if snapshot else 0,
+            **stats,
+            **(self._metrics() if self._metrics else {})
+        }
+
+
+def _int_param(params: Dict[str, List[str]], name: str) -> Optional[int]:
+    values = params.get(name)
+    if not values or values[0] == '':
+        return None
+    return int(values[0])
+
+
+def _str_param(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = params.get(name)
+    return values[0] if values and values[0] != '' else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """查詢服務的 HTTP 處理器（server.store 為 SnapshotStore）"""
+
+    server_version = 'CoolPCWatch/1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = {
+            '/health': self._health,
+            '/metrics': self._metrics,
+            '/categories': self._categories,
+            '/query': self._query,
+            '/lookup': self._lookup,
+        }.get(url.path)
+        if route is None:
+            self._send(404, {'error': f"未知的路徑: {url.path}"})
+            return
+        self.server.store.count_request(url.path)
+        try:
+            route(parse_qs(url.query))
+        except ValueError as e:
+            self._send(400, {'error': f"參數錯誤: {e}"})
+
+    def _health(self, params):
+        health = self.server.store.health()
+        self._send(200 if health['status'] == 'ok' else 503, health)
+
+    def _metrics(self, params):
+        self._send(200, self.server.store.metrics())
+
+    def _categories(self, params):
+        snapshot = self.server.store.current
+        if snapshot is None:
+            self._send(503, {'error': '尚未完成第一次解析'})
+            return
+        self._send(200, {'generation': snapshot.generation, 'categories': snapshot.category_summary})
+
+    def _query(self, params):
+        # 整個請求只使用同一個快照，查詢期間切換快照也不影響結果
+        snapshot = self.server.store.current
+        if snapshot is None:
+            self._send(503, {'error': '尚未完成第一次解析'})
+            return
+        sort_by = _str_param(params, 'sort_by') or 'price_asc'
+        if sort_by not in ('price_asc', 'price_desc'):
+            raise ValueError(f"sort_by 只能是 price_asc 或 price_desc: {sort_by}")
+        limit = _int_param(params, 'limit') or 10
+        product_ids = snapshot.index.query(
+            _str_param(params, 'keyword'),
+            _str_param(params, 'category'),
+            _str_param(params, 'brand'),
+            _int_param(params, 'min_price'),
+            _int_param(params, 'max_price'),
+            max(1, min(limit, MAX_QUERY_LIMIT)),
+            sort_by
+        )
+        self._send(200, {
+            'generation': snapshot.generation,
+            'products': [snapshot.index.resolve(product_id, snapshot.categories) for product_id in product_ids]
+        })
+
+    def _lookup(self, params):
+        snapshot = self.server.store.current
+        if snapshot is None:
+            self._send(503, {'error': '尚未完成第一次解析'})
+            return
+        query = _str_param(params, 'q')
+        if not query:
+            raise ValueError("缺少查詢字串 q")
+        limit = _int_param(params, 'limit') or 10
+        min_similarity = _str_param(params, 'min_similarity')
+        results = snapshot.fuzzy.search(
+            query,
+            max(1, min(limit, MAX_QUERY_LIMIT)),
+            float(min_similarity) if min_similarity is not None else DEFAULT_MIN_SIMILARITY
+        )
+        self._send(200, {
+            'generation': snapshot.generation,
+            'products': [{**snapshot.index.resolve(product_id, snapshot.categories), 'similarity': similarity}
+                         for product_id, similarity in results]
+        })
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body, ensure_ascii=False, default=lambda product: product.to_dict()).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix socket 的 client_address 不是 (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        # 不逐筆記錄請求，請求數量見 /metrics
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _is_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+def make_server(listen: str, store: SnapshotStore) -> socketserver.BaseServer:
+    """建立查詢服務：listen 為 "host:port" 或 "unix:/path/to.sock\""""
+    if listen.startswith('unix:'):
+        path = listen[len('unix:'):]
+        # 清除上次未正常結束留下的 socket 文件；不是 socket 的文件不刪除，以免誤刪使用者的資料
+        if _is_socket(path):
+            os.remove(path)
+        elif os.path.lexists(path):
+            raise ValueError(f"監聽位址已存在且不是 socket 文件: {path}")
+        server = _UnixHTTPServer(path, _Handler)
+    else:
+        host, _, port = listen.rpartition(':')
+        if not host or not port.isdigit():
+            raise ValueError(f"無效的監聽位址: {listen}")
+        server = ThreadingHTTPServer((host, int(port)), _Handler)
+    server.store = store
+    return server
+
+
+def run_watch(load: Callable[[], Optional[List[Dict[str, Any]]]], server: socketserver.BaseServer,
+              listen: str = DEFAULT_LISTEN):
+    """常駐執行：每 store.interval 秒呼叫一次 load 更新快照，同時以 make_server 建立的 server 提供查詢服務，直到收到中斷訊號
+
+    監聽位址在呼叫前由 make_server 檢查並綁定，這裡不再處理位址錯誤。
+    """
+    store = server.store
+    interval = store.interval
+    server_thread = threading.Thread(target=server.serve_forever, name='coolpc-watch-server', daemon=True)
+    server_thread.start()
+    print(f"查詢服務已啟動: {listen}，每 {interval:g} 秒更新一次 (Ctrl+C 結束)")
+
+    stop = threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    try:
+        while not stop.is_set():
+            started = time.monotonic()
+            store.refresh(load)
+            # 依固定週期排程，不因更新耗時而逐漸延後
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        if isinstance(server, _UnixHTTPServer) and _is_socket(server.server_address):
+            os.remove(server.server_address)
+        print("監看模式已結束")
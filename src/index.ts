@@ -14,6 +14,28 @@ import { fileURLToPath } from "url";
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 
+// 解析時取出的規格屬性 (coolpc_attributes.py)，只包含有找到的屬性
+interface ProductAttributes {
+  capacity_gb?: number;
+  mhz?: number;
+  watts?: number;
+  vram_gb?: number;
+  socket?: string;
+  chipset?: string;
+  ddr?: string;
+  form_factor?: string;
+  side_panel?: string;
+}
+
+// 詳細頁面內容 (coolpc_details.py)
+interface ProductDetail {
+  url: string;
+  title: string | null;
+  description: string | null;
+  images: string[];
+  text: string;
+}
+
 interface ProductSpec {
   index: string;
   group: string | null;
@@ -25,6 +47,8 @@ interface ProductSpec {
   discount_amount: number | null;
   markers: string[];
   raw_text: string;
+  attributes?: ProductAttributes;
+  detail?: ProductDetail;
 }
 
 interface Subcategory {
@@ -47,6 +71,21 @@ interface ProductCategory {
   subcategories: Subcategory[];
 }
 
+// 主機板尺寸別名正規化為 coolpc_attributes.py 的 FORM_FACTORS (E-ATX, ATX, mATX, ITX)
+function normalizeFormFactor(value: string): string {
+  const token = value.toUpperCase().replace(/[\s.-]/g, '');
+  if (token === 'EATX') return 'E-ATX';
+  if (token === 'MATX' || token === 'MICROATX') return 'mATX';
+  if (token === 'MINIITX' || token === 'ITX') return 'ITX';
+  return token;
+}
+
+// 腳位比對：'1700' 與 'LGA1700' 視為相同
+function matchSocket(attribute: string, socket: string): boolean {
+  const target = socket.toUpperCase().replace(/\s/g, '');
+  return attribute === target || attribute === `LGA${target}`;
+}
+
 class CoolPCMCPServer {
   private server: Server;
   private productData: ProductCategory[] = [];
@@ -401,7 +440,10 @@ class CoolPCMCPServer {
         let matches = true;
 
         // Filter by socket if specified
-        if (socket) {
+        // 有解析出的規格屬性時直接比對；舊版 product.json 或文字中沒有該屬性時才以文字比對
+        if (socket && product.attributes?.socket !== undefined) {
+          matches = matchSocket(product.attributes.socket, socket);
+        } else if (socket) {
           const socketLower = socket.toLowerCase();
           const subcatLower = subcat.name.toLowerCase();
           const specsText = product.specs.join(' ').toLowerCase();
@@ -520,7 +562,9 @@ class CoolPCMCPServer {
         }
 
         // Filter by memory if specified
-        if (memory && matches) {
+        if (memory && matches && product.attributes?.vram_gb !== undefined) {
+          matches = product.attributes.vram_gb === memory;
+        } else if (memory && matches) {
           const memPattern = new RegExp(`${memory}G(?:B)?`, 'i');
           const specsText = product.specs.join(' ');
           const hasMemory = memPattern.test(specsText) || 
@@ -609,7 +653,9 @@ class CoolPCMCPServer {
         let matches = true;
 
         // Filter by type if specified (DDR4, DDR5)
-        if (type && matches) {
+        if (type && matches && product.attributes?.ddr !== undefined) {
+          matches = product.attributes.ddr === type.toUpperCase();
+        } else if (type && matches) {
           const typeLower = type.toLowerCase();
           const subcatLower = subcat.name.toLowerCase();
           const specsText = product.specs.join(' ').toLowerCase();
@@ -623,7 +669,9 @@ class CoolPCMCPServer {
         }
 
         // Filter by capacity if specified
-        if (capacity && matches) {
+        if (capacity && matches && product.attributes?.capacity_gb !== undefined) {
+          matches = product.attributes.capacity_gb === capacity;
+        } else if (capacity && matches) {
           const capPattern = new RegExp(`${capacity}GB`, 'i');
           const specsText = product.specs.join(' ');
           const hasCapacity = capPattern.test(specsText) || 
@@ -636,7 +684,9 @@ class CoolPCMCPServer {
         }
 
         // Filter by frequency if specified
-        if (frequency && matches) {
+        if (frequency && matches && product.attributes?.mhz !== undefined) {
+          matches = product.attributes.mhz === frequency;
+        } else if (frequency && matches) {
           const freqPattern = new RegExp(`${frequency}(?:MHz)?`, 'i');
           const specsText = product.specs.join(' ');
           const hasFrequency = freqPattern.test(specsText) || 
@@ -739,7 +789,9 @@ class CoolPCMCPServer {
         }
 
         // Filter by capacity if specified
-        if (capacity && matches) {
+        if (capacity && matches && product.attributes?.capacity_gb !== undefined) {
+          matches = product.attributes.capacity_gb === capacity;
+        } else if (capacity && matches) {
           // Handle both GB and TB
           const capPatternGB = new RegExp(`${capacity}GB`, 'i');
           const capPatternTB = new RegExp(`${capacity / 1000}TB`, 'i');
@@ -833,7 +885,9 @@ class CoolPCMCPServer {
         let matches = true;
 
         // Filter by socket if specified
-        if (socket && matches) {
+        if (socket && matches && product.attributes?.socket !== undefined) {
+          matches = matchSocket(product.attributes.socket, socket);
+        } else if (socket && matches) {
           const socketLower = socket.toLowerCase();
           const subcatLower = subcat.name.toLowerCase();
           const specsText = product.specs.join(' ').toLowerCase();
@@ -847,7 +901,9 @@ class CoolPCMCPServer {
         }
 
         // Filter by chipset if specified
-        if (chipset && matches) {
+        if (chipset && matches && product.attributes?.chipset !== undefined) {
+          matches = product.attributes.chipset.startsWith(chipset.toUpperCase());
+        } else if (chipset && matches) {
           const chipsetLower = chipset.toLowerCase();
           const specsText = product.specs.join(' ').toLowerCase();
           const modelLower = product.model?.toLowerCase() || '';
@@ -861,7 +917,9 @@ class CoolPCMCPServer {
         }
 
         // Filter by form factor if specified
-        if (form_factor && matches) {
+        if (form_factor && matches && product.attributes?.form_factor !== undefined) {
+          matches = product.attributes.form_factor === normalizeFormFactor(form_factor);
+        } else if (form_factor && matches) {
           const formLower = form_factor.toLowerCase();
           const specsText = product.specs.join(' ').toLowerCase();
           const rawTextLower = product.raw_text.toLowerCase();
@@ -1195,14 +1253,18 @@ class CoolPCMCPServer {
       for (const product of subcat.products) {
         let matches = true;
 
-        // 篩選：Form Factor
+        // 篩選：Form Factor（機殼的 form_factor 屬性為支援的最大尺寸，與 matchFormFactor 相同不含較大尺寸的機殼）
         if (form_factor && matches) {
-          matches = this.matchFormFactor(product.specs, form_factor);
+          matches = product.attributes?.form_factor !== undefined
+            ? product.attributes.form_factor === normalizeFormFactor(form_factor)
+            : this.matchFormFactor(product.specs, form_factor);
         }
 
         // 篩選：側板類型
         if (side_panel && matches) {
-          matches = this.matchSidePanel(product, side_panel);
+          matches = product.attributes?.side_panel !== undefined
+            ? product.attributes.side_panel === side_panel
+            : this.matchSidePanel(product, side_panel);
         }
 
         // 篩選：是否含電源
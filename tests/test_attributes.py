@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_attributes 測試：腳位與瓦數等容易漏抓或誤抓的商品文字。
+
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coolpc_attributes import extract_attributes
+
+
+class ExtractAttributesTest(unittest.TestCase):
+
+    def test_socket(self):
+        self.assertEqual(extract_attributes('Intel Core Ultra 5 225F【10核/10緒】1.5GHz/1851, $6,290')['socket'],
+                         'LGA1851')
+        self.assertEqual(extract_attributes('Intel i5-14400F 65W/1700/代理盒裝, $4,390')['socket'], 'LGA1700')
+        self.assertEqual(extract_attributes('AMD R7 9800X3D (AM5), $15,990')['socket'], 'AM5')
+        # 價格中的數字不是腳位
+        self.assertNotIn('socket', extract_attributes('鍵盤 K120, $1,200'))
+
+    def test_psu_watts(self):
+        self.assertEqual(extract_attributes('華擎 ASRock FOCUS GX-850 ATX3.0 白金/全模組, $1,980')['watts'], 850)
+        self.assertEqual(extract_attributes('ZOTAC MWE-1000 ATX3.1 金牌/全模組, $3,960')['watts'], 1000)
+        self.assertEqual(extract_attributes('海韻 FOCUS 650W 金牌/全模組, $2,990')['watts'], 650)
+        # 沒有 80 PLUS 等級的型號數字不是瓦數
+        self.assertNotIn('watts', extract_attributes('Kingston FURY 32GB DDR5-6000, $3,290'))
+        self.assertNotIn('watts', extract_attributes('羅技 G-502 電競滑鼠, $1,490'))
+
+
+if __name__ == '__main__':
+    unittest.main()
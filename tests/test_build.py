@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_build 測試：以小型合成資料與暴力列舉比對，確認前 K 組配置（含同分時較便宜者優先）正確。
+
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coolpc_build import BuildOptimizer
+
+
+def _product(price, raw_text, rank_score=0, **attributes):
+    return {'price': price, 'raw_text': raw_text, 'rank_score': rank_score, 'attributes': attributes}
+
+
+def _fixture(seed):
+    """各零件數項商品；價格與分數取自少數幾個值，刻意產生大量同分的配置"""
+    rng = random.Random(seed)
+    sockets = [('AM5', 'DDR5'), ('LGA1700', 'DDR4')]
+    products = {'4': [], '5': [], '6': [], '7': [], '12': [], '15': [], '14': []}
+    for _ in range(6):
+        socket, _ = rng.choice(sockets)
+        products['4'].append(_product(rng.choice([3000, 4000, 5000]), f"CPU【{rng.choice([6, 8])}核/12緒】",
+                                      socket=socket))
+        socket, ddr = rng.choice(sockets)
+        products['5'].append(_product(rng.choice([2000, 2500, 3000]), 'MB', chipset=rng.choice(['B650', 'X670']),
+                                      socket=socket, ddr=ddr, form_factor=rng.choice(['ATX', 'mATX'])))
+        products['6'].append(_product(rng.choice([1000, 1500]), 'RAM', capacity_gb=rng.choice([16, 32]),
+                                      ddr=rng.choice(['DDR4', 'DDR5'])))
+        products['7'].append(_product(rng.choice([1000, 1500, 2000]), 'SSD', capacity_gb=rng.choice([500, 1000])))
+        products['12'].append(_product(rng.choice([6000, 9000, 12000]), 'VGA', rank_score=rng.choice([600, 700]),
+                                       vram_gb=rng.choice([8, 12])))
+        products['15'].append(_product(rng.choice([1500, 2000]), 'PSU', watts=rng.choice([650, 750])))
+        products['14'].append(_product(rng.choice([800, 1000, 1200]), 'CASE', form_factor=rng.choice(['ATX', 'mATX'])))
+    return [{'category_id': category_id, 'subcategories': [{'name': '全部', 'products': items}]}
+            for category_id, items in products.items()]
+
+
+def _brute_force(optimizer, budget, top_k):
+    """在相同的候選清單中列出所有預算內的配置，依分數由高到低、同分時總價由低到高取前 top_k 組"""
+    names = [slot[0] for slot in optimizer.slots]
+    builds = []
+
+    def walk(i, chosen, spent, value):
+        if i == len(names):
+            builds.append((round(value * 100, 2), spent))
+            return
+        for candidate in optimizer._candidates(names[i], chosen):
+            if spent + candidate.price > budget:
+                break
+            chosen[names[i]] = candidate
+            walk(i + 1, chosen, spent + candidate.price, value + candidate.value)
+            del chosen[names[i]]
+
+    walk(0, {}, 0, 0.0)
+    builds.sort(key=lambda build: (-build[0], build[1]))
+    return builds[:top_k]
+
+
+class BuildOptimizerTest(unittest.TestCase):
+
+    def test_top_k_matches_brute_force(self):
+        for seed in range(20):
+            optimizer = BuildOptimizer(_fixture(seed))
+            for budget in (16000, 20000, 25000, 40000):
+                with self.subTest(seed=seed, budget=budget):
+                    result = optimizer.optimize(budget, top_k=5, time_limit=30)
+                    self.assertTrue(result['complete'])
+                    self.assertEqual([(build['score'], build['total_price']) for build in result['builds']],
+                                     _brute_force(optimizer, budget, 5))
+
+    def test_ties_prefer_cheaper_builds(self):
+        # 機殼權重為 0：只差在機殼的配置同分，前幾名應是最便宜的組合
+        optimizer = BuildOptimizer(_fixture(0))
+        builds = optimizer.optimize(40000, top_k=5)['builds']
+        prices = [build['total_price'] for build in builds if build['score'] == builds[0]['score']]
+        self.assertEqual(prices, sorted(prices))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_columnar 測試：golden 解析結果寫成欄位式快照後，以 mmap 讀回的內容必須與原本相同。
+
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from coolpc_columnar import write_columnar, ColumnarSnapshot
+
+GOLDEN_FIXTURE = os.path.join(ROOT, 'benchmarks', 'golden', 'evaluate_fixture.json')
+
+
+class ColumnarSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(GOLDEN_FIXTURE, 'r', encoding='utf-8') as f:
+            self.categories = json.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        path = os.path.join(self.tmp_dir, 'product.cpcs')
+        write_columnar(self.categories, path)
+        with ColumnarSnapshot(path) as snapshot:
+            self.assertEqual(len(snapshot), sum(len(subcategory['products']) for category in self.categories
+                                                for subcategory in category['subcategories']))
+            self.assertEqual(snapshot.to_categories(), self.categories)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_dedup 測試：福利品出清與一般類別的同一商品應合併；品牌、規格數字不同，
+或同一類別中文字相近的不同 SKU 不可合併。
+
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coolpc_parser import WorkingCoolPCParser
+from coolpc_dedup import DuplicateClusters
+
+
+def _category(category_id, *lines):
+    """以解析器解析一個類別的 OPTION 文字"""
+    options = ''.join(f'<OPTION value={category_id}{i:03d}>{line}' for i, line in enumerate(lines))
+    content = f'<OPTION VALUE=0>類別 {category_id}，共有商品 {len(lines)} 樣<OPTGROUP label="全部">{options}</OPTGROUP>'
+    return WorkingCoolPCParser('unused.html')._parse_category(content, category_id)
+
+
+def _clustered_texts(categories):
+    clusters = DuplicateClusters.build(categories)
+    groups = []
+    for cluster in clusters.clusters:
+        texts = []
+        for member in cluster['members']:
+            cat_pos, sub_pos, prod_pos = member['location']
+            texts.append(categories[cat_pos]['subcategories'][sub_pos]['products'][prod_pos]['raw_text'])
+        groups.append(sorted(texts))
+    return groups
+
+
+class DuplicateClustersTest(unittest.TestCase):
+
+    def test_clearance_listing_merges_with_regular_product(self):
+        categories = [
+            _category('12', '華碩 ASUS DUAL RTX5070 O12G(2542MHz/26.7cm/雙風扇)【三年保】, $19,990'),
+            _category('30', '華碩 ASUS DUAL RTX5070 O12G(2542MHz/26.7cm/雙風扇)【三年保】福利品出清, $17,990'),
+        ]
+        clusters = DuplicateClusters.build(categories)
+        self.assertEqual(len(clusters.clusters), 1)
+        # 代表識別碼取一般類別的商品
+        self.assertEqual(clusters.clusters[0]['canonical_id'],
+                         next(m['product_key'] for m in clusters.clusters[0]['members'] if m['category_id'] == '12'))
+
+    def test_different_brands_are_not_merged(self):
+        # ZOTAC 的文字解析不出型號，不能因此略過品牌比對
+        categories = [
+            _category('12', 'ZOTAC Intel ARC B580 12G GDDR6 OC(2670MHz/27cm/雙風扇/註冊送遊戲/RGB燈效/背板)【三年保】, $8,290'),
+            _category('30', 'GIGABYTE Intel ARC B580 12G GDDR6 OC(2670MHz/27cm/雙風扇/註冊送遊戲/RGB燈效/背板)【三年保】, $8,490'),
+        ]
+        self.assertEqual(_clustered_texts(categories), [])
+
+    def test_different_specs_are_not_merged(self):
+        categories = [
+            _category('7', '美光 Crucial P3 Plus 1TB/M.2 PCIe 4.0/讀:5000/寫:3600/QLC【五年保】, $2,490'),
+            _category('30', '美光 Crucial P3 Plus 1TB/M.2 PCIe 3.0/讀:5000/寫:3600/QLC【五年保】, $1,990'),
+            _category('3', '十銓 TEAM T-CREATE 32GB(16G*2) DDR5-6000 CL16(黑)【終身保】, $4,290'),
+            _category('6', '十銓 TEAM T-CREATE 32GB(16G*2) DDR5-6000 CL36(黑)【終身保】, $3,290'),
+        ]
+        self.assertEqual(_clustered_texts(categories), [])
+
+    def test_similar_skus_in_one_category_are_not_merged(self):
+        categories = [
+            _category('4',
+                      'AMD R7 9800X3D代理盒裝【8核/12緒】4.7GHz/96M/120W/AM5, $1,490',
+                      'AMD R7 9800X3D代理盒裝【8核/32緒】4.7GHz/96M/120W/AM5, $8,220'),
+        ]
+        self.assertEqual(_clustered_texts(categories), [])
+
+    def test_same_text_in_one_category_is_merged(self):
+        categories = [
+            _category('4',
+                      'AMD R7 9800X3D代理盒裝【8核/16緒】4.7GHz/96M/120W/AM5, $15,990 ◆',
+                      'AMD R7 9800X3D代理盒裝【8核/16緒】4.7GHz/96M/120W/AM5, $15,490 熱賣'),
+        ]
+        self.assertEqual(len(_clustered_texts(categories)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_details 測試：以本機 HTTP 伺服器代替原價屋，確認詳細頁面網址使用 OPTION 的 value（商品編號），
+以及條件式請求 (304) 與回應快取的行為。
+
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coolpc_parser import WorkingCoolPCParser
+from coolpc_details import DetailFetcher, ResponseCache, enrich_products, detail_url
+
+SELECT_CONTENT = (
+    '<OPTION VALUE=0>處理器 CPU，共有商品 3 樣'
+    '<OPTGROUP label="AMD 桌上型">'
+    '<OPTION value=98765 class=r>AMD R7 7800X3D【8核/16緒】4.2GHz, $12,990◆'
+    '<OPTION value="98766">Intel i5-14400F【10核/16緒】2.5GHz, $5,990★'
+    '<OPTION value=98767>Intel i3-14100【4核/8緒】3.5GHz, $3,990'
+    '</OPTGROUP>'
+)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """代替原價屋的詳細頁面：標題為商品編號；If-None-Match 相符時回應 304，/always304 一律回應 304"""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        if url.path == '/always304':
+            self.send_response(304)
+            self.end_headers()
+            return
+        pdid = parse_qs(url.query)['Pdid'][0]
+        etag = f'"v-{pdid}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = f'<html><head><title>商品 {pdid}</title></head><body>詳細內容 {pdid}</body></html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DetailFetcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir)
+
+    def _categories(self):
+        return [WorkingCoolPCParser('unused.html')._parse_category(SELECT_CONTENT, '4')]
+
+    def _fetcher(self, ttl=None):
+        return DetailFetcher(concurrency=2, rate=0, cache=ResponseCache(self.cache_dir, ttl), timeout=5)
+
+    def test_url_uses_option_value(self):
+        categories = self._categories()
+        products = categories[0]['subcategories'][0]['products']
+        self.assertEqual([product['product_id'] for product in products], ['98765', '98766', '98767'])
+        self.assertEqual(detail_url('4', products[0]),
+                         'https://www.coolpc.com.tw/eachview.php?IGrp=4&Pdid=98765')
+
+        fetcher = self._fetcher()
+        try:
+            merged = enrich_products(categories, fetcher, self.base + '/eachview.php?IGrp={category_id}&Pdid={product_id}')
+        finally:
+            fetcher.close()
+        # 只有帶 ◆/★ 標記的兩項商品，且各自取得自己編號的頁面
+        self.assertEqual(merged, 2)
+        self.assertEqual(products[0]['detail']['title'], '商品 98765')
+        self.assertEqual(products[1]['detail']['title'], '商品 98766')
+        self.assertNotIn('detail', products[2])
+
+    def test_expired_cache_revalidates_with_304(self):
+        url = self.base + '/eachview.php?IGrp=4&Pdid=98765'
+        fetcher = self._fetcher(ttl=0)
+        try:
+            first = fetcher.fetch([url])[url]
+            second = fetcher.fetch([url])[url]
+        finally:
+            fetcher.close()
+        self.assertEqual(first, second)
+        self.assertIn('商品 98765', second)
+        self.assertEqual(fetcher.stats['fetched'], 1)
+        self.assertEqual(fetcher.stats['not_modified'], 1)
+        self.assertEqual([etag for _, etag in self.server.requests], [None, '"v-98765"'])
+
+    def test_fresh_cache_skips_request(self):
+        url = self.base + '/eachview.php?IGrp=4&Pdid=98766'
+        fetcher = self._fetcher()
+        try:
+            fetcher.fetch([url])
+            fetcher.fetch([url])
+        finally:
+            fetcher.close()
+        self.assertEqual(fetcher.stats['cached'], 1)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_304_without_cache_entry_is_not_cached(self):
+        url = self.base + '/always304'
+        cache = ResponseCache(self.cache_dir)
+        fetcher = DetailFetcher(concurrency=1, rate=0, cache=cache, timeout=5)
+        try:
+            body = fetcher.fetch([url])[url]
+        finally:
+            fetcher.close()
+        # 沒有快取可沿用時不帶條件標頭重試一次，仍為 304 則視為失敗，不寫入空白內容
+        self.assertIsNone(body)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(fetcher.stats['failed'], 1)
+        self.assertIsNone(cache.get(url))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fetch_html 測試：以本機 HTTP 伺服器代替原價屋，確認條件式請求 (ETag / 304) 與下載中繼資料的行為，
+包括切換原始 Big5 (--raw) 與 UTF-8 保存格式時不沿用格式不符的文件。
+
+    python3 -m unittest discover -s tests
+"""
+
+import io
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coolpc_parser import WorkingCoolPCParser, FETCH_UPDATED, FETCH_NOT_MODIFIED, FETCH_FAILED
+
+PAGE = '<HTML><BODY><SELECT name=n4><OPTION VALUE=0>處理器 CPU，共有商品 1 樣</SELECT></BODY></HTML>'
+ETAG = '"page-v1"'
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """代替原價屋的估價網頁：Big5 內容，If-None-Match 相符時回應 304，其他路徑回應 404"""
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get('If-None-Match'))
+        if self.path != '/evaluate.php':
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        body = PAGE.encode('big5')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=big5')
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FetchHtmlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/evaluate.php"
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.tmp_dir, 'evaluate.html')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _fetch(self, url=None, raw=False):
+        with redirect_stdout(io.StringIO()):
+            return WorkingCoolPCParser.fetch_html(self.output_file, url or self.url, raw=raw)
+
+    def _read_meta(self):
+        with open(f"{self.output_file}.meta.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_updated_then_not_modified(self):
+        self.assertEqual(self._fetch(), FETCH_UPDATED)
+        with open(self.output_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), PAGE)
+        self.assertEqual(self._read_meta()['etag'], ETAG)
+        self.assertFalse(self._read_meta()['raw'])
+
+        self.assertEqual(self._fetch(), FETCH_NOT_MODIFIED)
+        self.assertEqual(self.server.requests, [None, ETAG])
+        with open(self.output_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), PAGE)
+
+    def test_format_change_skips_conditional_request(self):
+        self.assertEqual(self._fetch(), FETCH_UPDATED)
+        # 上次保存的是 UTF-8，這次要原始 Big5：不可帶 ETag 而收到 304 後沿用 UTF-8 文件
+        self.assertEqual(self._fetch(raw=True), FETCH_UPDATED)
+        with open(self.output_file, 'rb') as f:
+            self.assertEqual(f.read(), PAGE.encode('big5'))
+        self.assertTrue(self._read_meta()['raw'])
+        self.assertEqual(self._fetch(raw=True), FETCH_NOT_MODIFIED)
+        # 切回 UTF-8 時同樣重新下載
+        self.assertEqual(self._fetch(), FETCH_UPDATED)
+        self.assertEqual(self.server.requests, [None, None, ETAG, None])
+
+    def test_missing_file_skips_conditional_request(self):
+        self.assertEqual(self._fetch(), FETCH_UPDATED)
+        os.remove(self.output_file)
+        self.assertEqual(self._fetch(), FETCH_UPDATED)
+        self.assertEqual(self.server.requests, [None, None])
+
+    def test_http_error(self):
+        self.assertEqual(self._fetch(url=self.url.replace('evaluate.php', 'missing.php')), FETCH_FAILED)
+        self.assertFalse(os.path.exists(self.output_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_history 測試：快照差異事件（新上架、下架、價格或原價異動）、目前價格表的增量更新，以及以代表識別碼記錄時
+同群組其他商品的上架、下架不影響代表商品的價格歷史。
+
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coolpc_history import PriceHistory, product_key, EVENT_NEW, EVENT_REMOVED, EVENT_PRICE
+
+GPU_TEXT = '華碩 ASUS DUAL RTX5070 O12G(2542MHz/26.7cm/雙風扇)【三年保】'
+
+
+def _snapshot(*entries):
+    """entries 為 (類別編號, 文字, 價格) 或 (類別編號, 文字, 價格, 原價)"""
+    categories = {}
+    for category_id, text, price, *original_price in entries:
+        category = categories.setdefault(category_id, {
+            'category_id': category_id, 'category_name': f'類別 {category_id}',
+            'subcategories': [{'name': '全部', 'products': []}]
+        })
+        category['subcategories'][0]['products'].append({
+            'brand': '華碩 ASUS', 'model': None, 'raw_text': f'{text}, ${price:,}',
+            'price': price, 'original_price': original_price[0] if original_price else None
+        })
+    return list(categories.values())
+
+
+def _key(category_id, text):
+    return product_key(category_id, {'brand': '華碩 ASUS', 'model': None, 'raw_text': text})
+
+
+class PriceHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.history = PriceHistory(os.path.join(self.tmp_dir, 'history.db'))
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_snapshot_diff_events(self):
+        self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 19990), ('12', 'RTX5060 DUAL', 9990)))
+        result = self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 18990)))
+        self.assertEqual((result['new'], result['removed'], result['price_changed']), (0, 1, 1))
+        events = [(row['kind'], row['previous_price'], row['price'])
+                  for row in self.history.price_history(_key('12', GPU_TEXT))]
+        self.assertEqual(events, [(EVENT_NEW, None, 19990), (EVENT_PRICE, 19990, 18990)])
+
+    def test_original_price_change(self):
+        self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 18990, 19990)))
+        # 售價不變、原價改變（如特價結束後原價調整）也是價格異動
+        result = self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 18990, 20990)))
+        self.assertEqual(result['price_changed'], 1)
+        events = [(row['kind'], row['previous_price'], row['price'], row['original_price'])
+                  for row in self.history.price_history(_key('12', GPU_TEXT))]
+        self.assertEqual(events, [(EVENT_NEW, None, 18990, 19990), (EVENT_PRICE, 18990, 18990, 20990)])
+
+        result = self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 18990, 20990)))
+        self.assertEqual(result['price_changed'], 0)
+
+    def test_current_prices_follow_snapshots(self):
+        other = 'RTX5060 DUAL'
+        self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 19990), ('12', other, 9990)))
+        self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 18990, 19990), ('12', 'RX9070 PRIME', 21990)))
+        rows = {row['product_key']: (row['price'], row['original_price'])
+                for row in self.history.conn.execute('SELECT * FROM current_prices')}
+        self.assertEqual(rows, {_key('12', GPU_TEXT): (18990, 19990), _key('12', 'RX9070 PRIME'): (21990, None)})
+        # 下架後重新上架視為新上架
+        result = self.history.record_snapshot(_snapshot(('12', other, 9990)))
+        self.assertEqual((result['new'], result['removed'], result['price_changed']), (1, 2, 0))
+
+    def test_canonical_records_only_the_representative(self):
+        regular = _key('12', GPU_TEXT)
+        clearance = _key('30', GPU_TEXT + '福利品出清')
+        canonical = {regular: regular, clearance: regular}
+
+        self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 19990)), canonical={})
+        # 較便宜的福利品出清上架又下架，代表商品本身價格不變
+        self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 19990), ('30', GPU_TEXT + '福利品出清', 15990)),
+                                     canonical=canonical)
+        self.history.record_snapshot(_snapshot(('12', GPU_TEXT, 19990)), canonical={})
+
+        self.assertEqual([row['kind'] for row in self.history.price_history(regular)], [EVENT_NEW])
+        self.assertEqual(self.history.price_history(clearance), [])
+        self.assertNotIn(EVENT_REMOVED, [row['kind'] for row in self.history.changes_since('')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_index 測試：以 golden 解析結果建立查詢索引，確認品牌只寫中文或英文名稱都能查到。
+
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import json
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from coolpc_index import QueryIndex
+
+GOLDEN_FIXTURE = os.path.join(ROOT, 'benchmarks', 'golden', 'evaluate_fixture.json')
+
+
+class QueryIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_FIXTURE, 'r', encoding='utf-8') as f:
+            cls.categories = json.load(f)
+        cls.index = QueryIndex.build(cls.categories)
+
+    def test_brand_matches_either_name(self):
+        full = self.index.query(brand='華碩 ASUS', limit=1000)
+        self.assertTrue(full)
+        self.assertEqual(self.index.query(brand='ASUS', limit=1000), full)
+        self.assertEqual(self.index.query(brand='asus', limit=1000), full)
+        self.assertEqual(self.index.query(brand='華碩', limit=1000), full)
+        for product_id in full:
+            self.assertEqual(self.index.resolve(product_id, self.categories)['brand'], '華碩 ASUS')
+
+    def test_brand_with_category(self):
+        results = self.index.query(category_id='12', brand='ASUS', limit=1000)
+        self.assertTrue(results)
+        self.assertEqual(results, self.index.query(category_id='12', brand='華碩 ASUS', limit=1000))
+        self.assertTrue(all(self.index.resolve(product_id, self.categories)['category_id'] == '12'
+                            for product_id in results))
+
+    def test_unknown_brand(self):
+        self.assertEqual(self.index.query(brand='ASUS ZOTAC'), [])
+        self.assertEqual(self.index.query(brand='不存在的品牌'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
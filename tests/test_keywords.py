@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_keywords 測試：合併成單一字典樹的分類結果必須與逐一以子字串比對各類別關鍵字相同。
+
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import json
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from coolpc_keywords import KEYWORD_CLASSES, KEYWORD_BITS, KEYWORDS
+
+GOLDEN_FIXTURE = os.path.join(ROOT, 'benchmarks', 'golden', 'evaluate_fixture.json')
+
+
+def _reference_bits(text):
+    bits = 0
+    for name, keywords in KEYWORD_CLASSES.items():
+        if any(keyword in text for keyword in keywords):
+            bits |= KEYWORD_BITS[name]
+    return bits
+
+
+class KeywordClassifierTest(unittest.TestCase):
+
+    def test_matches_substring_reference(self):
+        with open(GOLDEN_FIXTURE, 'r', encoding='utf-8') as f:
+            categories = json.load(f)
+        texts = ['❤ 推薦用於 1700 腳位', '【三年保固】', '8核/16緒', 'DDR5 6000MHz', 'W/O', '限時下殺 ↘ 熱賣']
+        for category in categories:
+            for subcategory in category['subcategories']:
+                texts.append(subcategory['name'])
+                texts.extend(product['raw_text'] for product in subcategory['products'])
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(KEYWORDS.classify(text), _reference_bits(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_parser 一致性測試：以合成網頁確認各解析路徑的結果與 parse_html 完全相同
+（單次掃描的 OPTION 切割、--jobs 平行解析、串流解析、類別快取、原始 Big5 的 parse_raw）。
+
+    python3 -m unittest discover -s tests
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import coolpc_parser
+from coolpc_parser import WorkingCoolPCParser, decode_big5, _PATTERNS
+from coolpc_profile import StageProfiler
+from generate_evaluate import generate
+
+GOLDEN_FIXTURE = os.path.join(ROOT, 'benchmarks', 'golden', 'evaluate_fixture.json')
+# 與 benchmarks/bench_parser.py 的 GOLDEN_FIXTURE_SCALE 相同
+FIXTURE_SCALE = 0.05
+STREAM_CHUNK = 997
+
+
+def _reference_options(select_content):
+    """逐一搜尋 OPTION 標籤、下一個標籤及所屬 OPTGROUP 的切割方式（單次掃描之前的作法）"""
+    optgroups = [(match.start(), match.group(1))
+                 for match in re.finditer(r'<OPTGROUP\s+LABEL=[\'"](.*?)[\'"]>', select_content, re.IGNORECASE)]
+    options = []
+    for match in re.finditer(r'<OPTION([^>]*?)>', select_content, re.IGNORECASE):
+        start = match.end()
+        next_tag = re.search(r'<(?:OPTION|OPTGROUP|/SELECT|/OPTGROUP|/OPTION)', select_content[start:], re.IGNORECASE)
+        end = start + next_tag.start() if next_tag else len(select_content)
+        content = re.sub(r'<[^>]*>', '', select_content[start:end].strip())
+        optgroup = None
+        for position, label in optgroups:
+            if match.start() > position:
+                optgroup = label
+        options.append((optgroup, match.group(1), content))
+    return options
+
+
+class ParserEquivalenceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.raw = generate(FIXTURE_SCALE)
+        cls.raw_file = os.path.join(cls.tmp_dir, 'evaluate.raw.html')
+        with open(cls.raw_file, 'wb') as f:
+            f.write(cls.raw)
+        cls.text = decode_big5(cls.raw)
+        cls.html_file = os.path.join(cls.tmp_dir, 'evaluate.html')
+        with open(cls.html_file, 'w', encoding='utf-8') as f:
+            f.write(cls.text)
+        cls.expected = WorkingCoolPCParser(cls.html_file).parse_html()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_parse_html_matches_golden(self):
+        with open(GOLDEN_FIXTURE, 'r', encoding='utf-8') as f:
+            self.assertEqual(self.expected, json.load(f))
+
+    def test_single_pass_options_match_reference(self):
+        blocks = [content for _, content in _PATTERNS['select'].findall(self.text)]
+        blocks.append('<OPTION VALUE=0>摘要<optgroup label="甲"><OPTION value=1 class=r>商品一 <b>粗體</b>, $100'
+                      '</OPTION><OPTGROUP LABEL=\'乙\'><OPTION>商品二, $200</OPTGROUP><OPTION disabled>尾端')
+        for content in blocks:
+            self.assertEqual(list(WorkingCoolPCParser._iter_options(content)), _reference_options(content))
+
+    def test_parallel_jobs(self):
+        self.assertEqual(WorkingCoolPCParser(self.html_file).parse_html(jobs=2), self.expected)
+
+    def test_profiled_parallel_jobs(self):
+        profiler = StageProfiler()
+        self.assertEqual(WorkingCoolPCParser(self.html_file, profiler=profiler).parse_html(jobs=2), self.expected)
+        report = profiler.report()
+        self.assertEqual(report['stages']['decode']['bytes'], report['stages']['read']['bytes'])
+        # 工作行程的品牌正則表達式快取統計彙整回主行程
+        self.assertEqual(report['workers']['tasks'], len(self.expected))
+        self.assertGreater(report['workers']['regex_cache_hits'] + report['workers']['regex_cache_misses'], 0)
+        self.assertTrue(report['notes'])
+
+    def test_negative_jobs_rejected(self):
+        argv = ['coolpc_parser.py', '--jobs', '-1', '--summary', self.html_file]
+        with mock.patch.object(sys, 'argv', argv), redirect_stderr(io.StringIO()) as stderr, \
+                self.assertRaises(SystemExit):
+            coolpc_parser.main()
+        self.assertIn('--jobs', stderr.getvalue())
+
+    def test_stream(self):
+        self.assertEqual(WorkingCoolPCParser(self.html_file).parse_stream(), self.expected)
+        # 原始 Big5 位元組切成小段，OPTION 與多位元組字元都可能被切斷
+        chunks = (self.raw[i:i + STREAM_CHUNK] for i in range(0, len(self.raw), STREAM_CHUNK))
+        self.assertEqual(WorkingCoolPCParser(self.html_file).parse_stream(chunks), self.expected)
+
+    def test_category_cache(self):
+        cache_dir = os.path.join(self.tmp_dir, 'cache')
+        first = WorkingCoolPCParser(self.html_file, cache_dir=cache_dir)
+        self.assertEqual(first.parse_html(), self.expected)
+        self.assertEqual(first.cache_stats['reused'], 0)
+        second = WorkingCoolPCParser(self.html_file, cache_dir=cache_dir)
+        self.assertEqual(second.parse_html(), self.expected)
+        self.assertEqual(second.cache_stats['parsed'], 0)
+
+    def test_parse_raw(self):
+        self.assertEqual(WorkingCoolPCParser(self.raw_file).parse_raw(), self.expected)
+        self.assertEqual(WorkingCoolPCParser(self.raw_file).parse_raw(jobs=2), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
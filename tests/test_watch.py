@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coolpc_watch 測試：監聽位址在進入更新迴圈前由 make_server 檢查，
+run_watch 直接使用已建立的 server。
+
+    python3 -m unittest discover -s tests
+"""
+
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import coolpc_parser
+from coolpc_watch import SnapshotStore, make_server, run_watch
+
+
+class WatchListenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.tmp_dir, 'evaluate.html')
+        with open(self.input_file, 'w', encoding='utf-8') as f:
+            f.write('<HTML></HTML>')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_invalid_listen(self):
+        store = SnapshotStore(1)
+        with self.assertRaises(ValueError):
+            make_server('no-port', store)
+        # 不是 socket 的既有文件不可被刪除或覆寫
+        with self.assertRaises(ValueError):
+            make_server(f"unix:{self.input_file}", store)
+        self.assertTrue(os.path.isfile(self.input_file))
+
+    def test_main_reports_listen_error_before_loop(self):
+        argv = ['coolpc_parser.py', '--watch', '5', '--listen', f"unix:{self.input_file}", self.input_file]
+        output = io.StringIO()
+        with mock.patch.object(sys, 'argv', argv), mock.patch.object(coolpc_parser, 'run_watch') as watch, \
+                redirect_stdout(output):
+            coolpc_parser.main()
+        watch.assert_not_called()
+        self.assertIn('不是 socket 文件', output.getvalue())
+
+    def test_run_watch_uses_prepared_server(self):
+        path = os.path.join(self.tmp_dir, 'watch.sock')
+        server = make_server(f"unix:{path}", SnapshotStore(60))
+        self.assertTrue(os.path.exists(path))
+
+        def load():
+            # 第一次更新後即結束
+            raise KeyboardInterrupt
+
+        with redirect_stdout(io.StringIO()):
+            run_watch(load, server, f"unix:{path}")
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()